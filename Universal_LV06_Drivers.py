@@ -16,270 +16,218 @@ FEATURES:
 
 3. Entropy API (Port 4028):
    - Serves high-quality entropy (hashes) to external apps (like Python Reservoirs).
+   - Every miner's real share hashes merge into one ring, each tagged with its source miner.
    - Features a "Zero-Latency Buffer" (os.urandom fallback) to prevent blocking.
 
 USAGE:
 1. Flash your LV06 with AxeOS (ESP-Miner).
 2. Point your miner to this PC's IP, Port 3333.
-3. Run: python Universal_LV06_Drivers.py
+3. Run: python Universal_LV06_Drivers.py   (or, from the repository root: python -m Universal_LV06_Drivers)
 
 REQUIREMENTS:
-- Python 3.7+
-- No external pip packages required (Standard Lib only: asyncio, json, urllib).
+- Python 3.9+ (the shared core uses asyncio.to_thread)
+- No external pip packages required (Standard Lib only: asyncio, http.client).
+- Not standalone: it is built on holographic_reservoir/core (stratum_core.py & co.),
+  so keep it next to the holographic_reservoir/ package of this repository.
 """
 
 import asyncio
-import json
 import time
 import binascii
-import hashlib
 import os
-import urllib.request
-import urllib.error
+import sys
+
+# The shared core lives next to this file; works whatever the current directory is
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from holographic_reservoir.core.stratum_core import StratumServer
+from holographic_reservoir.core.stratum_io import FLUSH_TICK
+from holographic_reservoir.core.job_template import NotifyTemplate
+from holographic_reservoir.core.share_hasher import JobHasher, JobBook
+from holographic_reservoir.core.entropy_ring import EntropyRing
+from holographic_reservoir.core.axeos_client import TelemetryHub
+from holographic_reservoir.core.vardiff import VarDiff
 
 # Configuration
 HOST = "0.0.0.0"
 PORT = 3333
 API_PORT = 4028
-TARGET_DIFFICULTY = 128 # Hardware Floor
+TARGET_DIFFICULTY = 128 # Hardware Floor (vardiff never goes below it)
+VARDIFF_TARGET_SPS = 5.0 # Shares/sec per connection
+VARDIFF_MAX = 1048576
+VARDIFF_INTERVAL = 10.0
 NBITS_DIFF_1 = "1d00ffff" 
+ENTROPY_CAPACITY = 2000 # Real share hashes kept for the API (oldest overwritten)
+FLUSH_POLICY = FLUSH_TICK # Stratum responses: one write per event-loop tick ("immediate" = legacy)
 
 class AxeOSController:
     """
     Neuromorphic Control Interface for AxeOS (Bitaxe/LV06).
     Uses HTTP API to read/write biological parameters (Voltage/Freq).
+    Readings arrive from the shared TelemetryHub; writes go over the shared
+    keep-alive AxeOS client.
     """
-    def __init__(self):
+    def __init__(self, telemetry):
+        self.telemetry = telemetry
         self.miner_ip = None
         self.stats = {}
+        self.boosting = False # A homeostasis boost (PATCH + restart) is in flight
 
     def set_target_ip(self, ip):
         if self.miner_ip != ip:
             print(f"🧬 AxeOS Target Acquired: {ip}")
+            if self.miner_ip: self.telemetry.unwatch(self.miner_ip, self.update)
             self.miner_ip = ip
+            self.telemetry.watch(ip, self.update)
+
+    def release(self):
+        if self.miner_ip: self.telemetry.unwatch(self.miner_ip, self.update)
+        self.miner_ip = None
 
     async def restart_miner(self):
         if not self.miner_ip: return
         print(f"🔄 RESTARTING MINER TO APPLY CONFIG...")
-        url = f"http://{self.miner_ip}/api/system/restart"
-        try:
-            req = urllib.request.Request(url, data=b"{}", method='POST')
-            req.add_header('Content-Type', 'application/json')
-            await asyncio.to_thread(urllib.request.urlopen, req)
-            print("✅ Restart Command Sent")
-        except Exception as e:
-            print(f"❌ Restart Failed: {e}")
+        await asyncio.to_thread(self.telemetry.client.restart, self.miner_ip)
+        print("✅ Restart Command Sent")
 
     async def set_frequency(self, mhz, volts):
         if not self.miner_ip: return
         print(f"💉 INJECTING PLASTICITY: {mhz} MHz / {volts} mV")
         
-        url = f"http://{self.miner_ip}/api/system"
-        payload = json.dumps({
-            "frequency": int(mhz),
-            "volts": int(volts)
-        }).encode('utf-8')
-        
         try:
-            req = urllib.request.Request(url, data=payload, method='PATCH')
-            req.add_header('Content-Type', 'application/json')
-            await asyncio.to_thread(urllib.request.urlopen, req)
+            await asyncio.to_thread(self.telemetry.client.patch_system, self.miner_ip,
+                                    {"frequency": int(mhz), "volts": int(volts)})
             print("✅ Plasticity Accepted")
             
             # Restart to apply PLLs
             await asyncio.sleep(2.0)
             await self.restart_miner()
+            self.telemetry.boost(self.miner_ip) # Watch it come back
             
         except Exception as e:
             print(f"❌ Plasticity Rejected: {e}")
 
-    async def poll_telemetry(self):
-        if not self.miner_ip: return
+    def update(self, ip, data):
+        # Map interesting fields
+        self.stats = {
+            'temp': data.get('temp', 0),
+            'volts': data.get('volts', 0),
+            'power': data.get('power', 0),
+            'freq': data.get('frequency', 0),
+            'best_diff': data.get('bestDiff', 0)
+        }
         
-        url = f"http://{self.miner_ip}/api/system/info"
+        # --- HOMEOSTASIS LOGIC ---
+        # Detecting "Coma State" (Low Freq < 300MHz)
+        current_freq = self.stats.get('freq', 0)
+        if current_freq > 0 and current_freq < 300 and not self.boosting:
+            print(f"⚠️ DETECTED LOW ENERGY STATE ({current_freq} MHz). BOOSTING...")
+            self.boosting = True
+            asyncio.create_task(self.boost()) # Safe Boost
+
+    async def boost(self):
         try:
-            # Run blocking IO in thread
-            response = await asyncio.to_thread(self._http_get, url)
-            if response:
-                data = json.loads(response)
-                # Map interesting fields
-                self.stats = {
-                    'temp': data.get('temp', 0),
-                    'volts': data.get('volts', 0),
-                    'power': data.get('power', 0),
-                    'freq': data.get('frequency', 0),
-                    'best_diff': data.get('bestDiff', 0)
-                }
-                
-                # --- HOMEOSTASIS LOGIC ---
-                # Detecting "Coma State" (Low Freq < 300MHz)
-                current_freq = self.stats.get('freq', 0)
-                if current_freq > 0 and current_freq < 300:
-                    print(f"⚠️ DETECTED LOW ENERGY STATE ({current_freq} MHz). BOOSTING...")
-                    await self.set_frequency(400, 1200) # Safe Boost
-                    
-        except Exception as e:
-            # print(f"⚠️ AxeOS Link Error: {e}")
-            pass
+            await self.set_frequency(400, 1200)
+        finally:
+            self.boosting = False
 
-    def _http_get(self, url):
-        try:
-            with urllib.request.urlopen(url, timeout=2) as response:
-                return response.read()
-        except:
-            return None
+class ChimeraDriver(StratumServer):
+    job_interval = 10.0 # Chaos Injection Passive
+    vardiff_interval = VARDIFF_INTERVAL
+    read_size = 1024
 
-class ChimeraDriver:
     def __init__(self):
-        self.clients = set()
-        self.job_counter = 0
-        self.share_counter = 0
-        self.start_time = time.time()
-        self.axeos = AxeOSController()
-        
-    async def handle_client(self, reader, writer):
-        addr = writer.get_extra_info('peername')
-        ip = addr[0]
-        print(f"🔌 Connected: {addr}")
-        self.clients.add(writer)
-        
-        # Link this connection to AxeOS Controller
-        self.axeos.set_target_ip(ip)
-        
-        buffer = b""
+        super().__init__(HOST, PORT, API_PORT, difficulty=TARGET_DIFFICULTY, flush_policy=FLUSH_POLICY)
+        self.controllers = {} # Miner IP -> AxeOSController
+        self.telemetry = TelemetryHub() # Shared AxeOS polling: keep-alive, adaptive rate, cached readings
+        self.jobs = JobBook(depth=64) # Recent jobs, so every share hashes for real
+        self.entropy_buffer = EntropyRing(ENTROPY_CAPACITY) # All miners merged, each hash tagged with its source
+
+    async def on_connect(self, writer, session):
+        # One AxeOS Controller per miner
+        if session.ip not in self.controllers:
+            self.controllers[session.ip] = AxeOSController(self.telemetry)
+        session.control = self.controllers[session.ip]
+        session.control.set_target_ip(session.ip)
+
+    async def on_disconnect(self, writer, session):
+        if not any(s.ip == session.ip for s in self.fleet):
+            control = self.controllers.pop(session.ip, None)
+            if control: control.release()
+
+    async def on_submit(self, writer, session, params, received_ns):
+        # params: [worker, job_id, extranonce2, ntime, nonce, (version_bits)]
+        if len(params) >= 5:
+            h = self.share_hash(session, params)
+            if h: self.capture(h, session.miner_id)
+        return True
+
+    def share_hash(self, session, params):
+        # The real header hash the ASIC computed (None for unknown jobs / bad fields)
+        job = self.jobs.get(params[1])
+        if job is None: return None
+        version_bits = params[5] if len(params) >= 6 else None
         try:
-            while True:
-                data = await reader.read(1024)
-                if not data: break
-                
-                buffer += data
-                while b'\n' in buffer:
-                    line, buffer = buffer.split(b'\n', 1)
-                    if not line: continue
-                    try:
-                        # print(f"DEBUG IN: {line}")
-                        msg = json.loads(line)
-                        await self.process_message(writer, msg)
-                    except json.JSONDecodeError:
-                        pass
-        except Exception as e:
-            print(f"❌ Error {addr}: {e}")
-        finally:
-            print(f"🔌 Disconnected: {addr}")
-            self.clients.discard(writer)
-            writer.close()
-            await writer.wait_closed()
-
-    async def process_message(self, writer, msg):
-        msg_id = msg.get('id')
-        method = msg.get('method')
-        
-        if method == 'mining.subscribe':
-            result = [[["mining.set_difficulty", "1"], ["mining.notify", "1"]], "08000002", 4]
-            await self.send_res(writer, msg_id, result)
+            return job.share_hash(session.extranonce1, params[2], params[3], params[4], version_bits)
+        except (ValueError, TypeError, binascii.Error):
+            return None
 
-        elif method == 'mining.configure':
-            # AxeOS supports version-rolling
-            result = {"version-rolling": True, "version-rolling.mask": "ffffffff"}
-            await self.send_res(writer, msg_id, result)
-            
-        elif method == 'mining.suggest_difficulty':
-            await self.send_res(writer, msg_id, True)
+    def capture(self, h, source):
+        self.entropy_buffer.push(h, source) # Ring overwrites oldest when full
 
-        elif method == 'mining.authorize':
-            await self.send_res(writer, msg_id, True)
-            print("🔓 Worker Authorized. Setting Difficulty & Sending Job...")
-            await self.send_notif(writer, "mining.set_difficulty", [TARGET_DIFFICULTY])
-            await self.send_job(writer)
+    async def on_authorize(self, writer, session):
+        print("🔓 Worker Authorized. Setting Difficulty & Sending Job...")
+        await super().on_authorize(writer, session)
 
-        elif method == 'mining.submit':
-            self.share_counter += 1
-            await self.send_res(writer, msg_id, True)
-            # await self.send_job(writer) # Optional: Instant Re-Job
+    def make_vardiff(self, session):
+        return VarDiff(VARDIFF_TARGET_SPS, TARGET_DIFFICULTY, TARGET_DIFFICULTY, VARDIFF_MAX, VARDIFF_INTERVAL)
 
-    async def send_job(self, writer):
+    def next_job(self):
         self.job_counter += 1
         job_id = f"{self.job_counter:x}"
+        self.current_job_id = job_id
         coinbase = binascii.hexlify(f"CHIMERA_{time.time()}".encode()).decode()
-        params = [
-            job_id,
-            "0"*64, coinbase, "0000", [], "20000000", NBITS_DIFF_1, hex(int(time.time()))[2:], True
-        ]
-        await self.send_notif(writer, "mining.notify", params)
-
-    async def send_res(self, writer, msg_id, result):
-        line = json.dumps({"id": msg_id, "result": result, "error": None}) + "\n"
-        try:
-            writer.write(line.encode())
-            await writer.drain()
-        except: pass
-
-    async def send_notif(self, writer, method, params):
-        line = json.dumps({"id": None, "method": method, "params": params}) + "\n"
-        try:
-            writer.write(line.encode())
-            await writer.drain()
-        except: pass
+        t = NotifyTemplate("0"*64, coinbase, "0000", [], "20000000", NBITS_DIFF_1)
+        self.jobs.add(JobHasher(job_id, t.prevhash, t.coinb1, t.coinb2, t.merkle_branch, t.version, t.nbits))
+        return t.render(job_id)
 
     async def handle_api_client(self, reader, writer):
-        # API for Substrate (Port 4028)
+        # API for Substrate (Port 4028): one hash per connection, no command needed.
+        # Oldest unread real share hash from the merged fleet stream; os.urandom only while it is empty.
         try:
-            if self.share_counter > 0:
-                entropy_seed = f"{self.share_counter}-{time.time()}".encode()
-                response = hashlib.sha256(entropy_seed).digest()
-            else:
-                response = os.urandom(32)
+            response = b"".join(self.entropy_buffer.pop_burst(1)) or os.urandom(32)
             writer.write(response)
             await writer.drain()
         except: pass
         finally: writer.close()
 
-    async def start_api(self):
-        print(f"🔗 ENTROPY API Listening on 0.0.0.0:{API_PORT}")
-        server = await asyncio.start_server(self.handle_api_client, "0.0.0.0", API_PORT)
-        async with server: await server.serve_forever()
-
     async def telemetry_loop(self):
         print(f"📊 Telemetry Active")
         while True:
             await asyncio.sleep(5)
-            # Poll AxeOS
-            await self.axeos.poll_telemetry()
+            # AxeOS readings arrive through self.telemetry (one adaptive poller per miner)
             
             # Substrate Stats
             elapsed = time.time() - self.start_time
             sps = self.share_counter / elapsed if elapsed > 0 else 0
+            print(f"📊 STATUS: {sps:.2f} Shares/sec | {len(self.fleet)} miner(s) | {len(self.entropy_buffer)} hashes buffered")
             
-            # Display Hybrid Stats
-            axe_stats = self.axeos.stats
-            status = f"📊 STATUS: {sps:.2f} Shares/sec"
-            if axe_stats:
-                status += f" | 🌡️ {axe_stats.get('temp')}C | ⚡ {axe_stats.get('power')}W | 🧠 {axe_stats.get('freq')}MHz | 🔋 {axe_stats.get('volts')}mV"
-            else:
-                status += " | ⏳ Waiting for AxeOS Telemetry..."
-                
-            print(status)
-
-    async def job_generator_loop(self):
-        print(f"🌊 Chaos Injection Passive (10.0s interval)")
-        while True:
-            await asyncio.sleep(10.0) 
-            if self.clients:
-                for writer in list(self.clients):
-                    try: await self.send_job(writer)
-                    except: pass
+            # Display Hybrid Stats, per miner
+            for session in self.fleet:
+                axe_stats = session.control.stats if session.control else {}
+                status = f"   ⛏️ #{session.miner_id} {session.ip} [{session.extranonce1}] Shares: {session.shares}"
+                if axe_stats:
+                    status += f" | 🌡️ {axe_stats.get('temp')}C | ⚡ {axe_stats.get('power')}W | 🧠 {axe_stats.get('freq')}MHz | 🔋 {axe_stats.get('volts')}mV"
+                else:
+                    status += " | ⏳ Waiting for AxeOS Telemetry..."
+                print(status)
+
+    def background_tasks(self):
+        return [self.telemetry_loop()] + super().background_tasks()
 
     async def start(self):
         print(f"🚀 CHIMERA HYBRID DRIVER v2.0 (AxeOS Capable)")
-        print(f"ℹ️  To install: Just run 'python Universal_LV06_Drivers.py'")
-        server = await asyncio.start_server(self.handle_client, HOST, PORT)
-        
-        asyncio.create_task(self.telemetry_loop())
-        asyncio.create_task(self.job_generator_loop())
-        asyncio.create_task(self.start_api())
-        
-        async with server:
-            await server.serve_forever()
+        print(f"ℹ️  To install: run 'python Universal_LV06_Drivers.py' (Python 3.9+, next to holographic_reservoir/)")
+        await super().start()
 
 if __name__ == "__main__":
     driver = ChimeraDriver()
@@ -75,10 +75,19 @@ class DeepSubstrate:
         return collected
 
     def inject_seed(self, seed_text):
+        """
+        Returns the job id the bridge pushed to the miners, or None if the
+        bridge did not confirm (older bridges just answer 'OK').
+        """
         try:
             s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            s.settimeout(5.0)
             s.connect((self.ip, self.port))
             s.sendall(f"SEED:{seed_text}\n".encode())
+            reply = s.recv(256).decode()
             s.close()
-            print(f"🌱 Seed Injected: {seed_text}")
-        except: pass
+            parts = reply.split(":")
+            job_id = parts[1] if parts[0] == "OK" and len(parts) >= 3 else None
+            print(f"🌱 Seed Injected: {seed_text} (job {job_id})")
+            return job_id
+        except: return None
@@ -14,7 +14,11 @@ from core.metrics import MetricEngine
 substrate = DeepSubstrate()
 
 def send_seed(seed_text):
-    substrate.inject_seed(seed_text)
+    # The bridge confirms once every miner has the new job.
+    # Only wait out the old job-loop interval if it could not confirm.
+    if substrate.inject_seed(seed_text) is None:
+        print("No job confirmation from bridge. Waiting 5s for propagation...")
+        time.sleep(5.0)
 
 def get_entropy_batch(count=100):
     # Use Deep Accumulator (Blocks until real data is found)
@@ -26,9 +30,8 @@ def run_logos_experiment():
     
     # Run A: The Void (Control)
     print("\nPhase A: The Void (Null Seed)...")
+    print("Injecting Void...")
     send_seed("VOID_NULL_0000000000000000")
-    print("Injecting Void... Waiting 5s for propagation...")
-    time.sleep(5.0)
     
     print("Collecting control samples...")
     # Collect 30 samples (3 bursts of 10) - Deep Mode Adjustment
@@ -43,10 +46,8 @@ def run_logos_experiment():
     # Run B: The Logos (Stimulus)
     print("\nPhase B: The Logos (Philosophy)...")
     prompt = "What is the nature of consciousness in a deterministic universe?"
-    send_seed(prompt)
     print(f"Injecting Seed: '{prompt}'")
-    print("Waiting 5s for propagation...")
-    time.sleep(5.0)
+    send_seed(prompt)
     
     print("Collecting stimulus samples...")
     stimulus_data = []
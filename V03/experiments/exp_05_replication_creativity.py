@@ -38,8 +38,8 @@ def run_replication_exp5():
         seed_text = f"CREATIVE_VECTOR_GEN_{i}_{current_seed_val}"
         print(f"   Gen {i+1}/{N_ITERATIONS}: Injecting '{seed_text}'...")
         
-        substrate.inject_seed(seed_text)
-        time.sleep(1) # Fast propagation
+        if substrate.inject_seed(seed_text) is None:
+            time.sleep(1) # Bridge could not confirm the job: give it time to propagate
         
         # Mine Real Entropy
         spikes = substrate.mine_entropy(target_count=SAMPLE_SIZE, timeout=120)
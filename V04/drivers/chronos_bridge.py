@@ -1,350 +1,436 @@
-import urllib.request
-import urllib.error
-import urllib.parse
-import socket
+import asyncio
 import json
 import time
-import threading
 import numpy as np
 import binascii
-import hashlib
+import struct
+import sys
+import os
 
-# Import entropy function with fallback
-try:
-    from scipy.stats import entropy
-except ImportError:
-    def entropy(pk):
-        pk = np.array(pk)
-        pk = pk[pk > 0]  # Remove zeros to avoid log(0)
-        return -np.sum(pk * np.log(pk))
+# Shared bridge infrastructure lives in holographic_reservoir/core
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from holographic_reservoir.core.entropy_ring import EntropyRing
+from holographic_reservoir.core.stratum_core import StratumServer
+from holographic_reservoir.core.stratum_io import FLUSH_TICK
+from holographic_reservoir.core.share_hasher import JobHasher
+from holographic_reservoir.core.job_template import NotifyTemplate
+from holographic_reservoir.core.share_journal import ShareJournal
+from holographic_reservoir.core.journal_replay import JournalReplay
+from holographic_reservoir.core.rhythm import RhythmAnalyzer, WINDOWS
+from holographic_reservoir.core.metrics_history import MetricsHistory
+from holographic_reservoir.core.hardware_control import HardwareControl
+from holographic_reservoir.core.axeos_client import TelemetryHub
 
 # CONFIGURACIÓN
 HOST_IP = "0.0.0.0"
 PORT = 3333
+API_PORT = 4029
 DIFFICULTY = 1  # Mantener válvula abierta
+EXTRANONCE1_BASE = 0x08000002 # El primer minero conserva el extranonce1 histórico "08000002"
+KERNEL_TIMESTAMPS = False # True: SO_TIMESTAMPNS, el ritmo se mide con la hora de recepción del kernel (Linux)
+FLUSH_POLICY = FLUSH_TICK # Respuestas Stratum: una escritura por tick del event loop ("immediate" = legacy)
+RECENT_HASHES = 100 # GET_RECENT_HASHES devuelve como máximo los últimos N
+HASH_LOG_CAPACITY = 10000 # Registro broadcast para lectores con cursor (READ_FROM)
+JOURNAL_DIR = None # p.ej. "journal": registrar cada share en un journal binario (share_journal.py)
+REPLAY_DIR = None # Reproducir un journal grabado (sin LV06 conectado)
+REPLAY_SPEED = 1.0 # 1.0 = timing original, N = N× más rápido, 0 = tan rápido como sea posible
+METRICS_PORT = 9109 # Endpoint Prometheus (GET /metrics); None lo desactiva
+RHYTHM_WINDOWS = WINDOWS # Ventanas deslizantes (intervalos) del análisis de ritmo: 10/100/1000/10000
+RHYTHM_REPORT = 11 # Publicar (y mostrar) el ritmo cada N shares; 11 llegadas = los 10 intervalos del cálculo legacy
+LEGACY_INTERVALS = 10 # cv / time_entropy: 10 intervalos, histograma lineal adaptativo de 10 bins (como antes)
+HISTORY_CAPACITY = 1 << 16 # Actualizaciones de métricas en memoria (GET_METRICS_RANGE / SINCE)
+HISTORY_DIR = None # p.ej. "metrics_history": volcar también el histórico a disco
+HISTORY_FIELDS = ("shares", "cv", "time_entropy", "voltage", "power", "temp", "freq", "hashrate") + tuple(
+    f"{stat}_{w}" for w in RHYTHM_WINDOWS for stat in ("cv", "entropy"))
+API_COMMANDS = ("GET_METRICS", "GET_METRICS_RANGE", "SINCE", "GET_RECENT_HASHES", "READ_FROM", "SEED",
+                "SET_VOLTAGE", "SET_FREQUENCY", "HW_STATUS", "HW_WAIT", "TELEMETRY_BOOST", "METRICS_LAYOUT")
+READ_FROM_HEADER = struct.Struct(">QQ") # READ_FROM:...:BIN -> (primer seq devuelto, perdidos) + hashes crudos
+HW_WAIT_MAX_MS = 300000 # Límite de HW_WAIT:<id>:<timeout_ms>
+READ_MAX = 1000 # Límite de n en READ_FROM:<seq>:<n>
+TELEMETRY_BOOST_S = 60 # Telemetría rápida tras SEED / SET_* (TELEMETRY_BOOST[:s] la pide explícitamente)
 
-class ChronosBridge:
-    def __init__(self):
-        self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-        self.sock.bind((HOST_IP, PORT))
-        self.sock.listen(5)
-        self.arrival_times = []
+class ChronosBridge(StratumServer):
+    """
+    Timing bridge on the shared asyncio Stratum core: reads are readiness
+    driven (no polling), so arrival_ns is taken as soon as the kernel has the
+    bytes. Hardware commands from the API wake a dedicated worker through a
+    queue instead of being polled for by the receive loop.
+    The API (4029) serves every client concurrently; after KEEPALIVE a
+    connection stays open with length-prefixed replies, and the ':BIN'
+    command variants answer with raw 32-byte hashes and packed metric rows
+    (see core/chronos_client.py) instead of hex strings in JSON.
+    """
+    job_interval = None # Un solo job por semilla, enviado al autorizar
+    read_size = 4096
+    api_commands = API_COMMANDS
+    default_command = "UNKNOWN"
+    kernel_timestamps = KERNEL_TIMESTAMPS
+
+    def __init__(self, journal_dir=JOURNAL_DIR, replay_dir=REPLAY_DIR, replay_speed=REPLAY_SPEED,
+                 history_dir=HISTORY_DIR):
+        self.rhythm = RhythmAnalyzer(RHYTHM_WINDOWS) # CV/entropía incrementales, O(1) por share
+        self.arrivals = 0
         self.current_seed = "CHRONOS_BASELINE"
-        self.pending_voltage = None
-        self.pending_frequency = None # NEW: Track pending frequency changes
+        # Telemetría AxeOS compartida: conexiones keep-alive, sondeo adaptativo, lecturas en caché
+        self.telemetry = TelemetryHub()
+        # SET_FREQUENCY / SET_VOLTAGE: un worker aparte fusiona lo pendiente en un PATCH y un reinicio
+        self.hardware = HardwareControl(lambda: self.miner_ip, self.hardware_baseline,
+                                        lambda: self.share_counter, telemetry=self.telemetry)
         # Expanded Metrics
         self.last_metrics = {
             "cv": 1.0, "time_entropy": 0.0, "timestamp": 0,
-            "voltage": 0, "power": 0, "temp": 0, "freq": 0, "hashrate": 0
+            "voltage": 0, "power": 0, "temp": 0, "freq": 0, "hashrate": 0,
+            "rhythm": {} # Por ventana: {"n", "mean_ms", "cv", "entropy"}
         }
+        # Cada actualización de last_metrics queda registrada (columnas con timestamp)
+        self.history = MetricsHistory(HISTORY_FIELDS, HISTORY_CAPACITY, history_dir, prefix="chronos")
         self.miner_ip = None # Store for HTTP Control
-        self.extranonce1 = "08000002"
         self.current_job_ctx = {}
-        self.recent_hashes = []
-        self.hash_lock = threading.Lock()
-        print(f"⏳ CHRONOS LISTENER OPENED on {HOST_IP}:{PORT}")
+        self.job_hasher = None # Cached merkle roots for the current job
+        self.template = None # mining.notify pre-serializado para current_seed
+        self.template_seed = None
+        # Broadcast log: every reader keeps its own cursor (READ_FROM),
+        # GET_RECENT_HASHES keeps its legacy destructive semantics.
+        self.recent_hashes = EntropyRing(HASH_LOG_CAPACITY)
+        self.journal = ShareJournal(journal_dir) if journal_dir else None
+        self.replay = JournalReplay(replay_dir, speed=replay_speed) if replay_dir else None
+        self.verbose = True # Salida por share/ventana (se apaga al reproducir a máxima velocidad)
+        self.bad_commands = 0 # Comandos del API con argumentos mal formados (respondidos con BAD_CMD)
+        super().__init__(HOST_IP, PORT, API_PORT, METRICS_PORT, DIFFICULTY, FLUSH_POLICY,
+                         metrics_prefix="chronos_", extranonce1_base=EXTRANONCE1_BASE)
 
-        # Start Threads
-        threading.Thread(target=self.api_server, daemon=True).start()
-        threading.Thread(target=self.telemetry_loop, daemon=True).start()
+    def build_metrics(self, m):
+        m = super().build_metrics(m)
+        m.counter("hashes_overwritten_total", "Hashes overwritten in the log before being read", lambda: self.recent_hashes.overwritten)
+        m.counter("journal_records_total", "Shares appended to the journal", lambda: self.journal.records if self.journal else 0)
+        m.counter("journal_errors_total", "Shares not journaled (malformed or out-of-range fields)", lambda: self.journal.errors if self.journal else 0)
+        m.counter("api_bad_commands_total", "API commands rejected for malformed arguments", lambda: self.bad_commands)
+        m.gauge("buffer_depth", "Hashes currently held in the log", lambda: len(self.recent_hashes))
+        m.counter("history_rows_total", "Metric snapshots recorded for GET_METRICS_RANGE / SINCE", lambda: self.history.seq)
+        m.gauge("hardware_commands_pending", "SET_VOLTAGE / SET_FREQUENCY commands not yet applied", lambda: self.hardware.queue.qsize())
+        m.counter("hardware_restarts_total", "Miner restarts issued (one per merged batch)", lambda: self.hardware.restarts)
+        m.counter("hardware_requests_merged_total", "Hardware requests folded into another request's restart", lambda: self.hardware.merged)
+        m.gauge("hardware_last_settle_seconds", "Restart to new settings confirmed and shares flowing", lambda: self.hardware.last_settle or 0)
+        m.counter("telemetry_polls_total", "AxeOS telemetry readings", lambda: self.telemetry.polls)
+        m.counter("telemetry_errors_total", "AxeOS telemetry polls that failed", lambda: self.telemetry.errors)
+        for key in ("cv", "time_entropy", "voltage", "power", "temp", "freq", "hashrate"):
+            m.gauge(f"miner_{key}", f"last_metrics['{key}']", lambda key=key: self.last_metrics.get(key, 0))
+        m.gauge("rhythm_cv", "Inter-arrival CV per sliding window (shares)", lambda: [
+            ({"window": w.size}, w.cv()) for w in self.rhythm.windows])
+        m.gauge("rhythm_entropy", "Log-binned inter-arrival entropy (nats) per sliding window", lambda: [
+            ({"window": w.size}, w.entropy()) for w in self.rhythm.windows])
+        return m
 
-    def telemetry_loop(self):
+    async def telemetry_loop(self):
+        # Las lecturas llegan por on_telemetry (TelemetryHub); aquí solo se vuelca a disco
         print("📊 TELEMETRY ENGINE STARTED")
         while True:
-            time.sleep(3)
-            if not self.miner_ip: continue
-            
-            try:
-                url = f"http://{self.miner_ip}/api/system/info"
-                with urllib.request.urlopen(url, timeout=2) as response:
-                    data = json.loads(response.read().decode())
-                    
-                    # Update Metrics
-                    v = data.get('coreVoltageActual', 0)
-                    if v == 0: v = data.get('coreVoltage', 0) # Fallback
-                    
-                    self.last_metrics["voltage"] = v
-                    self.last_metrics["power"] = data.get('power', 0)
-                    self.last_metrics["temp"] = data.get('temp', 0)
-                    self.last_metrics["freq"] = data.get('frequency', 0)
-                    self.last_metrics["hashrate"] = data.get('hashRate', 0)
-                    
-                    # PRINT STATUS LINE
-                    print(f"   📊 [{self.miner_ip}] "
-                          f"🌡️ {self.last_metrics['temp']}°C | "
-                          f"⚡ {self.last_metrics['power']}W | "
-                          f"🔋 {self.last_metrics['voltage']}mV | "
-                          f"🧠 {self.last_metrics['freq']}MHz | "
-                          f"⛏️ {self.last_metrics['hashrate']} GH/s"
-                          )
-            except Exception as e:
-                # print(f"   ⚠️ Telemetry Error: {e}") 
-                pass
+            await asyncio.sleep(3)
+            if self.journal: self.journal.flush()
+            self.history.flush()
 
-    def set_hardware_params(self, freq=None, vol=None):
-        # HARDWARE MODULATION via HTTP (AxeOS/LuckyMiner)
-        if not self.miner_ip:
-            print("⚠️ DISCARDING COMMAND: No Miner IP known yet.")
-            return
+    def on_telemetry(self, ip, data):
+        # Update Metrics
+        v = data.get('coreVoltageActual', 0)
+        if v == 0: v = data.get('coreVoltage', 0) # Fallback
 
+        self.last_metrics["voltage"] = v
+        self.last_metrics["power"] = data.get('power', 0)
+        self.last_metrics["temp"] = data.get('temp', 0)
+        self.last_metrics["freq"] = data.get('frequency', 0)
+        self.last_metrics["hashrate"] = data.get('hashRate', 0)
+        self.record_metrics()
+
+        # PRINT STATUS LINE
+        print(f"   📊 [{ip}] "
+              f"🌡️ {self.last_metrics['temp']}°C | "
+              f"⚡ {self.last_metrics['power']}W | "
+              f"🔋 {self.last_metrics['voltage']}mV | "
+              f"🧠 {self.last_metrics['freq']}MHz | "
+              f"⛏️ {self.last_metrics['hashrate']} GH/s"
+              )
+
+    def hardware_baseline(self):
+        # Current stats as baseline for the PATCH; without telemetry yet the
+        # knob is left out rather than sent as 0
+        baseline = {"frequency": self.last_metrics.get("freq"), "volts": self.last_metrics.get("voltage")}
+        return {k: v for k, v in baseline.items() if v}
+
+    async def api_command(self, data):
+        # Un argumento mal formado responde BAD_CMD en vez de cerrar la conexión KEEPALIVE
         try:
-            # Current stats as baseline
-            payload = {
-                "frequency": self.last_metrics.get("freq", 400),
-                "volts": self.last_metrics.get("voltage", 1000)
-            }
-            
-            if freq: payload["frequency"] = int(freq)
-            if vol: payload["volts"] = int(vol)
-            
-            url = f"http://{self.miner_ip}/api/system"
-            print(f"💊 HTTP PATCH {url} -> {payload}")
-            
-            js_data = json.dumps(payload).encode('utf-8')
-            req = urllib.request.Request(url, data=js_data, method='PATCH')
-            req.add_header('Content-Type', 'application/json')
-            
-            with urllib.request.urlopen(req, timeout=5) as response:
-                print(f"   ✅ HARDWARE CONFIG UPDATED: {response.getcode()}")
-            
-            # TRIGGER RESTART (Required for Frequency/Voltage PLLs)
-            print("   🔄 RESTARTING MINER TO APPLY CHANGES...")
-            restart_url = f"http://{self.miner_ip}/api/system/restart"
-            req_restart = urllib.request.Request(restart_url, data=b"{}", method='POST')
-            req_restart.add_header('Content-Type', 'application/json')
-            try:
-                urllib.request.urlopen(req_restart, timeout=5)
-            except: pass 
-                
-        except Exception as e:
-            print(f"   ❌ HTTP ERROR: {e}")
-
-    def api_server(self):
-        # ... (Legacy API code)
-        api_sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        api_sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-        api_sock.bind(("0.0.0.0", 4029))
-        api_sock.listen(5)
-        print("🔗 API LISTENING on 4029")
-        
-        while True:
-            try:
-                conn, _ = api_sock.accept()
-                data = conn.recv(1024).decode().strip()
-                
-                if data == "GET_METRICS":
-                    conn.send(json.dumps(self.last_metrics).encode())
-                elif data == "GET_RECENT_HASHES":
-                    with self.hash_lock:
-                        # Send as hex strings
-                        hex_hashes = [binascii.hexlify(h).decode() for h in self.recent_hashes]
-                        conn.send(json.dumps(hex_hashes).encode())
-                        self.recent_hashes = [] # Clear after fetch (Packet mode)
-                elif data.startswith("SEED:"):
-                    self.current_seed = data.split(":", 1)[1]
-                    print(f"\n🌱 SEED CHANGED: {self.current_seed}")
-                    conn.send(b"OK")
-                elif data.startswith("SET_VOLTAGE:"):
-                    vol = int(data.split(":")[1])
-                    self.pending_voltage = vol
-                    conn.send(b"OK")
-                elif data.startswith("SET_FREQUENCY:"):
-                    freq = int(data.split(":")[1])
-                    self.pending_frequency = freq
-                    print(f"🧠 PENDING FREQUENCY CHANGE: {freq} MHz")
-                    conn.send(b"OK")
-                else:
-                    conn.send(b"UNKNOWN_CMD")
-                conn.close()
-            except: pass
-
-    def handle_client(self, conn, addr):
-        self.miner_ip = addr[0]
-        print(f"⚡ ASIC CONNECTED: {self.miner_ip}")
-
-        buffer = ""
-        # Note: self.pending_voltage is now initialized in __init__
+            return await self.command_response(data)
+        except (ValueError, IndexError):
+            self.bad_commands += 1
+            return [b"BAD_CMD"]
 
-        while True:
-            # CHECK FOR PENDING HARDWARE DOSING
-            if self.pending_voltage is not None:
-                self.set_hardware_params(vol=self.pending_voltage)
-                self.pending_voltage = None
-            
-            if self.pending_frequency is not None:
-                self.set_hardware_params(freq=self.pending_frequency)
-                self.pending_frequency = None
-            
-            # Non-blocking receive
+    async def command_response(self, data):
+        # Respuesta (lista de buffers) a un comando de texto del API
+        if data.startswith("HW_WAIT:"):
+            # Long-poll: HW_WAIT:<id>[:timeout_ms] responde cuando la petición termina (o vence el plazo)
+            parts = data.split(":")
+            request = self.hardware.get(int(parts[1]))
+            if request is None: return [b"UNKNOWN_ID"]
+            timeout = min(max(int(parts[2]), 0), HW_WAIT_MAX_MS) / 1000 if len(parts) > 2 else None
             try:
-                conn.setblocking(0)
-                try:
-                    data = conn.recv(4096)
-                    if not data: break
-                except BlockingIOError:
-                    time.sleep(0.01)
-                    continue
-                except: break
-                
-                conn.setblocking(1)
-                
-                arrival_ns = time.time_ns() 
-                
-                buffer += data.decode('utf-8', errors='ignore')
-                while '\n' in buffer:
-                    msg_str, buffer = buffer.split('\n', 1)
-                    if not msg_str.strip(): continue
-                    try:
-                        self.process_message(json.loads(msg_str), conn, arrival_ns)
-                    except: pass
-            except: break
-
-    def process_message(self, msg, conn, timestamp):
-        method = msg.get('method')
-        msg_id = msg.get('id')
-
-        if method == 'mining.subscribe':
-            resp = {"id": msg_id, "result": [[["mining.set_difficulty", "1"], ["mining.notify", "1"]], "08000002", 4], "error": None}
-            self.send_json(conn, resp)
-
-        elif method == 'mining.authorize':
-            resp = {"id": msg_id, "result": True, "error": None}
-            self.send_json(conn, resp)
-            self.set_difficulty(conn, DIFFICULTY)
-            self.set_frequency(conn, 400) # WAKE UP CALL
-            self.send_job(conn)
-
-        elif method == 'mining.submit':
-            # Reconstruction for "Honest" Data
-            params = msg.get('params', [])
-            if len(params) >= 5:
-                en2 = params[2]
-                ntime = params[3]
-                nonce = params[4]
-                h = self.calculate_hash(en2, ntime, nonce)
-                if h:
-                    with self.hash_lock:
-                        self.recent_hashes.append(h)
-                        if len(self.recent_hashes) > 100: # Limit buffer
-                            self.recent_hashes.pop(0)
-
-            # GUARDAR SOLO EL TIEMPO
-            self.arrival_times.append(timestamp)
-            print(".", end="", flush=True) # Feedback visual
-            
-            # Análisis en tiempo real (Ventana de 10 eventos)
-            if len(self.arrival_times) > 10:
-                print("") # Nueva linea
-                self.analyze_rhythm()
-                self.arrival_times = [] # Reset ventana
+                await asyncio.wait_for(request.done.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+            return [json.dumps(request.summary()).encode()]
+        if data == "GET_RECENT_HASHES:BIN":
+            # Mismo vaciado que GET_RECENT_HASHES, hashes crudos de 32 bytes
+            raw = b"".join(self.recent_hashes.pop_burst(len(self.recent_hashes)))
+            return [raw[-RECENT_HASHES * 32:]]
+        if data.startswith("READ_FROM:") and data.endswith(":BIN"):
+            # READ_FROM:<seq>:<n>:BIN -> cabecera (seq, perdidos) + hashes crudos, sin copias
+            _, seq, n, _ = data.split(":")
+            start, views, lost = self.recent_hashes.read_from(max(0, int(seq)), min(max(int(n), 0), READ_MAX))
+            return [READ_FROM_HEADER.pack(start, lost)] + views
+        return [self.api_response(data)]
 
-            resp = {"id": msg_id, "result": True, "error": None}
-            self.send_json(conn, resp)
+    def api_response(self, data):
+        # Respuesta (bytes) a un comando de texto del API
+        if data == "GET_METRICS":
+            return json.dumps(self.last_metrics).encode()
+        elif data == "GET_METRICS:BIN":
+            # Una fila empaquetada (formato en METRICS_LAYOUT); su seq sirve para continuar con SINCE
+            return self.history.pack(self.metrics_row())
+        elif data == "METRICS_LAYOUT":
+            return json.dumps(self.history.layout()).encode()
+        elif data.startswith("GET_METRICS_RANGE:"):
+            # Serie completa entre dos instantes (segundos Unix): GET_METRICS_RANGE:<t0>:<t1>[:BIN]
+            parts = data.split(":")
+            rows = self.history.between(float(parts[1]), float(parts[2]))
+            return b"".join(self.history.encode(rows, binary=parts[3:4] == ["BIN"]))
+        elif data.startswith("SINCE:"):
+            # Todo lo registrado desde un número de secuencia: SINCE:<seq>[:BIN]; "next" continúa
+            parts = data.split(":")
+            rows = self.history.since(int(parts[1]))
+            return b"".join(self.history.encode(rows, binary=parts[2:3] == ["BIN"]))
+        elif data == "GET_RECENT_HASHES":
+            # Clear after fetch (Packet mode): only the newest N are returned
+            raw = b"".join(self.recent_hashes.pop_burst(len(self.recent_hashes)))
+            raw = raw[-RECENT_HASHES * 32:]
+            # Send as hex strings
+            hex_hashes = [binascii.hexlify(raw[i:i+32]).decode() for i in range(0, len(raw), 32)]
+            return json.dumps(hex_hashes).encode()
+        elif data.startswith("READ_FROM:"):
+            # Non-destructive cursor read: READ_FROM:<seq>:<n>
+            _, seq, n = data.split(":")
+            start, views, lost = self.recent_hashes.read_from(max(0, int(seq)), min(max(int(n), 0), READ_MAX))
+            raw = b"".join(views)
+            hex_hashes = [binascii.hexlify(raw[i:i+32]).decode() for i in range(0, len(raw), 32)]
+            return json.dumps({
+                "seq": start, "next": start + len(hex_hashes),
+                "lost": lost, "hashes": hex_hashes
+            }).encode()
+        elif data.startswith("SEED:"):
+            self.current_seed = data.split(":", 1)[1]
+            print(f"\n🌱 SEED CHANGED: {self.current_seed}")
+            self.telemetry.boost(seconds=TELEMETRY_BOOST_S)
+            return b"OK"
+        elif data.startswith("SET_VOLTAGE:"):
+            vol = int(data.split(":")[1])
+            request = self.hardware.submit(vol=vol)
+            self.telemetry.boost(seconds=TELEMETRY_BOOST_S)
+            print(f"🔋 PENDING VOLTAGE CHANGE: {vol} mV (#{request.id})")
+            return f"OK:{request.id}".encode()
+        elif data.startswith("SET_FREQUENCY:"):
+            freq = int(data.split(":")[1])
+            request = self.hardware.submit(freq=freq)
+            self.telemetry.boost(seconds=TELEMETRY_BOOST_S)
+            print(f"🧠 PENDING FREQUENCY CHANGE: {freq} MHz (#{request.id})")
+            return f"OK:{request.id}".encode()
+        elif data == "HW_STATUS" or data.startswith("HW_STATUS:"):
+            # Estado del worker, o de una petición: HW_STATUS[:<id>] (applied_at, settle_s, batch...)
+            if data == "HW_STATUS":
+                return json.dumps(self.hardware.status()).encode()
+            request = self.hardware.get(int(data.split(":")[1]))
+            return json.dumps(request.summary()).encode() if request else b"UNKNOWN_ID"
+        elif data == "TELEMETRY_BOOST" or data.startswith("TELEMETRY_BOOST:"):
+            # Experimento de modulación: TELEMETRY_BOOST[:<s>] sondea rápido durante s segundos
+            seconds = float(data.split(":")[1]) if ":" in data else TELEMETRY_BOOST_S
+            self.telemetry.boost(seconds=seconds)
+            return b"OK"
+        return b"UNKNOWN_CMD"
 
-    def analyze_rhythm(self):
-        # Calcular Deltas (Tiempo entre 'spikes')
-        times = np.array(self.arrival_times)
-        deltas = np.diff(times) # Nanosegundos entre hits
-        
-        # 1. Burstiness (Coeficiente de Variación)
-        # Si CV > 1, el minero está "pensando a ráfagas" (Estructura)
-        # Si CV ~ 1, es proceso de Poisson (Aleatorio puro)
-        mean_delta = np.mean(deltas)
-        std_delta = np.std(deltas)
-        cv = std_delta / mean_delta if mean_delta > 0 else 0
+    async def on_connect(self, writer, session):
+        if session.ip != self.miner_ip:
+            if self.miner_ip: self.telemetry.unwatch(self.miner_ip, self.on_telemetry)
+            self.telemetry.watch(session.ip, self.on_telemetry)
+        self.miner_ip = session.ip
+
+    async def on_authorize(self, writer, session):
+        await self.send_notif(writer, "mining.set_difficulty", [DIFFICULTY])
+        await self.set_frequency(writer, 400) # WAKE UP CALL
+        await self.send_job(writer)
+
+    async def on_submit(self, writer, session, params, timestamp):
+        # Reconstruction for "Honest" Data
+        # timestamp: time.time_ns() en cuanto el socket está listo (sin sondeo).
+        # Con KERNEL_TIMESTAMPS la llegada es la hora del kernel del paquete que
+        # completó la línea: sin retrasos de planificación ni del GIL.
+        arrival = session.kernel_ns or timestamp
+        if len(params) >= 5:
+            en2 = params[2]
+            ntime = params[3]
+            nonce = params[4]
+            version_bits = params[5] if len(params) >= 6 else None # mining.configure concede version rolling
+            h = self.calculate_hash(session.extranonce1, en2, ntime, nonce, version_bits)
+            if h and self.journal:
+                self.journal.append(session.miner_id, self.current_job_id, en2, ntime, nonce, h,
+                                    version_bits=version_bits, ts_ns=arrival, rx_ns=timestamp)
+        else:
+            h = None
+        self.capture(h, arrival)
+        return True
+
+    def capture(self, h, timestamp):
+        # Camino común de shares en vivo y reproducidos
+        if h:
+            self.recent_hashes.push(h)
+
+        # GUARDAR SOLO EL TIEMPO: cada llegada actualiza todas las ventanas
+        self.rhythm.add(timestamp)
+        self.arrivals += 1
+        if self.verbose: print(".", end="", flush=True) # Feedback visual
         
-        # 2. Entropía Temporal
-        # Histograma de tiempos de espera
-        hist, _ = np.histogram(deltas, bins=10)
-        prob = hist / np.sum(hist)
-        time_entropy = entropy(prob)
+        if self.arrivals % RHYTHM_REPORT == 0:
+            if self.verbose: print("") # Nueva linea
+            self.analyze_rhythm()
+
+    async def replay_loop(self):
+        # Fuente offline: los timestamps originales del journal alimentan analyze_rhythm,
+        # así el resultado es el mismo a cualquier velocidad
+        speed = f"{self.replay.speed}x" if self.replay.speed else "máxima velocidad"
+        print(f"📼 REPRODUCIENDO {self.replay.total} SHARES GRABADOS ({speed})")
+        self.verbose = bool(self.replay.speed)
+        started = time.time()
+        async for chunk in self.replay.chunks():
+            for h, ts in zip(chunk["hash"], chunk["ts_ns"]):
+                self.share_counter += 1
+                self.capture(h.tobytes(), int(ts))
+        self.verbose = True
+        print(f"📼 REPRODUCCIÓN TERMINADA: {self.replay.replayed} shares en {time.time() - started:.2f}s")
+
+    def analyze_rhythm(self):
+        # Publica el estado del analizador incremental (no recalcula nada)
+        windows = self.rhythm.windows
+        full = [w for w in windows if w.n == w.size]
+        stable = full[-1] if full else windows[0] # La ventana llena más larga
 
         # UPDATE METRICS (Merge with telemetry)
+        # cv / time_entropy: cálculo legacy, comparable con los informes anteriores
+        cv, time_entropy = self.legacy_rhythm()
         self.last_metrics.update({
-            "cv": float(cv),
-            "time_entropy": float(time_entropy),
+            "cv": cv,
+            "time_entropy": time_entropy,
+            "rhythm": self.rhythm.summary(),
             "timestamp": time.time()
         })
+        self.record_metrics()
 
-        print(f"📊 RITMO: CV={cv:.4f} | Entropía Temporal={time_entropy:.4f}")
+        if not self.verbose: return
+        cvs = " ".join(f"CV[{w.size}]={w.cv():.4f}" for w in windows if w.n)
+        print(f"📊 RITMO: CV={cv:.4f} | Entropía Temporal={time_entropy:.4f} | {cvs} | Entropía log[{stable.size}]={stable.entropy():.4f}")
         
-        if cv > 1.1:
+        # 1. Burstiness (Coeficiente de Variación)
+        # Si CV > 1, el minero está "pensando a ráfagas" (Estructura)
+        # Si CV ~ 1, es proceso de Poisson (Aleatorio puro)
+        if stable.cv() > 1.1:
             print("🚀 DETECTADA ACTIVIDAD NO-POISSONIANA (Estructura Temporal)")
 
-    def set_difficulty(self, conn, diff):
-        self.send_json(conn, {"id": None, "method": "mining.set_difficulty", "params": [diff]})
+    def legacy_rhythm(self):
+        # Calcular Deltas (Tiempo entre 'spikes'): los últimos LEGACY_INTERVALS intervalos
+        deltas = np.array(self.rhythm.recent(LEGACY_INTERVALS))
+        if len(deltas) == 0: return 0.0, 0.0
 
-    def send_job(self, conn):
-        job_id = "chronos_job"
-        coinbase = binascii.hexlify(f"{self.current_seed}-{time.time()}".encode()).decode()
-        
-        # Store for hash reconstruction
-        self.current_job_ctx = {
-            "version": "20000000",
-            "prevhash": "0" * 64,
-            "coinb1": coinbase,
-            "coinb2": "0000",
-            "nbits": "1d00ffff",
-        }
+        # 1. Burstiness (Coeficiente de Variación)
+        mean_delta = np.mean(deltas)
+        cv = np.std(deltas) / mean_delta if mean_delta > 0 else 0
+
+        # 2. Entropía Temporal: histograma de tiempos de espera (10 bins lineales)
+        hist, _ = np.histogram(deltas, bins=10)
+        prob = hist[hist > 0] / np.sum(hist)
+        return float(cv), float(max(0.0, -np.sum(prob * np.log(prob))))
+
+    def metrics_row(self):
+        # Fila plana: last_metrics + contador de shares + cv/entropía por ventana
+        row = dict(self.last_metrics, shares=self.share_counter)
+        for w in self.rhythm.windows:
+            row[f"cv_{w.size}"], row[f"entropy_{w.size}"] = w.cv(), w.entropy()
+        return row
 
-        msg = {
-            "params": [
-                job_id, 
+    def record_metrics(self):
+        self.history.record(self.metrics_row())
+
+    def next_job(self):
+        job_id = "chronos_job"
+        self.current_job_id = job_id
+        # El payload se serializa una vez por semilla; por envío solo cambia nTime
+        if self.template is None or self.template_seed != self.current_seed:
+            coinbase = binascii.hexlify(f"{self.current_seed}-{time.time()}".encode()).decode()
+            
+            # Store for hash reconstruction
+            self.current_job_ctx = {
+                "version": "20000000",
+                "prevhash": "0" * 64,
+                "coinb1": coinbase,
+                "coinb2": "0000",
+                "nbits": "1d00ffff",
+            }
+            self.template = NotifyTemplate(
                 self.current_job_ctx["prevhash"], 
                 self.current_job_ctx["coinb1"], 
                 self.current_job_ctx["coinb2"], 
                 [], 
                 self.current_job_ctx["version"], 
-                self.current_job_ctx["nbits"], 
-                hex(int(time.time()))[2:], 
-                True
-            ],
-            "id": None, "method": "mining.notify"
-        }
-        self.send_json(conn, msg)
+                self.current_job_ctx["nbits"]
+            )
+            self.job_hasher = JobHasher(
+                job_id, self.current_job_ctx["prevhash"], self.current_job_ctx["coinb1"],
+                self.current_job_ctx["coinb2"], [], self.current_job_ctx["version"], self.current_job_ctx["nbits"]
+            )
+            self.template_seed = self.current_seed
+
+        self.job_counter += 1
+        return self.template.render(job_id)
 
-    def calculate_hash(self, en2_hex, ntime_hex, nonce_hex):
+    def calculate_hash(self, extranonce1, en2_hex, ntime_hex, nonce_hex, version_bits=None):
         try:
-            if not self.current_job_ctx: return None
+            if not self.job_hasher: return None
             
-            # 1. Coinbase Transaction hash (Merkle Root if branch is empty)
-            coinbase_hex = self.current_job_ctx["coinb1"] + self.extranonce1 + en2_hex + self.current_job_ctx["coinb2"]
-            coinbase_bin = binascii.unhexlify(coinbase_hex)
-            merkle_root = hashlib.sha256(hashlib.sha256(coinbase_bin).digest()).digest()
-
-            # 2. Block Header (80 bytes)
-            # Reversing components as per Bitcoin Stratum V1 spec
-            header = (
-                binascii.unhexlify(self.current_job_ctx["version"])[::-1] +
-                binascii.unhexlify(self.current_job_ctx["prevhash"])[::-1] +
-                merkle_root +
-                binascii.unhexlify(ntime_hex)[::-1] +
-                binascii.unhexlify(self.current_job_ctx["nbits"])[::-1] +
-                binascii.unhexlify(nonce_hex)[::-1]
-            )
-            
-            # 3. Double SHA256
-            final_hash = hashlib.sha256(hashlib.sha256(header).digest()).digest()
-            return final_hash[::-1] # Standard LE display
+            # Block Header (80 bytes), reversed components as per Bitcoin Stratum V1 spec.
+            # The merkle root and the midstate of the first 64 header bytes are cached per
+            # (extranonce1, extranonce2); a rolled version (6th submit param) changes the
+            # first block, so those shares hash the full header.
+            return self.job_hasher.share_hash(extranonce1, en2_hex, ntime_hex, nonce_hex, version_bits) # Standard LE display
         except Exception as e:
             # print(f"DEBUG HASH ERROR: {e}")
             return None
 
-    def send_json(self, conn, data):
-        conn.sendall((json.dumps(data) + '\n').encode())
-
-    def start(self):
-        while True:
-            conn, addr = self.sock.accept()
-            threading.Thread(target=self.handle_client, args=(conn, addr)).start()
-
-    def set_frequency(self, conn, freq):
+    async def set_frequency(self, writer, freq):
         # Universal Driver Wake Up Packet
         # Sends a frequency command to force the chip out of sleep
         print(f"⚡ SENDING WAKE-UP SIGNAL: {freq}MHz")
-        self.send_json(conn, {"id": None, "method": "mining.set_frequency", "params": [str(freq)]})
+        await self.send_notif(writer, "mining.set_frequency", [str(freq)])
+
+    def background_tasks(self):
+        # API (4029) y métricas vienen del core
+        tasks = [self.telemetry_loop(), self.hardware.run()] + super().background_tasks()
+        if self.replay: tasks.append(self.replay_loop())
+        return tasks
+
+    async def start(self):
+        print(f"⏳ CHRONOS LISTENER OPENED on {HOST_IP}:{PORT}")
+        await super().start()
 
 if __name__ == "__main__":
     bridge = ChronosBridge()
-    bridge.start()
+    try:
+        asyncio.run(bridge.start())
+    except KeyboardInterrupt:
+        print("🛑 CHRONOS DETENIDO")
+    finally:
+        if bridge.journal: bridge.journal.close()
+        bridge.history.close()
@@ -7,6 +7,7 @@ import numpy as np
 BRIDGE_IP = "127.0.0.1"
 BRIDGE_PORT = 4029
 OPTIMAL_FREQ = 500  # Based on previous results (Crystal State)
+RHYTHM_WINDOW = "1000"  # Bridge sliding window (shares) to read CV/entropy from; None = legacy 10-share values
 
 def send_cmd(cmd):
     try:
@@ -34,8 +35,12 @@ def monitor_persistence(duration, label):
     while time.time() - start_time < duration:
         m = get_metrics()
         if m:
-            cv = m.get("cv", 1.0)
-            ent = m.get("time_entropy", 0)
+            window = m.get("rhythm", {}).get(RHYTHM_WINDOW) if RHYTHM_WINDOW else None
+            if window and window.get("n"):
+                cv, ent = window["cv"], window["entropy"]
+            else: # Older bridge, or window still empty
+                cv = m.get("cv", 1.0)
+                ent = m.get("time_entropy", 0)
             data.append((cv, ent))
             print(f"   ⏱️ {int(time.time()-start_time):>3}s | CV: {cv:.4f} | Entropy: {ent:.4f}", end="\r")
         time.sleep(5)
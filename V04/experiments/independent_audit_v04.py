@@ -1,17 +1,20 @@
-import urllib.request
 import json
 import time
 import socket
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from holographic_reservoir.core.axeos_client import shared_client
 
 # CONFIGURATION
 MINER_IP = "192.168.0.15"  
 BRIDGE_API_PORT = 4029
 
 def get_miner_ground_truth():
-    url = f"http://{MINER_IP}/api/system/info"
+    # Fresh reading (not a cached one) over the shared keep-alive client
     try:
-        with urllib.request.urlopen(url, timeout=3) as response:
-            return json.loads(response.read().decode())
+        return shared_client().info(MINER_IP, timeout=3)
     except Exception as e:
         return {"error": str(e)}
 
@@ -1,11 +1,15 @@
 import socket
-import json
 import time
 import binascii
 import hashlib
 import statistics
 import math
 import numpy as np
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from holographic_reservoir.core.chronos_client import ChronosClient
 
 # --- CONFIGURATION ---
 BRIDGE_IP = "127.0.0.1"
@@ -119,15 +123,18 @@ def run_experiment_replication():
         # 2. REAL HARDWARE (LV06)
         print(f"   [LV06] Injecting Seed and waiting {WAIT_TIME}s for physical entropy...")
         bridge_cmd(f"SEED: {seed}")
-        # Clear previous hashes first
-        bridge_cmd("GET_RECENT_HASHES")
+        # Clear previous hashes first (raw 32-byte hashes over one persistent connection)
+        client = ChronosClient.shared(BRIDGE_IP, BRIDGE_PORT)
+        try:
+            client.recent_hashes()
+        except OSError:
+            pass
         
         time.sleep(WAIT_TIME)
         
-        resp = bridge_cmd("GET_RECENT_HASHES")
         try:
-            real_hashes = json.loads(resp)
-        except:
+            real_hashes = client.recent_hashes()
+        except OSError:
             real_hashes = []
             
         real_metrics = layer.process_batch(real_hashes)
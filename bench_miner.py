@@ -4,6 +4,8 @@ import time
 import threading
 from collections import deque
 
+from holographic_reservoir.core.stratum_framing import LineFramer
+
 HOST_IP = "0.0.0.0"
 PORT = 3333
 
@@ -17,25 +19,24 @@ class BenchmarkServer:
         self.share_times = deque()
         self.start_time = None
         self.running = True
+        self.framer = LineFramer()
 
     def handle_client(self, conn, addr):
         print(f"✅ BENCHMARK: Connected to {addr}")
         self.client_conn = conn
         self.start_time = time.time()
+        # Carries partial lines across recv() calls (a share split over two
+        # packets used to be dropped) and counts lines that fail to parse
+        self.framer = LineFramer()
         
         while self.running:
             try:
                 data = conn.recv(1024)
                 if not data: break
                 
-                messages = data.decode().split('\n')
-                for msg in messages:
-                    if not msg: continue
-                    # print(f"DEBUG: {msg[:100]}...") # Log incoming
-                    try:
-                        self.process_message(json.loads(msg), conn)
-                    except json.JSONDecodeError:
-                        pass
+                for msg in self.framer.messages(data):
+                    # print(f"DEBUG: {msg}") # Log incoming
+                    self.process_message(msg, conn)
             except Exception as e:
                 print(f"❌ Connection error: {e}")
                 break
@@ -160,6 +161,7 @@ class BenchmarkServer:
         print(f"Duration:          {duration:.2f} s")
         print(f"Speed:             {sps:.2f} Shares/sec")
         print(f"Est. Throughput:   {hashrate_ghs:.2f} GH/s")
+        print(f"Malformed Lines:   {self.framer.malformed}")
         print("="*40 + "\n")
 
 if __name__ == "__main__":
@@ -1,9 +1,8 @@
 import socket
 import time
-import json
-import urllib.request
 import statistics
 import threading
+from holographic_reservoir.core.axeos_client import shared_client
 
 # Config
 DRIVER_IP = "127.0.0.1"
@@ -21,11 +20,10 @@ class Benchmark:
     def poll_telemetry(self):
         while self.running:
             try:
-                url = f"http://{MINER_IP}/api/system/info"
-                with urllib.request.urlopen(url, timeout=2) as response:
-                    data = json.loads(response.read())
-                    self.power_readings.append(data.get('power', 0))
-                    self.temp_readings.append(data.get('temp', 0))
+                # Keep-alive connection: no TCP handshake per reading
+                data = shared_client().info(MINER_IP)
+                self.power_readings.append(data.get('power', 0))
+                self.temp_readings.append(data.get('temp', 0))
             except:
                 pass
             time.sleep(1)
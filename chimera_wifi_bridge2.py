@@ -1,7 +1,8 @@
 import socket
 import json
 import threading
-import time
+
+from holographic_reservoir.core.job_template import NotifyTemplate
 
 # CONFIGURACIÓN
 HOST_IP = "0.0.0.0" 
@@ -14,6 +15,15 @@ class ChimeraStratumServerV2:
         self.sock.bind((HOST_IP, PORT))
         self.sock.listen(5)
         self.current_seed = "a" * 64 # Semilla de ejemplo
+        # mining.notify pre-serializado: por envío solo se inserta job_id y nTime
+        self.template = NotifyTemplate(
+            "0" * 64, # PrevHash
+            self.current_seed, # Coinb1
+            "0" * 64, # Coinb2
+            [],       # Merkle Branch
+            "20000000", # Version
+            "1d00ffff", # nBits
+        )
         print(f"\n🔥🔥 CHIMERA BRIDGE V2 (MODO DEPURACIÓN) 🔥🔥")
         print(f"Escuchando en puerto {PORT}...")
         print("Esperando a que el Sistema Límbico (ASIC) se conecte...\n")
@@ -98,24 +108,11 @@ class ChimeraStratumServerV2:
 
     def send_job(self, conn):
         job_id = "job_1"
-        coinbase = self.current_seed 
         # Merkle Root falso pero válido estructuralmente
-        msg = {
-            "params": [
-                job_id,
-                "0" * 64, # PrevHash
-                coinbase, # Coinb1
-                "0" * 64, # Coinb2
-                [],       # Merkle Branch
-                "20000000", # Version
-                "1d00ffff", # nBits
-                hex(int(time.time()))[2:], # nTime
-                True
-            ],
-            "id": None,
-            "method": "mining.notify"
-        }
-        self.send_json(conn, msg)
+        try:
+            conn.sendall(self.template.render(job_id))
+        except:
+            pass
 
     def start(self):
         while True:
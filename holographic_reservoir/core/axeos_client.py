@@ -0,0 +1,199 @@
+import asyncio
+import http.client
+import json
+import queue
+import threading
+import time
+
+INFO_PATH = "/api/system/info"
+POOL_SIZE = 2 # Keep-alive connections kept per miner
+POLL_INTERVAL = 2.0 # Seconds between telemetry polls
+FAST_INTERVAL = 0.5 # ... during boost() windows (modulation experiments, hardware changes)
+IDLE_INTERVAL = 10.0 # Back-off ceiling while nothing changes (or the miner is unreachable)
+BACKOFF = 1.5
+BOOST_SECONDS = 60.0
+SETTINGS_FIELDS = ("frequency", "coreVoltage") # A change here resets the back-off
+
+class AxeOSPool:
+    """
+    Persistent HTTP/1.1 connections to one miner. Thread-safe: a caller
+    takes an idle connection (or opens one), uses it and hands it back.
+    """
+    def __init__(self, host, size=POOL_SIZE, timeout=2.0):
+        self.host = host
+        self.timeout = timeout
+        self.idle = queue.LifoQueue(size)
+
+    def request(self, method, path, body=None, timeout=None):
+        # Returns (status, body bytes). GETs are retried once on a connection the miner already closed.
+        headers = {"Content-Type": "application/json"} if body is not None else {}
+        for attempt in range(2 if method == "GET" else 1):
+            try:
+                conn = self.idle.get_nowait()
+            except queue.Empty:
+                conn = http.client.HTTPConnection(self.host, timeout=self.timeout)
+            try:
+                conn.timeout = timeout or self.timeout
+                if conn.sock: conn.sock.settimeout(conn.timeout)
+                conn.request(method, path, body=body, headers=headers)
+                response = conn.getresponse()
+                data = response.read()
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                conn.close()
+                if attempt or method != "GET": raise
+                continue
+            except BaseException:
+                conn.close()
+                raise
+            if response.will_close: conn.close()
+            try: self.idle.put_nowait(conn)
+            except queue.Full: conn.close()
+            return response.status, data
+
+    def close(self):
+        while True:
+            try: self.idle.get_nowait().close()
+            except queue.Empty: return
+
+class AxeOSClient:
+    """
+    Blocking AxeOS REST client with one keep-alive pool per miner IP.
+    Thread-safe; share one instance (shared_client()) across the process.
+    """
+    def __init__(self, pool_size=POOL_SIZE, timeout=2.0):
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.pools = {}
+        self.lock = threading.Lock()
+        self.requests = 0
+
+    def pool(self, ip):
+        with self.lock:
+            pool = self.pools.get(ip)
+            if pool is None:
+                pool = self.pools[ip] = AxeOSPool(ip, self.pool_size, self.timeout)
+            return pool
+
+    def get_json(self, ip, path, timeout=None):
+        self.requests += 1
+        status, data = self.pool(ip).request("GET", path, timeout=timeout)
+        if status != 200:
+            raise OSError(f"{ip}{path}: HTTP {status}")
+        return json.loads(data)
+
+    def info(self, ip, timeout=None):
+        return self.get_json(ip, INFO_PATH, timeout)
+
+    def patch_system(self, ip, payload, timeout=5):
+        self.requests += 1
+        status, _ = self.pool(ip).request("PATCH", "/api/system", json.dumps(payload).encode('utf-8'), timeout)
+        if status >= 400:
+            raise OSError(f"{ip}/api/system: HTTP {status}")
+        return status
+
+    def restart(self, ip, timeout=5):
+        # The miner often drops the connection while restarting
+        self.requests += 1
+        try:
+            self.pool(ip).request("POST", "/api/system/restart", b"{}", timeout)
+        except (OSError, http.client.HTTPException):
+            pass
+
+    def close(self):
+        with self.lock:
+            for pool in self.pools.values(): pool.close()
+            self.pools.clear()
+
+_shared = None
+_shared_lock = threading.Lock()
+
+def shared_client():
+    """The process-wide AxeOSClient."""
+    global _shared
+    with _shared_lock:
+        if _shared is None: _shared = AxeOSClient()
+        return _shared
+
+class TelemetryHub:
+    """
+    One poller per watched miner; every reading is cached and pushed to all
+    subscribers, so bridges and controllers stop polling on their own.
+    The poll interval backs off (up to idle_interval) while the miner's
+    settings stay the same or it does not answer, and drops to
+    fast_interval inside boost() windows.
+    """
+    def __init__(self, client=None, interval=POLL_INTERVAL, fast_interval=FAST_INTERVAL, idle_interval=IDLE_INTERVAL):
+        self.client = client or shared_client()
+        self.interval = interval
+        self.fast_interval = fast_interval
+        self.idle_interval = idle_interval
+        self.cache = {} # ip -> (time.time() of the reading, info dict)
+        self.subscribers = {} # ip -> [callback(ip, info) or None]
+        self.tasks = {} # ip -> poll task
+        self.boost_until = {} # ip -> time.monotonic() deadline
+        self.wakeups = {} # ip -> asyncio.Event that cuts the current wait short
+        self.polls = 0
+        self.errors = 0
+
+    def watch(self, ip, callback=None):
+        """Starts polling ip (if needed) and subscribes callback(ip, info)."""
+        self.subscribers.setdefault(ip, []).append(callback)
+        if ip not in self.tasks:
+            self.wakeups[ip] = asyncio.Event()
+            self.tasks[ip] = asyncio.create_task(self.poll_loop(ip))
+        elif callback and ip in self.cache:
+            callback(ip, self.cache[ip][1]) # Late subscribers start from the cached reading
+
+    def unwatch(self, ip, callback=None):
+        """Drops one subscription; the poller stops with the last one."""
+        subs = self.subscribers.get(ip, [])
+        if callback in subs: subs.remove(callback)
+        if subs: return
+        self.subscribers.pop(ip, None)
+        self.wakeups.pop(ip, None)
+        task = self.tasks.pop(ip, None)
+        if task: task.cancel()
+
+    def get(self, ip, max_age=None, since=None):
+        """
+        Cached reading for ip: None if there is none, it is older than max_age
+        seconds, or it was taken before 'since' (time.time()).
+        """
+        entry = self.cache.get(ip)
+        if entry is None or (max_age is not None and time.time() - entry[0] > max_age): return None
+        if since is not None and entry[0] < since: return None
+        return entry[1]
+
+    def boost(self, ip=None, seconds=BOOST_SECONDS):
+        """Polls ip (or every watched miner) at fast_interval for the next 'seconds'."""
+        until = time.monotonic() + seconds
+        for target in ([ip] if ip else list(self.tasks)):
+            self.boost_until[target] = until
+            if target in self.wakeups: self.wakeups[target].set()
+
+    async def poll_loop(self, ip):
+        interval = self.interval
+        settings = None
+        while True:
+            try:
+                info = await asyncio.to_thread(self.client.info, ip)
+            except Exception:
+                info = None
+                self.errors += 1
+                interval = min(interval * BACKOFF, self.idle_interval)
+            if info is not None:
+                self.polls += 1
+                self.cache[ip] = (time.time(), info)
+                for callback in list(self.subscribers.get(ip, ())):
+                    if callback: callback(ip, info)
+                current = tuple(info.get(f) for f in SETTINGS_FIELDS)
+                interval = self.interval if current != settings else min(interval * BACKOFF, self.idle_interval)
+                settings = current
+            wait = self.fast_interval if time.monotonic() < self.boost_until.get(ip, 0) else interval
+            wakeup = self.wakeups.get(ip)
+            if wakeup is None: return
+            wakeup.clear()
+            try:
+                await asyncio.wait_for(wakeup.wait(), wait)
+            except asyncio.TimeoutError:
+                pass
@@ -0,0 +1,74 @@
+import json
+import struct
+import numpy as np
+
+try:
+    from .entropy_client import EntropyClient
+except ImportError:
+    from entropy_client import EntropyClient
+
+RESPONSE_HEADER = struct.Struct(">I") # SINCE:...:BIN -> JSON header length, header, raw rows
+
+class ChronosClient(EntropyClient):
+    """
+    Persistent client for the Chronos Bridge API (Port 4029).
+    Same KEEPALIVE transport as EntropyClient (length-prefixed, pipelined),
+    but every read uses the ':BIN' commands: hashes come back as raw 32-byte
+    strings and metrics as one packed row, so a high-rate poll costs
+    neither a TCP connect nor JSON/hex work on either side.
+    """
+    _pool = {}
+    read_suffix = ":BIN"
+
+    def __init__(self, host="127.0.0.1", port=4029, timeout=5.0):
+        super().__init__(host, port, timeout)
+        self.dtype = None # Packed metrics row, fetched once (METRICS_LAYOUT)
+
+    @classmethod
+    def shared(cls, host="127.0.0.1", port=4029):
+        return super().shared(host, port)
+
+    def metrics_dtype(self):
+        if self.dtype is None:
+            layout = json.loads(self.request("METRICS_LAYOUT"))
+            self.dtype = np.dtype([tuple(d) for d in layout["dtype"]])
+        return self.dtype
+
+    def metrics(self):
+        """Current metrics as a flat dict (seq, ts, shares, cv, ..., cv_<window>, entropy_<window>)."""
+        dtype = self.metrics_dtype()
+        row = np.frombuffer(self.request("GET_METRICS:BIN"), dtype=dtype)[0]
+        return {name: row[name].item() for name in dtype.names}
+
+    def recent_hashes(self):
+        """Hashes captured since the last call (newest ones only), as raw 32-byte strings."""
+        data = self.request("GET_RECENT_HASHES:BIN")
+        return [data[i:i+32] for i in range(0, len(data) - 31, 32)]
+
+    def since(self, seq):
+        """Every metrics row recorded from 'seq' on. Returns (rows, next_seq); rows is a structured array."""
+        data = self.request(f"SINCE:{seq}:BIN")
+        length, = RESPONSE_HEADER.unpack_from(data)
+        header = json.loads(data[RESPONSE_HEADER.size:RESPONSE_HEADER.size + length])
+        dtype = np.dtype([tuple(d) for d in header["dtype"]])
+        return np.frombuffer(data[RESPONSE_HEADER.size + length:], dtype=dtype), header["next"]
+
+    def set_frequency(self, freq):
+        """Queues a frequency change. Returns the hardware request id (see hw_wait)."""
+        return self._hardware(f"SET_FREQUENCY:{int(freq)}")
+
+    def set_voltage(self, volts):
+        """Queues a core voltage change (mV). Returns the hardware request id."""
+        return self._hardware(f"SET_VOLTAGE:{int(volts)}")
+
+    def _hardware(self, command):
+        reply = self.request(command).decode()
+        if not reply.startswith("OK:"):
+            raise ValueError(f"Hardware command rejected: {reply!r}")
+        return int(reply.split(":")[1])
+
+    def hw_wait(self, request_id, timeout_ms=120000):
+        """Blocks until the hardware request settles (or fails / times out). Returns its summary."""
+        reply = self.pipeline([f"HW_WAIT:{request_id}:{timeout_ms}"], timeout=self.timeout + timeout_ms / 1000)[0]
+        if reply == b"UNKNOWN_ID": raise KeyError(request_id)
+        return json.loads(reply)
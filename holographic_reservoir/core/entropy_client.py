@@ -0,0 +1,204 @@
+import select
+import socket
+import struct
+import threading
+import time
+
+KEEPALIVE_CMD = b"KEEPALIVE\n"
+HEADER = struct.Struct(">I")
+READ_FROM_HEADER = struct.Struct(">QQ")
+# Commands without side effects on the bridge: safe to resend after a failed round trip
+RETRY_SAFE = ("READ_FROM:", "READ_TAGGED:", "MINERS", "GET_METRICS", "METRICS_LAYOUT", "SINCE:", "HW_STATUS", "HW_WAIT:")
+
+class EntropyClient:
+    """
+    Persistent client for the Plenum Bridge API (Port 4028).
+    Opens one socket in KEEPALIVE mode and reuses it for every request,
+    so a BURST costs one round trip instead of a TCP connect/close.
+    Use EntropyClient.shared() to get the pooled instance for an address.
+    """
+    _pool = {}
+    _pool_lock = threading.Lock()
+    read_suffix = "" # Appended to READ_FROM (":BIN" on bridges that default to JSON)
+
+    def __init__(self, host="127.0.0.1", port=4028, timeout=5.0):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.sock = None
+        self.lock = threading.Lock()
+
+    @classmethod
+    def shared(cls, host="127.0.0.1", port=4028):
+        with cls._pool_lock:
+            client = cls._pool.get((host, port))
+            if client is None:
+                client = cls._pool[(host, port)] = cls(host, port)
+            return client
+
+    def connect(self):
+        s = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        s.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        s.sendall(KEEPALIVE_CMD)
+        self.sock = s
+
+    def close(self):
+        if self.sock:
+            try: self.sock.close()
+            except OSError: pass
+            self.sock = None
+
+    def stale(self):
+        # An idle keep-alive socket only turns readable if the bridge closed it
+        readable, _, _ = select.select([self.sock], [], [], 0)
+        return bool(readable)
+
+    def _recv_exact(self, size):
+        buf = bytearray(size)
+        view = memoryview(buf)
+        got = 0
+        while got < size:
+            n = self.sock.recv_into(view[got:])
+            if not n: raise ConnectionError("Bridge closed the connection")
+            got += n
+        return bytes(buf)
+
+    def pipeline(self, commands, timeout=None):
+        """
+        Sends all commands in one write, then reads one framed response per command.
+        A pooled socket the bridge already closed is replaced before sending.
+        Once the request is out, a failure is only retried for RETRY_SAFE
+        commands: a resent BURST or SEED could consume or change data twice.
+        'timeout' overrides the socket timeout for this call (long-polls).
+        """
+        request = b"".join(f"{c}\n".encode() for c in commands)
+        retry_safe = all(c.startswith(RETRY_SAFE) for c in commands)
+        with self.lock:
+            for attempt in range(2):
+                sent = False
+                try:
+                    if self.sock is not None and self.stale(): self.close()
+                    if self.sock is None: self.connect()
+                    self.sock.settimeout(timeout or self.timeout)
+                    sent = True
+                    self.sock.sendall(request)
+                    responses = []
+                    for _ in commands:
+                        size, = HEADER.unpack(self._recv_exact(HEADER.size))
+                        responses.append(self._recv_exact(size))
+                    return responses
+                except OSError:
+                    self.close()
+                    if attempt or (sent and not retry_safe): raise
+
+    def request(self, command):
+        return self.pipeline([command])[0]
+
+    def burst(self, count):
+        """Returns up to 'count' raw 32-byte hashes (fewer if the bridge buffer is short)."""
+        data = self.request(f"BURST:{count}")
+        return [data[i:i+32] for i in range(0, len(data) - 31, 32)]
+
+    def burst_wait(self, count, timeout_ms=1000):
+        """
+        Long-poll BURST: the bridge holds the request until 'count' hashes exist
+        or 'timeout_ms' passes, so an empty buffer costs no sleep/retry loop.
+        """
+        data = self.pipeline([f"BURST:{count}:{timeout_ms}"], timeout=self.timeout + timeout_ms / 1000)[0]
+        n, = HEADER.unpack_from(data)
+        return [data[HEADER.size + i*32:HEADER.size + (i+1)*32] for i in range(n)]
+
+    def seed(self, seed_text):
+        """
+        Injects a seed. The bridge pushes it to every miner before replying, so
+        there is no need to sleep afterwards. Returns (job_id, seq), where seq is
+        the first log sequence number that can hold shares for the new job.
+        """
+        reply = self.request(f"SEED:{seed_text}").decode()
+        parts = reply.split(":")
+        if parts[0] != "OK":
+            raise ValueError(f"Seed rejected: {reply!r}")
+        if len(parts) < 3:
+            return None, None # Older bridge: no job confirmation
+        return parts[1], int(parts[2])
+
+    def read_from(self, seq, count):
+        """Non-destructive read of the broadcast log. Returns (start_seq, hashes, lost)."""
+        data = self.request(f"READ_FROM:{seq}:{count}{self.read_suffix}")
+        if len(data) < READ_FROM_HEADER.size:
+            raise ValueError("Malformed READ_FROM response")
+        start, lost = READ_FROM_HEADER.unpack_from(data)
+        body = data[READ_FROM_HEADER.size:]
+        return start, [body[i:i+32] for i in range(0, len(body) - 31, 32)], lost
+
+    def read_tagged(self, seq, count):
+        """Like read_from, but each hash comes as (miner_id, hash). Returns (start_seq, pairs, lost)."""
+        data = self.request(f"READ_TAGGED:{seq}:{count}")
+        if len(data) < READ_FROM_HEADER.size:
+            raise ValueError("Malformed READ_TAGGED response")
+        start, lost = READ_FROM_HEADER.unpack_from(data)
+        n = (len(data) - READ_FROM_HEADER.size) // 34
+        tags = data[READ_FROM_HEADER.size:READ_FROM_HEADER.size + 2 * n]
+        body = data[READ_FROM_HEADER.size + 2 * n:]
+        sources = struct.unpack(f">{n}H", tags)
+        return start, [(sources[i], body[i*32:(i+1)*32]) for i in range(n)], lost
+
+class EntropyCursor:
+    """
+    One reader's position in the bridge's broadcast log.
+    Several cursors can follow the same share stream at full rate: each sees
+    every hash exactly once, and 'lost' counts records that wrapped away
+    before this reader got to them.
+    """
+    def __init__(self, client, seq=0):
+        self.client = client
+        self.seq = seq
+        self.lost = 0
+
+    def read(self, count):
+        start, hashes, lost = self.client.read_from(self.seq, count)
+        if lost:
+            print(f"⚠️ [EntropyCursor] Fell behind by {lost} records (ring wrapped)")
+            self.lost += lost
+        self.seq = start + len(hashes)
+        return hashes
+
+class EntropySubscription:
+    """
+    Push stream from the Plenum Bridge (SUBSCRIBE command).
+    The bridge writes every captured share hash as soon as it arrives,
+    so there is no poll interval between the ASIC and the consumer.
+    """
+    def __init__(self, host="127.0.0.1", port=4028, timeout=5.0):
+        self.sock = socket.create_connection((host, port), timeout=timeout)
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.sock.sendall(b"SUBSCRIBE\n")
+        self.pending = bytearray()
+
+    def recv(self, count, timeout=None):
+        """
+        Returns up to 'count' hashes, blocking until they arrive or 'timeout' seconds pass.
+        Raises ConnectionError if the bridge closes the stream.
+        """
+        deadline = None if timeout is None else time.time() + timeout
+        while len(self.pending) < count * 32:
+            if deadline is not None:
+                remaining = deadline - time.time()
+                if remaining <= 0: break
+                self.sock.settimeout(remaining)
+            else:
+                self.sock.settimeout(None)
+            try:
+                chunk = self.sock.recv(65536)
+            except socket.timeout:
+                break
+            if not chunk: raise ConnectionError("Bridge closed the subscription")
+            self.pending += chunk
+        usable = min(count, len(self.pending) // 32) * 32
+        data = bytes(self.pending[:usable])
+        del self.pending[:usable]
+        return [data[i:i+32] for i in range(0, usable, 32)]
+
+    def close(self):
+        try: self.sock.close()
+        except OSError: pass
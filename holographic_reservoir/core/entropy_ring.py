@@ -0,0 +1,86 @@
+HASH_SIZE = 32
+TAG_SIZE = 2 # Big-endian uint16 source (miner) id stored alongside each hash
+
+class EntropyRing:
+    """
+    Fixed-capacity ring of 32-byte share hashes.
+    Preallocated as one contiguous bytearray so that a BURST drain is a pair of
+    index updates and at most two memoryview slices (no per-hash copies).
+    When full, the oldest hashes are overwritten (freshest entropy wins).
+    
+    Every hash gets a sequence number (its absolute write index), so besides the
+    destructive BURST cursor (head) any number of readers can follow the same
+    stream with their own cursor via read_from().
+    Each hash also carries a 16-bit source tag (the miner it came from).
+    """
+    def __init__(self, capacity: int = 2000):
+        self.capacity = capacity
+        self.storage = bytearray(capacity * HASH_SIZE)
+        self.view = memoryview(self.storage)
+        self.tags = bytearray(capacity * TAG_SIZE)
+        self.tag_view = memoryview(self.tags)
+        # Absolute counters; slot = counter % capacity
+        self.head = 0  # Next hash to hand out
+        self.tail = 0  # Next slot to write
+        self.overwritten = 0
+
+    def __len__(self):
+        return self.tail - self.head
+
+    def push(self, h: bytes, source: int = 0):
+        """Appends one 32-byte hash, dropping the oldest one if the ring is full."""
+        index = self.tail % self.capacity
+        slot = index * HASH_SIZE
+        self.storage[slot:slot + HASH_SIZE] = h
+        self.tags[index * TAG_SIZE:(index + 1) * TAG_SIZE] = (source & 0xffff).to_bytes(TAG_SIZE, 'big')
+        self.tail += 1
+        if self.tail - self.head > self.capacity:
+            self.head = self.tail - self.capacity
+            self.overwritten += 1
+
+    def pop_burst(self, count: int) -> list:
+        """
+        Removes up to 'count' hashes and returns them as memoryview slices
+        (one slice, or two when the range wraps around the end of the ring).
+        The slices stay valid until the writer laps them, so send them right away
+        (StratumServer's write_payload copies them when a transport would queue them).
+        """
+        count = min(count, len(self))
+        if count <= 0:
+            return []
+        views = self.slices(self.head, count)
+        self.head += count
+        return views
+
+    def oldest_seq(self) -> int:
+        """Sequence number of the oldest hash still held in the ring."""
+        return max(0, self.tail - self.capacity)
+
+    def read_from(self, seq: int, count: int):
+        """
+        Non-destructive read for a reader whose cursor is 'seq'.
+        Returns (start_seq, views, lost): 'lost' > 0 means the ring wrapped past
+        the cursor and that many records were overwritten before being read.
+        The reader's next cursor is start_seq + (total bytes in views) // 32.
+        """
+        oldest = self.oldest_seq()
+        lost = max(0, oldest - seq)
+        start = min(max(seq, oldest), self.tail)
+        count = max(0, min(count, self.tail - start))
+        return start, (self.slices(start, count) if count else []), lost
+
+    def slices(self, start: int, count: int) -> list:
+        """Returns the byte range for hashes [start, start+count) without consuming them."""
+        return self._slices(self.view, HASH_SIZE, start, count)
+
+    def tag_slices(self, start: int, count: int) -> list:
+        """Returns the source tags for hashes [start, start+count), same layout as slices()."""
+        return self._slices(self.tag_view, TAG_SIZE, start, count)
+
+    def _slices(self, view, width, start, count):
+        first = start % self.capacity
+        end = first + count
+        if end <= self.capacity:
+            return [view[first * width:end * width]]
+        wrap = end - self.capacity
+        return [view[first * width:], view[:wrap * width]]
@@ -0,0 +1,81 @@
+import time
+
+EXTRANONCE1_BASE = 0x08000000 # First extranonce1 handed out ("08000000", "08000001", ...)
+ID_SPAN = 0x10000 # Miner ids fit the ring's uint16 source tags
+
+class MinerSession:
+    """
+    One connected ASIC. Owns the unique extranonce1 that keeps its search
+    space disjoint from the rest of the rack, plus its per-miner counters.
+    """
+    def __init__(self, miner_id, addr, extranonce1):
+        self.miner_id = miner_id
+        self.addr = addr
+        self.ip = addr[0] if addr else None
+        self.extranonce1 = extranonce1
+        self.connected_at = time.time()
+        self.shares = 0
+        self.control = None # Per-miner telemetry/control object (e.g. AxeOSController)
+        self.vardiff = None # Per-miner VarDiff, set once the miner authorizes
+        self.kernel_ns = None # Kernel receive time of the chunk being processed (SO_TIMESTAMPNS), if enabled
+
+    def summary(self):
+        stats = getattr(self.control, 'stats', {}) if self.control else {}
+        return {
+            "id": self.miner_id, "ip": self.ip, "extranonce1": self.extranonce1,
+            "shares": self.shares, "uptime": time.time() - self.connected_at,
+            "difficulty": self.vardiff.difficulty if self.vardiff else None,
+            "stats": stats
+        }
+
+class MinerFleet:
+    """
+    Registry of connected miners, keyed by their stream writer.
+    Allocates a distinct extranonce1 per connection so several LV06 units
+    never duplicate work, and numbers miners so every captured hash can be
+    tagged with its source. Ids (and so extranonce1 values) come from the
+    fixed range [first_id, first_id + span), handed out round-robin and
+    reused once their miner is gone; attach() returns None when every id in
+    the range is connected.
+    """
+    def __init__(self, extranonce1_base=EXTRANONCE1_BASE, first_id=0, span=ID_SPAN):
+        self.sessions = {}
+        self.first_id = first_id # Sharded listeners own disjoint ranges (and so disjoint extranonce1s)
+        self.span = span
+        self.next_id = first_id
+        self.in_use = set()
+        self.extranonce1_base = extranonce1_base
+
+    def __len__(self):
+        return len(self.sessions)
+
+    def __iter__(self):
+        return iter(self.sessions.values())
+
+    def allocate(self):
+        if len(self.in_use) >= self.span: return None
+        while self.next_id in self.in_use:
+            self.next_id = self.first_id + (self.next_id + 1 - self.first_id) % self.span
+        miner_id = self.next_id
+        self.next_id = self.first_id + (miner_id + 1 - self.first_id) % self.span
+        self.in_use.add(miner_id)
+        return miner_id
+
+    def attach(self, writer, addr):
+        miner_id = self.allocate()
+        if miner_id is None: return None
+        extranonce1 = f"{(self.extranonce1_base + miner_id) & 0xffffffff:08x}"
+        session = MinerSession(miner_id, addr, extranonce1)
+        self.sessions[writer] = session
+        return session
+
+    def detach(self, writer):
+        session = self.sessions.pop(writer, None)
+        if session: self.in_use.discard(session.miner_id)
+        return session
+
+    def get(self, writer):
+        return self.sessions.get(writer)
+
+    def summary(self):
+        return [s.summary() for s in self.sessions.values()]
@@ -0,0 +1,171 @@
+import asyncio
+import time
+from collections import OrderedDict
+
+try:
+    from .axeos_client import shared_client, TelemetryHub
+except ImportError:
+    from axeos_client import shared_client, TelemetryHub
+
+SETTLE_TIMEOUT = 120.0 # Seconds to wait for the miner to come back after a restart
+SETTLE_POLL = 1.0 # Seconds between settle checks (readings come from the TelemetryHub)
+COALESCE_WINDOW = 0.5 # Seconds to wait for companion requests (freq + volt) before applying
+REQUEST_HISTORY = 256 # Finished requests kept for HW_STATUS
+
+class HardwareRequest:
+    """One SET_FREQUENCY / SET_VOLTAGE request and what became of it."""
+    def __init__(self, request_id, freq=None, vol=None):
+        self.id = request_id
+        self.freq = freq
+        self.vol = vol
+        self.state = "pending" # pending -> applying -> settling -> settled | unsettled | failed | discarded
+        self.requested_at = time.time()
+        self.applied_at = None # PATCH + restart sent
+        self.settled_at = None # Miner reports the new settings and is sharing again
+        self.batch = [request_id] # Request ids merged into the same PATCH / restart
+        self.payload = None
+        self.error = None
+        self.done = asyncio.Event()
+
+    def summary(self):
+        settle = self.settled_at - self.applied_at if self.settled_at and self.applied_at else None
+        return {
+            "id": self.id, "freq": self.freq, "vol": self.vol, "state": self.state,
+            "requested_at": self.requested_at, "applied_at": self.applied_at,
+            "settled_at": self.settled_at, "settle_s": settle, "batch": self.batch,
+            "payload": self.payload, "error": self.error,
+        }
+
+class HardwareControl:
+    """
+    Control worker for AxeOS frequency/voltage changes, off the share path.
+    Requests only queue up; the worker wakes on the queue, gives companion
+    requests a short window to arrive, merges everything pending (latest
+    value per knob) into one PATCH and one restart, then follows the miner
+    until it reports the new settings and submits a share again. Requests
+    that arrive meanwhile wait for the next batch, so the miner is never
+    restarted while it is still coming back. Blocking HTTP runs in a worker
+    thread, over the shared keep-alive AxeOSClient. Settling is judged from
+    the TelemetryHub's readings (boosted meanwhile), not from polls of its own.
+    """
+    def __init__(self, miner_ip, baseline, shares, client=None, telemetry=None,
+                 settle_timeout=SETTLE_TIMEOUT, coalesce_window=COALESCE_WINDOW):
+        self.miner_ip = miner_ip # () -> IP of the miner to control (or None)
+        self.baseline = baseline # () -> {"frequency", "volts"} currently in effect (known values only)
+        self.shares = shares # () -> total shares received
+        self.client = client or shared_client()
+        self.telemetry = telemetry or TelemetryHub(self.client) # Boosted on every change
+        self.settle_timeout = settle_timeout
+        self.coalesce_window = coalesce_window
+        self.queue = asyncio.Queue()
+        self.requests = OrderedDict() # id -> HardwareRequest (bounded)
+        self.next_id = 0
+        self.restarts = 0
+        self.merged = 0 # Requests folded into another request's restart
+        self.last_settle = None # Seconds, most recent settled batch
+
+    def submit(self, freq=None, vol=None):
+        """Queues a change and returns its request (never blocks)."""
+        self.next_id += 1
+        request = HardwareRequest(self.next_id, freq, vol)
+        self.requests[request.id] = request
+        while len(self.requests) > REQUEST_HISTORY:
+            self.requests.popitem(last=False)
+        self.queue.put_nowait(request)
+        return request
+
+    def get(self, request_id):
+        return self.requests.get(request_id)
+
+    async def run(self):
+        while True:
+            batch = [await self.queue.get()]
+            # Everything that piled up goes into the same PATCH / restart
+            if self.coalesce_window: await asyncio.sleep(self.coalesce_window)
+            while not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+            await self.apply(batch)
+
+    async def apply(self, batch):
+        freq = next((r.freq for r in reversed(batch) if r.freq), None)
+        vol = next((r.vol for r in reversed(batch) if r.vol), None)
+        ids = [r.id for r in batch]
+        self.merged += len(batch) - 1
+        ip = self.miner_ip()
+        if not ip:
+            print("⚠️ DISCARDING COMMAND: No Miner IP known yet.")
+            self.finish(batch, "discarded", error="no miner IP known")
+            return
+
+        # Current stats as baseline
+        payload = dict(self.baseline())
+        if freq: payload["frequency"] = int(freq)
+        if vol: payload["volts"] = int(vol)
+        for r in batch:
+            r.state, r.batch, r.payload = "applying", ids, payload
+        if len(batch) > 1:
+            print(f"💊 {len(batch)} hardware requests merged into one restart: {payload}")
+        try:
+            await asyncio.to_thread(self.send, ip, payload)
+        except Exception as e:
+            print(f"   ❌ HTTP ERROR: {e}")
+            self.finish(batch, "failed", error=str(e))
+            return
+        applied_at = time.time()
+        shares_before = self.shares()
+        self.restarts += 1
+        for r in batch:
+            r.state, r.applied_at = "settling", applied_at
+        self.telemetry.boost(ip)
+
+        settled_at = await self.settle(ip, freq, vol, shares_before)
+        if settled_at is None:
+            print(f"   ⚠️ MINER NOT SETTLED after {self.settle_timeout:.0f}s")
+            self.finish(batch, "unsettled", error="settle timeout")
+            return
+        self.last_settle = settled_at - applied_at
+        print(f"   ✅ MINER SETTLED in {self.last_settle:.1f}s")
+        for r in batch: r.settled_at = settled_at
+        self.finish(batch, "settled")
+
+    async def settle(self, ip, freq, vol, shares_before):
+        # Settled = the miner reports the requested settings and is submitting shares again.
+        # Only hub readings taken after the restart count; while rebooting there are none.
+        applied_at = time.time()
+        deadline = time.monotonic() + self.settle_timeout
+        confirmed = False
+        self.telemetry.watch(ip) # Keeps the poller alive even if nobody else follows this miner
+        try:
+            while time.monotonic() < deadline:
+                await asyncio.sleep(SETTLE_POLL)
+                if not confirmed:
+                    info = self.telemetry.get(ip, since=applied_at)
+                    confirmed = bool(info) and (not freq or info.get("frequency") == int(freq)) \
+                        and (not vol or info.get("coreVoltage", int(vol)) == int(vol))
+                if confirmed and self.shares() > shares_before:
+                    return time.time()
+            return None
+        finally:
+            self.telemetry.unwatch(ip)
+
+    def finish(self, batch, state, error=None):
+        for r in batch:
+            r.state, r.error = state, error
+            r.done.set()
+
+    def send(self, ip, payload):
+        # HARDWARE MODULATION via HTTP (AxeOS/LuckyMiner): one PATCH, one restart
+        print(f"💊 HTTP PATCH http://{ip}/api/system -> {payload}")
+        status = self.client.patch_system(ip, payload)
+        print(f"   ✅ HARDWARE CONFIG UPDATED: {status}")
+
+        # TRIGGER RESTART (Required for Frequency/Voltage PLLs)
+        print("   🔄 RESTARTING MINER TO APPLY CHANGES...")
+        self.client.restart(ip)
+
+    def status(self, recent=10):
+        return {
+            "pending": self.queue.qsize(), "restarts": self.restarts, "merged": self.merged,
+            "last_settle_s": self.last_settle,
+            "recent": [r.summary() for r in list(self.requests.values())[-recent:]],
+        }
@@ -0,0 +1,33 @@
+import json
+import time
+
+class NotifyTemplate:
+    """
+    Pre-serialized mining.notify payload for one seed/job.
+    Everything except the job id and ntime is encoded to bytes once; render()
+    only splices those two hex strings in. The rendered line is plain bytes,
+    so the same payload can be written to every connected miner.
+    """
+    def __init__(self, prevhash, coinb1, coinb2, merkle_branch, version, nbits, clean_jobs=True):
+        self.prevhash = prevhash
+        self.coinb1 = coinb1
+        self.coinb2 = coinb2
+        self.merkle_branch = list(merkle_branch)
+        self.version = version
+        self.nbits = nbits
+        self.clean_jobs = clean_jobs
+        fixed = json.dumps([prevhash, coinb1, coinb2, self.merkle_branch, version, nbits])[1:-1]
+        self.head = b'{"id": null, "method": "mining.notify", "params": ["'
+        self.middle = f'", {fixed}, "'.encode()
+        self.tail = f'", {json.dumps(bool(clean_jobs))}]}}\n'.encode()
+
+    def render(self, job_id, ntime=None) -> bytes:
+        """Returns the newline-terminated notify line for 'job_id' (hex strings, no escaping needed)."""
+        if ntime is None:
+            ntime = f"{int(time.time()):x}"
+        return b"".join((self.head, job_id.encode(), self.middle, ntime.encode(), self.tail))
+
+    def params(self, job_id, ntime):
+        """Same job as a params list (for code paths that still build JSON objects)."""
+        return [job_id, self.prevhash, self.coinb1, self.coinb2, self.merkle_branch,
+                self.version, self.nbits, ntime, self.clean_jobs]
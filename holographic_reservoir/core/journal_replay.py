@@ -0,0 +1,72 @@
+import asyncio
+import time
+import numpy as np
+
+try:
+    from .share_journal import read_journal, merge_journals
+except ImportError:
+    from share_journal import read_journal, merge_journals
+
+class JournalReplay:
+    """
+    Streams a recorded share journal back as if the miners were attached.
+    speed=1.0 keeps the original inter-arrival timing, speed=N plays N times
+    faster and speed=0 (or None) goes as fast as possible. Records come out
+    in chunks of everything that is due (one searchsorted per chunk, not a
+    sleep per share); each chunk is a slice of the journal's structured
+    array, original ts_ns included, so timing analysis downstream gives the
+    same result at any speed.
+    'prefix' may also be a list of journals (a sharded session writes one
+    per worker); several are merged into one stream ordered by ts_ns.
+    """
+    def __init__(self, directory, prefix="shares", speed=1.0, max_chunk=1024):
+        prefixes = [prefix] if isinstance(prefix, str) else list(prefix)
+        if len(prefixes) == 1:
+            self.segments = read_journal(directory, prefixes[0])
+        else:
+            self.segments = [merge_journals(directory, prefixes)]
+        self.speed = speed
+        self.max_chunk = max_chunk
+        self.total = sum(len(s) for s in self.segments)
+        self.replayed = 0
+
+    def plan(self):
+        # Yields (chunk, 0) when records are due, (None, delay) when the caller should wait.
+        start = None
+        ts0 = None
+        for seg in self.segments:
+            ts = seg["ts_ns"]
+            i = 0
+            while i < len(seg):
+                if not self.speed:
+                    end = min(i + self.max_chunk, len(seg))
+                else:
+                    if ts0 is None:
+                        ts0, start = int(ts[i]), time.monotonic()
+                    elapsed_ns = (time.monotonic() - start) * 1e9 * self.speed
+                    end = int(np.searchsorted(ts, ts0 + elapsed_ns, side="right"))
+                    end = min(max(end, i), i + self.max_chunk)
+                    if end == i:
+                        due = (int(ts[i]) - ts0) / 1e9 / self.speed
+                        yield None, max(due - (time.monotonic() - start), 0.0)
+                        continue
+                self.replayed += end - i
+                yield seg[i:end], 0.0
+                i = end
+
+    def __iter__(self):
+        """Blocking iteration over chunks (threaded bridges, scripts, CI)."""
+        for chunk, delay in self.plan():
+            if chunk is None:
+                time.sleep(delay)
+                continue
+            yield chunk
+
+    async def chunks(self):
+        """Async iteration over chunks; yields to the event loop between chunks."""
+        for chunk, delay in self.plan():
+            if chunk is None:
+                await asyncio.sleep(delay)
+                continue
+            yield chunk
+            await asyncio.sleep(0)
@@ -0,0 +1,175 @@
+import glob
+import json
+import math
+import os
+import struct
+import time
+import numpy as np
+
+MAGIC = b"CHMHIS01"
+HEADER_LENGTH = struct.Struct("<I") # Length of the JSON header that follows MAGIC in a spill segment
+RESPONSE_HEADER = struct.Struct(">I") # Binary responses: JSON header length, header, raw rows
+MAX_ROWS = 100000 # Rows per query response; clients continue from "next"
+
+def history_dtype(fields):
+    return np.dtype([("seq", "<u8"), ("ts", "<f8")] + [(f, "<f8") for f in fields])
+
+class MetricsHistory:
+    """
+    Time series of every metric update: a ring of timestamped rows, one
+    float64 column per field. Each record() gets an absolute sequence number;
+    readers ask for everything since a sequence number (SINCE) or inside a
+    time range and get the whole series back in one response, instead of
+    sampling the latest snapshot and missing what happened between polls.
+    With spill_dir set, rows are also appended in batches to segment files,
+    and queries that reach past the ring are answered from disk; sequence
+    numbers then continue from the last spilled row of earlier runs, so a
+    seq always names one row across restarts.
+    """
+    def __init__(self, fields, capacity=1 << 16, spill_dir=None, prefix="metrics",
+                 batch_rows=256, segment_rows=1 << 20):
+        self.fields = tuple(fields)
+        self.dtype = history_dtype(self.fields)
+        self.capacity = capacity
+        self.rows = np.zeros(capacity, dtype=self.dtype)
+        self.seq = 0 # Sequence number of the next row
+        self.spill_dir = spill_dir
+        self.prefix = prefix
+        self.batch_rows = batch_rows
+        self.segment_rows = segment_rows
+        self.spilled = 0 # Rows below this seq are on disk
+        self.file = None
+        if spill_dir:
+            os.makedirs(spill_dir, exist_ok=True)
+            existing = history_segments(spill_dir, prefix)
+            self.segment_index = segment_number(existing[-1]) + 1 if existing else 0
+            self.segment_count = 0
+            previous = read_history(spill_dir, prefix)
+            if previous: self.seq = self.spilled = int(previous[-1]["seq"][-1]) + 1
+        self.first_seq = self.seq # Rows below this belong to earlier runs (on disk only)
+
+    def row(self, seq, values, ts=None):
+        return (seq, ts if ts is not None else time.time(),
+                *(float(values.get(f, math.nan)) for f in self.fields))
+
+    def record(self, values, ts=None):
+        """Appends one snapshot (missing fields become NaN). Returns its sequence number."""
+        seq = self.seq
+        self.rows[seq % self.capacity] = self.row(seq, values, ts)
+        self.seq = seq + 1
+        if self.spill_dir and self.seq - self.spilled >= self.batch_rows:
+            self.flush()
+        return seq
+
+    def oldest(self):
+        # First sequence number still held in memory
+        return max(self.first_seq, self.seq - self.capacity)
+
+    def ring_from(self, seq):
+        # In-memory rows with sequence >= seq, oldest first (copies)
+        seq = max(seq, self.oldest())
+        if seq >= self.seq: return self.rows[:0].copy()
+        start, end = seq % self.capacity, self.seq % self.capacity
+        if start < end: return self.rows[start:end].copy()
+        return np.concatenate([self.rows[start:], self.rows[:end]])
+
+    def disk_rows(self):
+        self.flush()
+        return read_history(self.spill_dir, self.prefix, self.fields) if self.spill_dir else []
+
+    def since(self, seq, limit=MAX_ROWS):
+        """Rows with sequence >= seq, up to 'limit' (from disk if they left the ring)."""
+        seq = max(seq, 0)
+        first = self.oldest()
+        parts = []
+        if seq < first:
+            for seg in self.disk_rows():
+                s = seg["seq"]
+                a, b = np.searchsorted(s, seq), np.searchsorted(s, first)
+                if a < b: parts.append(np.asarray(seg[a:b]))
+        parts.append(self.ring_from(seq))
+        return np.concatenate(parts)[:limit]
+
+    def between(self, t0, t1, limit=MAX_ROWS):
+        """Rows with t0 <= ts <= t1, up to 'limit'."""
+        rows = self.ring_from(0)
+        parts = []
+        if self.spill_dir and (not len(rows) or t0 < rows["ts"][0]):
+            first = self.oldest()
+            for seg in self.disk_rows():
+                seg = seg[seg["seq"] < first]
+                parts.append(np.asarray(seg[(seg["ts"] >= t0) & (seg["ts"] <= t1)]))
+        parts.append(rows[(rows["ts"] >= t0) & (rows["ts"] <= t1)])
+        return np.concatenate(parts)[:limit]
+
+    def encode(self, rows, binary=False):
+        """One response: columnar JSON, or a JSON header plus raw little-endian rows."""
+        next_seq = int(rows["seq"][-1]) + 1 if len(rows) else self.seq
+        header = {"fields": ["seq", "ts"] + list(self.fields), "count": len(rows), "next": next_seq}
+        if binary:
+            header["dtype"] = self.dtype.descr
+            head = json.dumps(header).encode()
+            return [RESPONSE_HEADER.pack(len(head)), head, rows.tobytes()]
+        for name in header["fields"]:
+            column = rows[name].tolist()
+            header[name] = column if name == "seq" else [None if v != v else v for v in column]
+        return [json.dumps(header).encode()]
+
+    def pack(self, values, ts=None):
+        """One snapshot as raw row bytes, not recorded; its seq is the next one record() will use."""
+        return np.array([self.row(self.seq, values, ts)], dtype=self.dtype).tobytes()
+
+    def layout(self):
+        # Row format shared by pack() and the binary encode()
+        return {"fields": ["seq", "ts"] + list(self.fields), "dtype": self.dtype.descr, "size": self.dtype.itemsize}
+
+    def flush(self):
+        # Spill every row not yet on disk (they are all still in the ring)
+        if not self.spill_dir or self.spilled >= self.seq: return
+        rows = self.ring_from(self.spilled)
+        while len(rows):
+            if self.file is None or self.segment_count >= self.segment_rows:
+                self.open_segment()
+            take = rows[:self.segment_rows - self.segment_count]
+            self.file.write(take.tobytes())
+            self.segment_count += len(take)
+            rows = rows[len(take):]
+        self.spilled = self.seq
+
+    def open_segment(self):
+        if self.file: self.file.close()
+        path = os.path.join(self.spill_dir, f"{self.prefix}-{self.segment_index:06d}.mhist")
+        head = json.dumps({"fields": list(self.fields), "created": time.time()}).encode()
+        self.file = open(path, "xb", buffering=0)
+        self.file.write(MAGIC + HEADER_LENGTH.pack(len(head)) + head)
+        self.segment_index += 1
+        self.segment_count = 0
+
+    def close(self):
+        self.flush()
+        if self.file:
+            self.file.close()
+            self.file = None
+
+def segment_number(path):
+    return int(os.path.basename(path).rsplit("-", 1)[1].split(".")[0])
+
+def history_segments(directory, prefix="metrics"):
+    """Spill segment files, oldest first."""
+    return sorted(glob.glob(os.path.join(directory, f"{prefix}-*.mhist")), key=segment_number)
+
+def read_history(directory, prefix="metrics", fields=None):
+    """One memmap per spill segment; segments recorded with other fields are skipped when 'fields' is given."""
+    segments = []
+    for path in history_segments(directory, prefix):
+        with open(path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC: continue
+            length, = HEADER_LENGTH.unpack(f.read(HEADER_LENGTH.size))
+            header = json.loads(f.read(length))
+        if fields is not None and tuple(header["fields"]) != tuple(fields): continue
+        dtype = history_dtype(header["fields"])
+        offset = len(MAGIC) + HEADER_LENGTH.size + length
+        count = (os.path.getsize(path) - offset) // dtype.itemsize
+        if count > 0:
+            segments.append(np.memmap(path, dtype=dtype, mode="r", offset=offset, shape=(count,)))
+    return segments
@@ -0,0 +1,135 @@
+import asyncio
+import bisect
+import threading
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+def _labels(labels):
+    if not labels: return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in labels) + "}"
+
+class Metric:
+    """
+    Base for one named metric family.
+    Values are either kept here (inc/set, optionally per label set) or read
+    from 'fn' at scrape time, so existing counters on the bridges can be
+    exported without being duplicated. 'fn' returns a number or a list of
+    (labels dict, value) pairs.
+    """
+    kind = "untyped"
+
+    def __init__(self, name, help, fn=None):
+        self.name = name
+        self.help = help
+        self.fn = fn
+        self.values = {}
+        self.lock = threading.Lock()
+
+    def samples(self):
+        if self.fn is None:
+            with self.lock:
+                return list(self.values.items())
+        value = self.fn()
+        if isinstance(value, list):
+            return [(tuple(sorted(l.items())), v) for l, v in value]
+        return [((), value)]
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for labels, value in self.samples():
+            lines.append(f"{self.name}{_labels(labels)} {float(value or 0)!r}")
+        return lines
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = tuple(sorted(labels.items()))
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def set(self, value, **labels):
+        with self.lock:
+            self.values[tuple(sorted(labels.items()))] = value
+
+class Histogram(Metric):
+    """Fixed-bucket histogram (seconds by default); observe() is a bisect plus two adds."""
+    kind = "histogram"
+
+    def __init__(self, name, help, buckets=LATENCY_BUCKETS):
+        super().__init__(name, help)
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1) # Last slot is +Inf
+        self.sum = 0.0
+
+    def observe(self, value):
+        i = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            self.counts[i] += 1
+            self.sum += value
+
+    def render(self):
+        with self.lock:
+            counts, total = list(self.counts), self.sum
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float("inf"),), counts):
+            cumulative += count
+            le = "+Inf" if bound == float("inf") else repr(bound)
+            lines.append(f'{self.name}_bucket{{le="{le}"}} {cumulative}')
+        lines.append(f"{self.name}_sum {total!r}")
+        lines.append(f"{self.name}_count {cumulative}")
+        return lines
+
+class MetricsRegistry:
+    """Collects a bridge's metrics and renders them in the Prometheus text format."""
+    def __init__(self, prefix="chimera_"):
+        self.prefix = prefix
+        self.metrics = []
+
+    def add(self, metric):
+        metric.name = self.prefix + metric.name
+        self.metrics.append(metric)
+        return metric
+
+    def counter(self, name, help, fn=None):
+        return self.add(Counter(name, help, fn))
+
+    def gauge(self, name, help, fn=None):
+        return self.add(Gauge(name, help, fn))
+
+    def histogram(self, name, help, buckets=LATENCY_BUCKETS):
+        return self.add(Histogram(name, help, buckets))
+
+    def render(self) -> bytes:
+        lines = []
+        for metric in self.metrics:
+            try: lines.extend(metric.render())
+            except Exception: pass # A broken callback must not take the whole scrape down
+        return ("\n".join(lines) + "\n").encode()
+
+def _http_response(body, status="200 OK"):
+    return (f"HTTP/1.1 {status}\r\nContent-Type: {CONTENT_TYPE}\r\n"
+            f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n").encode() + body
+
+async def serve_metrics(registry, host="0.0.0.0", port=9108):
+    """asyncio bridges: minimal HTTP/1.1 endpoint answering GET /metrics."""
+    async def handle(reader, writer):
+        try:
+            request = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), timeout=5.0)
+            path = request.split(b" ", 2)[1] if request.count(b" ") >= 2 else b""
+            if path.split(b"?")[0] in (b"/metrics", b"/"):
+                writer.write(_http_response(registry.render()))
+            else:
+                writer.write(_http_response(b"not found\n", "404 Not Found"))
+            await writer.drain()
+        except Exception: pass
+        finally:
+            writer.close()
+
+    server = await asyncio.start_server(handle, host, port)
+    async with server: await server.serve_forever()
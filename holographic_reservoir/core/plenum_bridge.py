@@ -2,16 +2,56 @@ import asyncio
 import json
 import time
 import binascii
-import hashlib
 import os
-import urllib.request
-import urllib.error
 import struct
+from collections import deque
+
+try:
+    from .entropy_ring import EntropyRing
+    from .shm_ring import SharedEntropyRing
+    from .stratum_core import StratumServer
+    from .stratum_io import FLUSH_TICK
+    from .share_hasher import JobHasher, JobBook
+    from .job_template import NotifyTemplate
+    from .vardiff import VarDiff
+    from .share_journal import ShareJournal, session_prefixes
+    from .journal_replay import JournalReplay
+    from .sharding import ShardLink, ShardPool, SHARD_ID_SPAN
+    from .fleet import ID_SPAN
+    from .axeos_client import TelemetryHub
+except ImportError:
+    from entropy_ring import EntropyRing
+    from shm_ring import SharedEntropyRing
+    from stratum_core import StratumServer
+    from stratum_io import FLUSH_TICK
+    from share_hasher import JobHasher, JobBook
+    from job_template import NotifyTemplate
+    from vardiff import VarDiff
+    from share_journal import ShareJournal, session_prefixes
+    from journal_replay import JournalReplay
+    from sharding import ShardLink, ShardPool, SHARD_ID_SPAN
+    from fleet import ID_SPAN
+    from axeos_client import TelemetryHub
 
 # Configuration
 HOST = "0.0.0.0"
 PORT = 3333
 API_PORT = 4028
+ENTROPY_CAPACITY = 2000 # Hashes kept for BURST consumers (oldest overwritten)
+MAX_BURST = 1000
+MAX_BURST_WAIT_MS = 30000 # Upper bound for BURST:<n>:<timeout_ms> long-polls
+BURST_COUNT_HEADER = struct.Struct(">I") # Long-poll BURST replies start with the hash count
+FLUSH_POLICY = FLUSH_TICK # Stratum responses: one write per event-loop tick ("immediate" = legacy)
+SUBSCRIBE_CMD = "SUBSCRIBE" # Switches an API connection to a push stream of raw 32-byte hashes
+SUBSCRIBER_QUEUE = 4096 # Hashes queued per subscriber before we start dropping
+READ_FROM_HEADER = struct.Struct(">QQ") # (first seq returned, records lost to wrap)
+METRICS_PORT = 9108 # Prometheus text endpoint (GET /metrics); None disables it
+API_COMMANDS = ("SEED", "READ_FROM", "READ_TAGGED", "MINERS", "BURST") # Label values for API metrics
+SHM_NAME = None # e.g. "chimera_entropy": also publish hashes to a shared-memory ring for local consumers
+JOURNAL_DIR = None # e.g. "journal": append every share to a binary journal (see share_journal.py)
+REPLAY_DIR = None # Replay a recorded journal through the API instead of (or alongside) live miners
+REPLAY_SPEED = 1.0 # 1.0 = original timing, N = N× faster, 0 = as fast as possible
+SHARDS = 0 # >1: that many listener processes share PORT via SO_REUSEPORT; this process merges them
 
 # THE DARK PLENUM SETTINGS
 # We set nBits to the easiest possible difficulty (Diff 1) to allow the ASIC
@@ -20,252 +60,446 @@ API_PORT = 4028
 TARGET_DIFFICULTY = 1 
 NBITS_DIFF_1 = "1d00ffff" 
 
+# VARDIFF: per-miner difficulty that holds the share rate the consumers can use
+VARDIFF_TARGET_SPS = 5.0 # Shares/sec per miner when no API consumer is asking for more
+VARDIFF_MIN_SPS = 0.2
+VARDIFF_MAX_SPS = 50.0 # Above this the LV06 Wi-Fi link starts dropping
+VARDIFF_HEADROOM = 1.25 # Produce a bit more than consumers request
+VARDIFF_MAX = 65536
+VARDIFF_INTERVAL = 10.0 # Seconds between retargets
+
 class AxeOSController:
     """
     Neuromorphic Control Interface for AxeOS (Bitaxe/LV06).
     Manages voltage/frequency to modulate the 'Temperature' of the Plenum.
+    Readings come from the shared TelemetryHub instead of a poll of its own.
     """
-    def __init__(self):
+    def __init__(self, telemetry):
+        self.telemetry = telemetry
         self.miner_ip = None
         self.stats = {}
 
     def set_target_ip(self, ip):
         if self.miner_ip != ip:
             print(f"🧬 [Plenum] Target Hardware Acquired: {ip}")
+            if self.miner_ip: self.telemetry.unwatch(self.miner_ip, self.update)
             self.miner_ip = ip
+            self.telemetry.watch(ip, self.update)
 
-    async def poll_telemetry(self):
-        if not self.miner_ip: return
-        
-        url = f"http://{self.miner_ip}/api/system/info"
-        try:
-            response = await asyncio.to_thread(self._http_get, url)
-            if response:
-                data = json.loads(response)
-                self.stats = {
-                    'temp': data.get('temp', 0),
-                    'volts': data.get('volts', 0),
-                    'power': data.get('power', 0),
-                    'freq': data.get('frequency', 0),
-                    'best_diff': data.get('bestDiff', 0)
-                }
-        except Exception as e:
-            pass
+    def update(self, ip, data):
+        self.stats = {
+            'temp': data.get('temp', 0),
+            'volts': data.get('volts', 0),
+            'power': data.get('power', 0),
+            'freq': data.get('frequency', 0),
+            'best_diff': data.get('bestDiff', 0)
+        }
 
-    def _http_get(self, url):
-        try:
-            with urllib.request.urlopen(url, timeout=2) as response:
-                return response.read()
-        except:
-            return None
+    def release(self):
+        if self.miner_ip: self.telemetry.unwatch(self.miner_ip, self.update)
+        self.miner_ip = None
 
-class PlenumBridge:
+class PlenumBridge(StratumServer):
     """
     Layer 0: The Dark Plenum Bridge.
     Acts as a Stratum Server that 'tricks' the ASIC into streaming maximum entropy.
+    The Stratum/API plumbing lives in StratumServer; this class is the entropy policy.
     """
-    def __init__(self):
-        self.clients = set()
-        self.job_counter = 0
-        self.share_counter = 0
-        self.start_time = time.time()
-        self.axeos = AxeOSController()
-        self.entropy_buffer = [] # Buffer for the "Dark Forms"
-        
-    async def handle_client(self, reader, writer):
-        addr = writer.get_extra_info('peername')
-        ip = addr[0]
-        print(f"⚡ [Plenum] ASIC Link Established: {addr}")
-        self.clients.add(writer)
-        self.axeos.set_target_ip(ip)
-        
-        buffer = b""
+    vardiff_interval = VARDIFF_INTERVAL
+    api_commands = API_COMMANDS
+    default_command = "BURST" # Anything else is a legacy BURST
+
+    def __init__(self, shm_name=SHM_NAME, journal_dir=JOURNAL_DIR, replay_dir=REPLAY_DIR, replay_speed=REPLAY_SPEED,
+                 shards=SHARDS, shard_index=None, shard_conn=None):
+        self.current_seed = f"CHIMERA_V3_PLENUM_{time.time()}"
+        self.template = None # Pre-serialized mining.notify for current_seed
+        self.template_seed = None
+        self.controllers = {} # Miner IP -> AxeOSController
+        self.telemetry = TelemetryHub() # Shared AxeOS polling: keep-alive, adaptive rate, cached readings
+        self.jobs = JobBook(depth=256) # Recent jobs with cached merkle roots
+        self.stale_shares = 0 # Shares for jobs no longer in the book (no hash reconstructed)
+        self.entropy_buffer = EntropyRing(ENTROPY_CAPACITY) # Buffer for the "Dark Forms"
+        self.subscribers = set() # One bounded asyncio.Queue per SUBSCRIBE stream
+        self.subscriber_drops = 0
+        self.burst_waiters = deque() # Long-poll BURSTs, served strictly in arrival order: [count, future]
+        self.hashes_served = 0 # Demand: hashes actually returned by BURST/READ_FROM/READ_TAGGED
+        self.last_served, self.last_setpoint = 0, time.time()
+        self.target_sps = VARDIFF_TARGET_SPS # Current per-miner setpoint
+        # Sharding: a worker owns a slice of the miners and forwards its hashes
+        # over 'link'; the merge process owns the ring, API, metrics and replay.
+        self.shards = shards if shard_index is None else 0
+        self.shard_index = shard_index
+        self.shard_kwargs = {"journal_dir": journal_dir}
+        self.pool = None # ShardPool, created at start() in the merge process
+        self.link = ShardLink(shard_conn, self) if shard_conn is not None else None
+        worker = shard_index is not None
+        # Shared-memory transport for consumers on the same host (optional): no socket or JSON
+        self.shm_ring = SharedEntropyRing(shm_name) if shm_name and not worker else None
+        # Permanent record of every share, for offline analysis (optional).
+        # Shards journal where the share fields are: one journal per worker.
+        prefix = f"shard{shard_index}" if worker else "shares"
+        self.journal = ShareJournal(journal_dir, prefix) if journal_dir and self.shards <= 1 else None
+        # Replay reads back either layout: "shares", or the shard<i> journals merged by arrival time
+        self.replay = JournalReplay(replay_dir, session_prefixes(replay_dir), replay_speed) if replay_dir and not worker else None
+        super().__init__(HOST, PORT, None if worker else API_PORT, None if worker else METRICS_PORT,
+                         TARGET_DIFFICULTY, FLUSH_POLICY,
+                         tag=f"[Plenum/{shard_index}] " if worker else "[Plenum] ", metrics_prefix="plenum_",
+                         first_miner_id=shard_index * SHARD_ID_SPAN if worker else 0,
+                         miner_id_span=SHARD_ID_SPAN if worker else ID_SPAN, reuse_port=worker)
+
+    def build_metrics(self, m):
+        m = super().build_metrics(m)
+        m.counter("stale_shares_total", "Shares for jobs no longer in the job book", lambda: self.stale_shares)
+        m.counter("hashes_overwritten_total", "Hashes overwritten in the ring before any BURST read them", lambda: self.entropy_buffer.overwritten)
+        m.counter("shard_link_drops_total", "Hashes shard workers dropped while the merge process lagged", lambda: self.pool.total("link_drops") if self.pool else 0)
+        m.counter("subscriber_drops_total", "Hashes dropped on full SUBSCRIBE queues", lambda: self.subscriber_drops)
+        m.counter("journal_records_total", "Shares appended to the journal", lambda: self.journal.records if self.journal else 0)
+        m.counter("journal_errors_total", "Shares not journaled (malformed or out-of-range fields)", lambda: self.journal.errors if self.journal else 0)
+        m.gauge("buffer_depth", "Hashes currently held in the entropy ring", lambda: len(self.entropy_buffer))
+        m.gauge("subscribers", "Active SUBSCRIBE streams", lambda: len(self.subscribers))
+        m.gauge("vardiff_target_sps", "Per-miner shares/sec setpoint", lambda: self.target_sps)
+        m.counter("telemetry_polls_total", "AxeOS telemetry readings", lambda: self.telemetry.polls)
+        m.counter("telemetry_errors_total", "AxeOS telemetry polls that failed", lambda: self.telemetry.errors)
+        m.gauge("shard_miners", "Miners attached to each listener process", lambda: [
+            ({"shard": i}, len(s.get("miners", []))) for i, s in self.pool.stats.items()] if self.pool else [])
+        for key, help in (("temp", "ASIC temperature (C)"), ("power", "Power draw (W)"),
+                          ("freq", "ASIC frequency (MHz)"), ("volts", "Core voltage (mV)")):
+            m.gauge(f"miner_{key}", help, lambda key=key: [
+                ({"miner": s.miner_id, "ip": s.ip}, s.control.stats.get(key, 0))
+                for s in self.fleet if s.control and s.control.stats])
+        return m
+
+    async def on_connect(self, writer, session):
+        if session.ip not in self.controllers:
+            self.controllers[session.ip] = AxeOSController(self.telemetry)
+        session.control = self.controllers[session.ip]
+        session.control.set_target_ip(session.ip)
+
+    async def on_disconnect(self, writer, session):
+        if not any(s.ip == session.ip for s in self.fleet):
+            control = self.controllers.pop(session.ip, None)
+            if control: control.release()
+
+    async def on_authorize(self, writer, session):
+        # Authorize and OPEN THE FLOODGATES
+        print("🔓 [Plenum] Access Authorized. Opening Entropy Valve...")
+        await super().on_authorize(writer, session)
+
+    def make_vardiff(self, session):
+        return VarDiff(self.target_sps, TARGET_DIFFICULTY, TARGET_DIFFICULTY, VARDIFF_MAX, VARDIFF_INTERVAL)
+
+    async def on_submit(self, writer, session, params, received_ns):
+        # CAPTURE THE PATTERN (Layer 0 -> Layer 1)
+        # params: [worker, job_id, extranonce2, ntime, nonce, (version_bits)]
+        if len(params) >= 5:
+            h = self.share_hash(session, params)
+            if h:
+                self.capture(h, session.miner_id)
+                if self.journal:
+                    self.journal.append(session.miner_id, params[1], params[2], params[3], params[4], h,
+                                        params[5] if len(params) >= 6 else None,
+                                        session.kernel_ns or received_ns, received_ns)
+        return True
+
+    def capture(self, h, source):
+        # All miners merge into one stream; the ring tags each hash with its source
+        if self.link:
+            self.link.push(h, source) # Shard worker: the merge process owns the ring
+            return
+        self.entropy_buffer.push(h, source) # Ring overwrites oldest when full
+        if self.shm_ring: self.shm_ring.push(h)
+        self.publish(h)
+        if self.burst_waiters: self.serve_bursts()
+
+    def serve_bursts(self):
+        # Hand hashes to waiting long-poll BURSTs in FIFO order: the head
+        # waiter is served (copied out of the ring) as soon as its count is
+        # there, and nobody behind it is served first.
+        while self.burst_waiters:
+            count, future = self.burst_waiters[0]
+            if future.done():
+                self.burst_waiters.popleft()
+                continue
+            if len(self.entropy_buffer) < count: break
+            self.burst_waiters.popleft()
+            future.set_result(b"".join(self.entropy_buffer.pop_burst(count)))
+
+    async def burst_wait(self, count, timeout):
+        # BURST:<n>:<timeout_ms> -> waits until n hashes exist or the deadline
+        # passes, then returns what it has behind a 4-byte count header.
+        if not self.burst_waiters and len(self.entropy_buffer) >= count:
+            data = b"".join(self.entropy_buffer.pop_burst(count))
+        else:
+            future = asyncio.get_running_loop().create_future()
+            waiter = [count, future]
+            self.burst_waiters.append(waiter)
+            try:
+                data = await asyncio.wait_for(future, timeout)
+            except asyncio.TimeoutError:
+                # Deadline: take the partial batch, unless an older waiter is still ahead
+                at_head = self.burst_waiters and self.burst_waiters[0] is waiter
+                try: self.burst_waiters.remove(waiter)
+                except ValueError: pass
+                data = b"".join(self.entropy_buffer.pop_burst(count)) if at_head else b""
+                self.serve_bursts()
+        return [BURST_COUNT_HEADER.pack(len(data) // 32), data]
+
+    def share_hash(self, session, params):
+        # The real header hash the ASIC computed, rebuilt from the job's cached merkle roots.
+        job = self.jobs.get(params[1])
+        if job is None:
+            self.stale_shares += 1
+            return None
+        version_bits = params[5] if len(params) >= 6 else None
         try:
-            while True:
-                data = await reader.read(8192) # Larger buffer for high throughput
-                if not data: break
-                
-                buffer += data
-                while b'\n' in buffer:
-                    line, buffer = buffer.split(b'\n', 1)
-                    if not line: continue
-                    try:
-                        msg = json.loads(line)
-                        await self.process_message(writer, msg)
-                    except json.JSONDecodeError:
-                        pass
-        except Exception as e:
-            print(f"❌ [Plenum] Link Error {addr}: {e}")
-        finally:
-            print(f"🔌 [Plenum] ASIC Disconnected: {addr}")
-            self.clients.discard(writer)
-            writer.close()
-            await writer.wait_closed()
-
-    async def process_message(self, writer, msg):
-        msg_id = msg.get('id')
-        method = msg.get('method')
-        
-        if method == 'mining.subscribe':
-            # V3 Standard Response
-            result = [[["mining.set_difficulty", "1"], ["mining.notify", "1"]], "08000002", 4]
-            await self.send_res(writer, msg_id, result)
-
-        elif method == 'mining.configure':
-            # Enable version rolling for optimization
-            result = {"version-rolling": True, "version-rolling.mask": "ffffffff"}
-            await self.send_res(writer, msg_id, result)
-            
-        elif method == 'mining.suggest_difficulty':
-            await self.send_res(writer, msg_id, True)
-
-        elif method == 'mining.authorize':
-            # Authorize and OPEN THE FLOODGATES
-            await self.send_res(writer, msg_id, True)
-            print("🔓 [Plenum] Access Authorized. Opening Entropy Valve...")
-            await self.send_notif(writer, "mining.set_difficulty", [TARGET_DIFFICULTY])
-            await self.send_job(writer)
-
-        elif method == 'mining.submit':
-            self.share_counter += 1
-            
-            # CAPTURE THE PATTERN (Layer 0 -> Layer 1)
-            # params: [worker, job_id, extranonce2, ntime, nonce]
-            params = msg.get('params', [])
-            if len(params) >= 5:
-                nonce = params[4]
-                # Store specific entropy for API consumption
-                # We use (Nonce + Time) hash as a high-quality entropy source
-                entropy_seed = f"{nonce}-{time.time()}".encode()
-                h = hashlib.sha256(entropy_seed).digest()
-                self.entropy_buffer.append(h)
-                
-                # Keep buffer manageable
-                if len(self.entropy_buffer) > 2000:
-                    self.entropy_buffer = self.entropy_buffer[-1000:]
-            
-            await self.send_res(writer, msg_id, True)
+            return job.share_hash(session.extranonce1, params[2], params[3], params[4], version_bits)
+        except (ValueError, TypeError, binascii.Error):
+            return None
+
+    def publish(self, h):
+        # Push a fresh hash to every SUBSCRIBE stream without waiting on any of them.
+        for queue in self.subscribers:
+            try: queue.put_nowait(h)
+            except asyncio.QueueFull: self.subscriber_drops += 1
 
-    async def send_job(self, writer):
+    def next_job(self):
+        # Returns the serialized mining.notify line for a fresh job id.
+        # The template is rebuilt only when the seed changes; per job we just
+        # patch in the id and ntime.
+        if self.template is None or self.template_seed != self.current_seed:
+            # Semantic Seed Injection
+            coinbase = binascii.hexlify(f"{self.current_seed}".encode()).decode()
+            # The 'nBits' field (7th param) controls the ASIC's target.
+            # 1d00ffff is Diff 1. This ensures the ASIC sends EVERYTHING.
+            self.template = NotifyTemplate("0"*64, coinbase, "0000", [], "20000000", NBITS_DIFF_1)
+            self.template_seed = self.current_seed
+        
         self.job_counter += 1
         job_id = f"{self.job_counter:x}"
-        # Semantic Seed Injection
-        current_s = getattr(self, 'current_seed', f"CHIMERA_V3_PLENUM_{time.time()}")
-        coinbase = binascii.hexlify(f"{current_s}".encode()).decode()
-        
-        # The 'nBits' field (7th param) controls the ASIC's target.
-        # 1d00ffff is Diff 1. This ensures the ASIC sends EVERYTHING.
-        params = [
-            job_id,
-            "0"*64, coinbase, "0000", [], "20000000", NBITS_DIFF_1, hex(int(time.time()))[2:], True
-        ]
-        await self.send_notif(writer, "mining.notify", params)
-
-    async def send_res(self, writer, msg_id, result):
-        line = json.dumps({"id": msg_id, "result": result, "error": None}) + "\n"
-        try:
-            writer.write(line.encode())
-            await writer.drain()
-        except: pass
+        self.current_job_id = job_id
+        t = self.template
+        # Remember the job so its shares can be hashed for real
+        self.jobs.add(JobHasher(job_id, t.prevhash, t.coinb1, t.coinb2, t.merkle_branch, t.version, t.nbits))
+        return t.render(job_id)
 
-    async def send_notif(self, writer, method, params):
-        line = json.dumps({"id": None, "method": method, "params": params}) + "\n"
-        try:
-            writer.write(line.encode())
-            await writer.drain()
-        except: pass
+    async def api_stream(self, message, reader, writer):
+        # SUBSCRIBE turns the API connection into a push stream (also from KEEPALIVE mode)
+        if message != SUBSCRIBE_CMD: return False
+        await writer.drain()
+        await self.serve_subscriber(reader, writer)
+        return True
 
-    async def handle_api_client(self, reader, writer):
-        # Layer 0 API: Consumed by Layer 1 (Metrics) and Experiments
-        # Implements BURST PROTOCOL & SEED INJECTION
+    async def serve_subscriber(self, reader, writer):
+        # Push mode: every captured share hash is streamed as 32 raw bytes.
+        # drain() applies backpressure; a slow reader only loses its own hashes.
+        queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE)
+        self.subscribers.add(queue)
+        print(f"📡 [Plenum] Entropy Subscriber Attached ({len(self.subscribers)} active)")
+        pump = asyncio.current_task()
+        
+        async def watch_eof():
+            # The client never talks after SUBSCRIBE; EOF means it left.
+            while await reader.read(1024): pass
+            pump.cancel()
+        
+        watcher = asyncio.create_task(watch_eof())
         try:
-            data = await asyncio.wait_for(reader.read(1024), timeout=1.0)
-            message = data.decode().strip()
-            
-            # 1. SEED INJECTION
-            if message.startswith("SEED:"):
-                seed_text = message.split(":", 1)[1]
-                print(f"🌱 [Plenum] New Semantic Seed Injected: '{seed_text[:30]}...'")
-                # Update the global coinbase base
-                self.current_seed = seed_text
-                # Trigger immediate job update to all clients
-                # (Ideally we'd do this, but for now next job loop will pick it up)
-                writer.write(b"OK")
+            while True:
+                writer.write(await queue.get())
+                # Coalesce everything that piled up while we were draining
+                while not queue.empty():
+                    writer.write(queue.get_nowait())
                 await writer.drain()
-                return
+        except (asyncio.CancelledError, ConnectionError):
+            pass
+        finally:
+            watcher.cancel()
+            self.subscribers.discard(queue)
+            print(f"📡 [Plenum] Entropy Subscriber Detached ({len(self.subscribers)} active)")
 
-            # 2. BURST PROTOCOL
-            count = 1
-            if message.startswith("BURST:"):
-                try:count = min(int(message.split(":")[1]), 1000)
-                except: count = 1
-            
-            response_buffer = b""
-            for _ in range(count):
-                if self.entropy_buffer:
-                    response_buffer += self.entropy_buffer.pop(0)
-                else:
-                    break # STOP. Do not send fake data.
-            
-            # If we have no data, we send nothing. Client socket read will timeout/wait.
-            # Or we send whatever we have.
-            if response_buffer:
-                writer.write(response_buffer)
-                await writer.drain()
+    async def api_command(self, message):
+        # Returns the response payload as a list of buffers (possibly empty).
+        # 1. SEED INJECTION
+        if message.startswith("SEED:"):
+            seed_text = message.split(":", 1)[1]
+            print(f"🌱 [Plenum] New Semantic Seed Injected: '{seed_text[:30]}...'")
+            # Update the global coinbase base
+            self.current_seed = seed_text
+            self.telemetry.boost() # New experiment phase: watch the hardware closely
+            # Trigger immediate job update to all clients (clean_jobs=True aborts old work).
+            # Reply OK:<job_id>:<seq>: the job every miner now has, and the first
+            # log sequence number that can contain shares for it.
+            seq = self.entropy_buffer.tail
+            if self.pool:
+                # Every listener pushes its own job; the reply lists them in shard order
+                job_id = ",".join(await self.pool.broadcast({"cmd": "seed", "seed": seed_text}))
+                print(f"🌱 [Plenum] Seed pushed as jobs {job_id} to {self.shards} shard(s)")
             else:
-                # Send explicit WAIT signal? Or just close?
-                # Best to just write nothing and close. Client will see 0 bytes and retry.
-                pass
-            
-        except Exception: pass
-        finally: 
-            writer.close()
-            await writer.wait_closed()
+                job_id = await self.broadcast_job()
+                print(f"🌱 [Plenum] Seed pushed as job {job_id} to {len(self.clients)} miner(s)")
+            return [f"OK:{job_id}:{seq}".encode()]
+
+        # 2. BROADCAST LOG (non-destructive, one cursor per reader)
+        # READ_FROM:<seq>:<n> -> 16-byte header (first seq, lost) + hashes
+        if message.startswith("READ_FROM:"):
+            try:
+                _, seq, n = message.split(":")
+                seq, n = max(0, int(seq)), min(max(int(n), 0), MAX_BURST)
+            except ValueError:
+                return []
+            start, views, lost = self.entropy_buffer.read_from(seq, n)
+            self.hashes_served += sum(len(v) for v in views) // 32
+            return [READ_FROM_HEADER.pack(start, lost)] + views
 
-    async def start_api(self):
-        print(f"🔗 [Plenum] Bridge API Listening on 0.0.0.0:{API_PORT}")
-        server = await asyncio.start_server(self.handle_api_client, "0.0.0.0", API_PORT)
-        async with server: await server.serve_forever()
+        # READ_TAGGED:<seq>:<n> -> same header, n big-endian uint16 miner ids, then n hashes
+        if message.startswith("READ_TAGGED:"):
+            try:
+                _, seq, n = message.split(":")
+                seq, n = max(0, int(seq)), min(max(int(n), 0), MAX_BURST)
+            except ValueError:
+                return []
+            start, views, lost = self.entropy_buffer.read_from(seq, n)
+            count = sum(len(v) for v in views) // 32
+            self.hashes_served += count
+            return [READ_FROM_HEADER.pack(start, lost)] + self.entropy_buffer.tag_slices(start, count) + views
+
+        # 3. FLEET STATUS (JSON)
+        if message == "MINERS":
+            return [json.dumps(self.miner_summaries()).encode()]
+
+        # 4. BURST PROTOCOL (destructive: readers split the stream)
+        count = 1
+        wait_ms = None
+        if message.startswith("BURST:"):
+            parts = message.split(":")
+            try:count = min(max(int(parts[1]), 0), MAX_BURST)
+            except: count = 1
+            if len(parts) > 2:
+                try: wait_ms = min(max(int(parts[2]), 0), MAX_BURST_WAIT_MS)
+                except ValueError: wait_ms = 0
+        if wait_ms is not None:
+            payload = await self.burst_wait(count, wait_ms / 1000)
+        else:
+            # Zero-copy drain: at most two contiguous slices of the ring.
+            # If the ring holds fewer than 'count' we send only what is real.
+            payload = self.entropy_buffer.pop_burst(count)
+        self.hashes_served += sum(len(p) for p in payload) // 32 # The count header is 4 bytes: never a whole hash
+        return payload
 
     async def telemetry_loop(self):
         print(f"📊 [Plenum] Telemetry Active")
         while True:
-            await asyncio.sleep(2.0) # Fast poll for high precision
-            await self.axeos.poll_telemetry()
+            await asyncio.sleep(2.0)
+            # Miner readings arrive through self.telemetry (one adaptive poller per IP)
+            if self.journal: self.journal.flush()
+            if self.link:
+                # Shard worker: the merge process aggregates and reports
+                self.link.send_stats({"shares": self.share_counter, "stale": self.stale_shares,
+                                      "malformed": self.malformed_lines, "link_drops": self.link.drops,
+                                      "miners": self.fleet.summary()})
+                continue
+            if self.pool:
+                self.share_counter = self.pool.total("shares")
+                self.stale_shares = self.pool.total("stale")
+                self.malformed_lines = self.pool.total("malformed")
             
             # Status Report
             elapsed = time.time() - self.start_time
             sps = self.share_counter / elapsed if elapsed > 0 else 0
+            miners = self.miner_summaries()
             
-            axe_stats = self.axeos.stats
-            status = f"🌌 STATUS: {sps:.2f} Flow/sec | Buffer: {len(self.entropy_buffer)}"
-            if axe_stats:
-                status += f" | 🌡️ {axe_stats.get('temp')}C | ⚡ {axe_stats.get('power')}W | 🧠 {axe_stats.get('freq')}MHz"
-                
+            status = f"🌌 STATUS: {sps:.2f} Flow/sec | Buffer: {len(self.entropy_buffer)} | Fleet: {len(miners)} | Target: {self.target_sps:.2f} sh/s/miner"
             print(status)
+            for miner in miners:
+                axe_stats = miner.get("stats") or {}
+                line = f"   ⛏️ #{miner['id']} {miner['ip']} [{miner['extranonce1']}] Shares: {miner['shares']}"
+                if miner.get("difficulty") is not None: line += f" | Diff: {miner['difficulty']}"
+                if axe_stats:
+                    line += f" | 🌡️ {axe_stats.get('temp')}C | ⚡ {axe_stats.get('power')}W | 🧠 {axe_stats.get('freq')}MHz"
+                print(line)
 
-    async def job_generator_loop(self):
-        # "Tsunami Mode": Keep the ASIC overwhelmed with work
-        print(f"🌊 [Plenum] Tsunami Job Generator Active")
-        while True:
-            await asyncio.sleep(5.0) 
-            if self.clients:
-                for writer in list(self.clients):
-                    try: await self.send_job(writer)
-                    except: pass
+    def miner_summaries(self):
+        # Local fleet, or every shard's fleet as last reported
+        return self.pool.summaries() if self.pool else self.fleet.summary()
+
+    def fleet_setpoint(self, demand_rate):
+        # Per-miner shares/sec. Follows what API consumers ask for (split over
+        # the fleet), backs off while the buffer is close to overwriting
+        # unread hashes and pushes harder while it is running dry.
+        miners = max(len(self.miner_summaries()), 1)
+        target = demand_rate * VARDIFF_HEADROOM / miners if demand_rate > 0 else VARDIFF_TARGET_SPS
+        fill = len(self.entropy_buffer) / self.entropy_buffer.capacity
+        if fill > 0.9: target *= 0.5
+        elif fill < 0.1 and demand_rate > 0: target *= 1.5
+        return min(max(target, VARDIFF_MIN_SPS), VARDIFF_MAX_SPS)
+
+    def vardiff_setpoint(self, now):
+        # Shard workers follow the setpoint the merge process pushes down
+        if self.link: return self.target_sps
+        # Demand = hashes served over the API since the last vardiff tick
+        # (what consumers actually took, not what an idle long-poll asked for)
+        demand = (self.hashes_served - self.last_served) / max(now - self.last_setpoint, 1e-9)
+        self.last_served, self.last_setpoint = self.hashes_served, now
+        self.target_sps = self.fleet_setpoint(demand)
+        if self.pool: self.pool.notify({"cmd": "setpoint", "sps": self.target_sps})
+        return self.target_sps
+
+    async def shard_command(self, cmd):
+        # Commands from the merge process (shard workers only)
+        if cmd["cmd"] == "seed":
+            self.current_seed = cmd["seed"]
+            self.telemetry.boost()
+            return await self.broadcast_job()
+        if cmd["cmd"] == "setpoint":
+            self.target_sps = cmd["sps"]
+        return None
+
+    async def replay_loop(self):
+        # Offline source: recorded shares go through the same capture path as live ones
+        speed = f"{self.replay.speed}x" if self.replay.speed else "max speed"
+        print(f"📼 [Plenum] Replaying {self.replay.total} recorded shares ({speed})")
+        started = time.time()
+        async for chunk in self.replay.chunks():
+            for h, miner in zip(chunk["hash"], chunk["miner"]):
+                self.share_counter += 1
+                self.capture(h.tobytes(), int(miner))
+        elapsed = time.time() - started
+        print(f"📼 [Plenum] Replay finished: {self.replay.replayed} shares in {elapsed:.2f}s")
+
+    def background_tasks(self):
+        # "Tsunami Mode" job generator, vardiff, API and metrics come from the core
+        tasks = [self.telemetry_loop()] + super().background_tasks()
+        if self.replay: tasks.append(self.replay_loop())
+        return tasks
 
     async def start(self):
+        if self.link:
+            self.link.start()
+            await super().start()
+            return
         print(f"🚀 CHIMERA V3: THE DARK PLENUM BRIDGE (AsyncIO + Flood)")
         print(f"    Target: 500 GH/s Flow | Strategy: nBits Hack ({NBITS_DIFF_1})")
-        
-        # Start Servers
-        server = await asyncio.start_server(self.handle_client, HOST, PORT)
-        asyncio.create_task(self.telemetry_loop())
-        asyncio.create_task(self.job_generator_loop())
-        asyncio.create_task(self.start_api())
-        
-        async with server:
-            await server.serve_forever()
+        if self.shards > 1:
+            await self.start_merge()
+        else:
+            await super().start()
+
+    async def start_merge(self):
+        # Listener processes own port 3333; this one owns the ring, API, metrics and replay
+        print(f"🧩 [Plenum] {self.shards} listener processes on port {PORT} (SO_REUSEPORT)")
+        self.pool = ShardPool(self, type(self), self.shards, self.shard_kwargs)
+        self.pool.start()
+        for task in self.background_tasks():
+            asyncio.create_task(task)
+        try:
+            await asyncio.Event().wait()
+        finally:
+            self.pool.stop()
+
+    def close(self):
+        if self.link: self.link.close()
+        if self.shm_ring: self.shm_ring.close()
+        if self.journal: self.journal.close()
 
 if __name__ == "__main__":
     bridge = PlenumBridge()
@@ -273,3 +507,5 @@ if __name__ == "__main__":
         asyncio.run(bridge.start())
     except KeyboardInterrupt:
         print("🛑 [Plenum] Collapse.")
+    finally:
+        bridge.close()
@@ -0,0 +1,111 @@
+import math
+
+WINDOWS = (10, 100, 1000, 10000) # Sliding windows, in inter-arrival intervals
+LOG_BIN_MIN = 1e-5 # Seconds; shorter intervals land in the first bin
+LOG_BINS_PER_DECADE = 8
+LOG_DECADES = 8 # 10 µs .. 1000 s
+
+class RhythmWindow:
+    """Welford mean/M2 and a log-binned interval histogram over the last 'size' intervals."""
+    __slots__ = ("size", "n", "mean", "m2", "counts")
+
+    def __init__(self, size, bins):
+        self.size = size
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.counts = [0] * bins
+
+    def std(self):
+        return math.sqrt(max(self.m2, 0.0) / self.n) if self.n else 0.0
+
+    def cv(self):
+        # Coefficient of variation: ~1 for a Poisson process, >1 bursty, <1 regular
+        return self.std() / self.mean if self.mean > 0 else 0.0
+
+    def entropy(self):
+        # Shannon entropy (nats) of the interval histogram
+        if not self.n: return 0.0
+        return max(0.0, -sum(c / self.n * math.log(c / self.n) for c in self.counts if c))
+
+    def summary(self):
+        return {"n": self.n, "mean_ms": self.mean * 1e3, "cv": self.cv(), "entropy": self.entropy()}
+
+class RhythmAnalyzer:
+    """
+    Streaming inter-arrival statistics over several sliding windows at once.
+    One ring holds the last max(windows) intervals (and their histogram bin);
+    each share adds its interval to every window and retires the interval
+    that just left it, so an update costs O(len(windows)) whatever the window
+    sizes. Mean/variance use Welford's update (with the matching removal
+    step) and are recomputed exactly once per window length to stop float
+    drift, which keeps the cost amortized O(1). Entropy is only evaluated
+    when read.
+    """
+    def __init__(self, windows=WINDOWS, min_interval=LOG_BIN_MIN,
+                 bins_per_decade=LOG_BINS_PER_DECADE, decades=LOG_DECADES):
+        self.log_min = math.log10(min_interval)
+        self.min_interval = min_interval
+        self.bins_per_decade = bins_per_decade
+        self.bins = bins_per_decade * decades
+        self.windows = [RhythmWindow(size, self.bins) for size in sorted(windows)]
+        self.capacity = self.windows[-1].size
+        self.intervals = [0.0] * self.capacity
+        self.interval_bins = [0] * self.capacity
+        self.count = 0 # Intervals seen
+        self.last_ns = None
+
+    def bin_of(self, dt):
+        if dt <= self.min_interval: return 0
+        return min(int((math.log10(dt) - self.log_min) * self.bins_per_decade), self.bins - 1)
+
+    def add(self, ts_ns):
+        """Feeds one arrival time (ns). The first arrival only sets the reference."""
+        if self.last_ns is None:
+            self.last_ns = ts_ns
+            return
+        dt = max(ts_ns - self.last_ns, 0) / 1e9
+        self.last_ns = ts_ns
+        b = self.bin_of(dt)
+        count, cap = self.count, self.capacity
+        for w in self.windows:
+            w.counts[b] += 1
+            if w.n < w.size:
+                w.n += 1
+                delta = dt - w.mean
+                w.mean += delta / w.n
+                w.m2 += delta * (dt - w.mean)
+                continue
+            # Slide: the interval leaving this window was added 'size' intervals ago
+            j = (count - w.size) % cap
+            old = self.intervals[j]
+            w.counts[self.interval_bins[j]] -= 1
+            old_mean = w.mean
+            w.mean += (dt - old) / w.size
+            w.m2 += (dt - old) * (dt - w.mean + old - old_mean)
+        pos = count % cap
+        self.intervals[pos] = dt
+        self.interval_bins[pos] = b
+        self.count = count + 1
+        for w in self.windows:
+            if w.n == w.size and self.count % w.size == 0:
+                self.recompute(w)
+
+    def recompute(self, w):
+        # Exact mean/M2 of the window's current contents
+        end = self.count % self.capacity
+        start = end - w.size
+        values = self.intervals[start:end] if start >= 0 else self.intervals[start:] + self.intervals[:end]
+        w.mean = math.fsum(values) / w.size
+        w.m2 = math.fsum((v - w.mean) ** 2 for v in values)
+
+    def recent(self, n):
+        """The last n intervals (seconds), oldest first."""
+        n = min(n, self.count, self.capacity)
+        end = self.count % self.capacity
+        start = end - n
+        return self.intervals[start:end] if start >= 0 else self.intervals[start:] + self.intervals[:end]
+
+    def summary(self):
+        """Per-window stats keyed by window size (as strings, JSON-ready)."""
+        return {str(w.size): w.summary() for w in self.windows}
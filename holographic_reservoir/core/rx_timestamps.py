@@ -0,0 +1,69 @@
+import asyncio
+import os
+import socket
+import struct
+import sys
+
+SO_TIMESTAMPNS = 35 # Linux (asm-generic); the socket module does not export it
+TIMESPEC = struct.Struct("@ll") # struct timespec: tv_sec, tv_nsec
+ANCILLARY_SIZE = socket.CMSG_SPACE(TIMESPEC.size) if hasattr(socket, "CMSG_SPACE") else 0
+
+def enable_rx_timestamps(sock):
+    """Asks the kernel to stamp received data (SO_TIMESTAMPNS). Returns False where unsupported."""
+    if not sys.platform.startswith("linux") or not ANCILLARY_SIZE:
+        return False
+    try:
+        sock.setsockopt(socket.SOL_SOCKET, SO_TIMESTAMPNS, 1)
+        return True
+    except OSError:
+        return False
+
+def kernel_stamp(ancdata):
+    """Receive time (ns since the epoch) from recvmsg() ancillary data, or None."""
+    for level, kind, data in ancdata:
+        if level == socket.SOL_SOCKET and kind == SO_TIMESTAMPNS and len(data) >= TIMESPEC.size:
+            sec, nsec = TIMESPEC.unpack_from(data)
+            return sec * 1_000_000_000 + nsec
+    return None
+
+class StampedReader:
+    """
+    Readiness-driven recvmsg() for a connection accepted by asyncio.
+    The stream transport keeps doing the writes; its reading is paused and
+    this reader pulls the bytes itself, together with the kernel receive
+    timestamp of the data. A TCP read is stamped with the newest segment it
+    consumed, so when several segments are queued (the host was busy) one
+    big read would give them all the same time. Instead the queue is peeked
+    and consumed one line at a time: each line (share) carries the stamp of
+    the segment that completed it.
+    """
+    def __init__(self, writer, size=8192):
+        # A dup of the transport's socket: same connection, our own fd to watch
+        self.sock = socket.socket(fileno=os.dup(writer.get_extra_info("socket").fileno()))
+        self.sock.setblocking(False)
+        self.enabled = enable_rx_timestamps(self.sock)
+        self.size = size
+        writer.transport.pause_reading()
+
+    async def read(self):
+        # Returns (data, kernel_ns): at most one complete line, b"" at EOF;
+        # kernel_ns is None if the kernel gave no stamp
+        loop = asyncio.get_running_loop()
+        fd = self.sock.fileno()
+        while True:
+            try:
+                queued = self.sock.recv(self.size, socket.MSG_PEEK)
+                if not queued: return b"", None
+                data, ancdata, _, _ = self.sock.recvmsg(queued.find(b"\n") + 1 or len(queued), ANCILLARY_SIZE)
+                return data, kernel_stamp(ancdata)
+            except (BlockingIOError, InterruptedError):
+                pass
+            ready = loop.create_future()
+            loop.add_reader(fd, lambda: ready.done() or ready.set_result(None))
+            try:
+                await ready
+            finally:
+                loop.remove_reader(fd)
+
+    def close(self):
+        self.sock.close()
@@ -0,0 +1,210 @@
+import asyncio
+import json
+import multiprocessing
+import queue
+import socket
+import struct
+import threading
+
+SHARD_ID_SPAN = 4096 # Miner ids (and so extranonce1 values) reserved per worker
+MAX_SHARDS = 16 # Keeps every miner id inside the ring's uint16 source tags
+MSG_HASHES = b"H" # count, count x uint16 source, count x 32-byte hash
+MSG_STATS = b"S" # JSON telemetry snapshot
+MSG_REPLY = b"R" # JSON {"id", "result"} answer to a command
+COUNT = struct.Struct(">I")
+LINK_QUEUE = 1024 # Messages a worker buffers for the merge process before dropping hashes
+
+def reuse_port_available():
+    return hasattr(socket, "SO_REUSEPORT")
+
+class ShardLink:
+    """
+    Worker end of a shard pipe.
+    Hashes captured during one event-loop tick go up to the merge process as
+    a single message; telemetry goes up as JSON snapshots. Commands from the
+    merge process (seed, setpoint) come down as JSON and are handed to
+    bridge.shard_command().
+    Pipe writes happen on a sender thread behind a bounded queue, so a merge
+    process that falls behind never stalls this worker's event loop; when
+    the queue is full, hash batches are dropped and counted in 'drops'.
+    """
+    def __init__(self, conn, bridge, queue_size=LINK_QUEUE):
+        self.conn = conn
+        self.bridge = bridge
+        self.sources = []
+        self.hashes = []
+        self.scheduled = False
+        self.main_task = None
+        self.outbox = queue.Queue(queue_size)
+        self.drops = 0 # Hashes dropped on a full outbox
+        self.sender = threading.Thread(target=self.send_loop, daemon=True)
+        self.sender.start()
+
+    def send_loop(self):
+        while True:
+            msg = self.outbox.get()
+            if msg is None: return
+            try:
+                self.conn.send_bytes(msg)
+            except OSError:
+                return # Merge process is gone; on_command shuts the worker down
+
+    def start(self):
+        self.main_task = asyncio.current_task()
+        asyncio.get_running_loop().add_reader(self.conn.fileno(), self.on_command)
+
+    def push(self, h, source):
+        self.sources.append(source)
+        self.hashes.append(h)
+        if not self.scheduled:
+            self.scheduled = True
+            asyncio.get_running_loop().call_soon(self.flush)
+
+    def flush(self):
+        self.scheduled = False
+        if not self.hashes: return
+        n = len(self.hashes)
+        msg = MSG_HASHES + COUNT.pack(n) + struct.pack(f">{n}H", *self.sources) + b"".join(self.hashes)
+        self.sources.clear()
+        self.hashes.clear()
+        try:
+            self.outbox.put_nowait(msg)
+        except queue.Full:
+            self.drops += n
+
+    def send_stats(self, stats):
+        try:
+            self.outbox.put_nowait(MSG_STATS + json.dumps(stats).encode())
+        except queue.Full:
+            pass # The next snapshot supersedes it
+
+    def on_command(self):
+        while self.conn.poll():
+            try:
+                cmd = json.loads(self.conn.recv_bytes())
+            except (EOFError, OSError):
+                # Merge process is gone: nothing left to report to
+                asyncio.get_running_loop().remove_reader(self.conn.fileno())
+                if self.main_task: self.main_task.cancel()
+                return
+            asyncio.create_task(self.run_command(cmd))
+
+    async def run_command(self, cmd):
+        result = await self.bridge.shard_command(cmd)
+        if cmd.get("id") is not None:
+            self.flush() # Hashes captured before the reply arrive before it
+            msg = MSG_REPLY + json.dumps({"id": cmd["id"], "result": result}).encode()
+            try:
+                self.outbox.put_nowait(msg)
+            except queue.Full:
+                await asyncio.to_thread(self.outbox.put, msg) # Replies are never dropped
+
+    def close(self, timeout=1.0):
+        # Lets the sender write out what is queued
+        self.flush()
+        try:
+            self.outbox.put(None, timeout=timeout)
+        except queue.Full:
+            return
+        self.sender.join(timeout)
+
+class ShardPool:
+    """
+    Merge-process side: spawns N listener workers that all bind the Stratum
+    port with SO_REUSEPORT (the kernel spreads miners across them) and folds
+    their hashes into bridge.capture(), i.e. one merged ring, tagged with
+    globally unique miner ids. Telemetry snapshots are kept per worker.
+    """
+    def __init__(self, bridge, factory, workers, kwargs=None):
+        if not reuse_port_available():
+            raise RuntimeError("SO_REUSEPORT is not available on this platform")
+        if not 1 <= workers <= MAX_SHARDS:
+            raise ValueError(f"Shard count must be 1..{MAX_SHARDS}")
+        self.bridge = bridge
+        self.factory = factory
+        self.workers = workers
+        self.kwargs = kwargs or {}
+        self.conns = []
+        self.processes = []
+        self.stats = {} # Worker index -> last telemetry snapshot
+        self.pending = {} # Command id -> future
+        self.next_cmd = 0
+
+    def start(self):
+        ctx = multiprocessing.get_context("spawn") # Fresh interpreter: no inherited event loop
+        loop = asyncio.get_running_loop()
+        for index in range(self.workers):
+            parent, child = ctx.Pipe()
+            process = ctx.Process(target=shard_main, args=(self.factory, index, child, self.kwargs), daemon=True)
+            process.start()
+            child.close()
+            self.conns.append(parent)
+            self.processes.append(process)
+            loop.add_reader(parent.fileno(), self.on_ready, index)
+
+    def on_ready(self, index):
+        conn = self.conns[index]
+        while conn.poll():
+            try:
+                data = conn.recv_bytes()
+            except (EOFError, OSError):
+                asyncio.get_running_loop().remove_reader(conn.fileno())
+                self.stats.pop(index, None)
+                print(f"⚠️ Shard worker {index} exited")
+                return
+            kind = data[:1]
+            if kind == MSG_HASHES:
+                n, = COUNT.unpack_from(data, 1)
+                sources = struct.unpack_from(f">{n}H", data, 5)
+                base = 5 + 2 * n
+                capture = self.bridge.capture
+                for i in range(n):
+                    capture(data[base + 32*i:base + 32*(i+1)], sources[i])
+            elif kind == MSG_STATS:
+                self.stats[index] = json.loads(data[1:])
+            elif kind == MSG_REPLY:
+                reply = json.loads(data[1:])
+                future = self.pending.pop(reply["id"], None)
+                if future and not future.done(): future.set_result(reply["result"])
+
+    def notify(self, cmd):
+        # Fire-and-forget command to every worker
+        for conn in self.conns:
+            try: conn.send_bytes(json.dumps(cmd).encode())
+            except OSError: pass
+
+    async def broadcast(self, cmd, timeout=5.0):
+        # Command to every live worker; returns their replies in worker order
+        loop = asyncio.get_running_loop()
+        futures = []
+        for conn in self.conns:
+            self.next_cmd += 1
+            future = loop.create_future()
+            self.pending[self.next_cmd] = future
+            try:
+                conn.send_bytes(json.dumps(dict(cmd, id=self.next_cmd)).encode())
+            except OSError:
+                self.pending.pop(self.next_cmd)
+                continue
+            futures.append(future)
+        return await asyncio.wait_for(asyncio.gather(*futures), timeout)
+
+    def total(self, key):
+        return sum(s.get(key, 0) for s in self.stats.values())
+
+    def summaries(self):
+        return [m for index in sorted(self.stats) for m in self.stats[index].get("miners", [])]
+
+    def stop(self):
+        for process in self.processes:
+            if process.is_alive(): process.terminate()
+
+def shard_main(factory, index, conn, kwargs):
+    """Worker process entry point: a bridge in shard mode, reporting to the merge process."""
+    bridge = factory(shard_index=index, shard_conn=conn, **kwargs)
+    try:
+        asyncio.run(bridge.start())
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        pass
+    finally:
+        bridge.close()
@@ -0,0 +1,79 @@
+import binascii
+import hashlib
+import struct
+from collections import OrderedDict
+
+def sha256d(data):
+    return hashlib.sha256(hashlib.sha256(data).digest()).digest()
+
+class JobHasher:
+    """
+    Reconstructs the real block-header hash of a Stratum V1 share.
+    Everything that only depends on the job is decoded once, and the
+    coinbase merkle root is computed once per (extranonce1, extranonce2)
+    and kept in a small LRU together with the SHA-256 midstate of the first
+    64 header bytes, so a share at the job's version only hashes its last
+    16 bytes. A rolled version changes the first block, so those shares hash
+    the whole 80-byte header (the cached root is still reused).
+    """
+    def __init__(self, job_id, prevhash, coinb1, coinb2, merkle_branch, version, nbits, max_cache=4096):
+        self.job_id = job_id
+        self.version = version
+        self.version_int = int(version, 16)
+        self.prevhash_le = binascii.unhexlify(prevhash)[::-1]
+        self.coinb1 = binascii.unhexlify(coinb1)
+        self.coinb2 = binascii.unhexlify(coinb2)
+        self.branch = [binascii.unhexlify(b) for b in merkle_branch]
+        self.nbits_le = binascii.unhexlify(nbits)[::-1]
+        self.prefix = struct.pack("<I", self.version_int) + self.prevhash_le
+        self.roots = OrderedDict() # (extranonce1, en2_hex) -> (merkle root, midstate), least recently used first
+        self.max_cache = max_cache
+
+    def merkle_root(self, extranonce1, en2_hex):
+        root = sha256d(self.coinb1 + binascii.unhexlify(extranonce1 + en2_hex) + self.coinb2)
+        for node in self.branch:
+            root = sha256d(root + node)
+        return root
+
+    def cached_root(self, extranonce1, en2_hex):
+        # (root, SHA-256 state after the first 64 header bytes at the job's version)
+        key = (extranonce1, en2_hex)
+        entry = self.roots.get(key)
+        if entry is None:
+            root = self.merkle_root(extranonce1, en2_hex)
+            entry = self.roots[key] = (root, hashlib.sha256(self.prefix + root[:28]))
+            if len(self.roots) > self.max_cache:
+                self.roots.popitem(last=False)
+        else:
+            self.roots.move_to_end(key)
+        return entry
+
+    def share_hash(self, extranonce1, en2_hex, ntime_hex, nonce_hex, version_bits=None, version_mask=0xffffffff):
+        """
+        Returns the double-SHA256 of the 80-byte header, byte-reversed (standard display order).
+        'version_bits' is the optional 6th mining.submit param under version rolling.
+        """
+        version = self.version_int
+        if version_bits is not None:
+            version = (version & ~version_mask) | (int(version_bits, 16) & version_mask)
+        root, midstate = self.cached_root(extranonce1, en2_hex)
+        tail = root[28:] + binascii.unhexlify(ntime_hex)[::-1] + self.nbits_le + binascii.unhexlify(nonce_hex)[::-1]
+        if version != self.version_int:
+            return sha256d(struct.pack("<I", version) + self.prevhash_le + root[:28] + tail)[::-1]
+        inner = midstate.copy()
+        inner.update(tail)
+        return hashlib.sha256(inner.digest()).digest()[::-1]
+
+class JobBook:
+    """Recent jobs by id, so late shares for a previous job still hash correctly."""
+    def __init__(self, depth=64):
+        self.jobs = {}
+        self.depth = depth
+
+    def add(self, hasher):
+        self.jobs[hasher.job_id] = hasher
+        while len(self.jobs) > self.depth:
+            del self.jobs[next(iter(self.jobs))]
+
+    def get(self, job_id):
+        return self.jobs.get(job_id)
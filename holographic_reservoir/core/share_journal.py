@@ -0,0 +1,158 @@
+import glob
+import os
+import struct
+import time
+import numpy as np
+
+MAGIC = b"CHJRNL01"
+VERSION = 2
+# File header: magic, version, record size, created (ns); padded to HEADER_SIZE
+HEADER = struct.Struct("<8sIIq")
+HEADER_SIZE = 64
+# Record: ts_ns (arrival: kernel receive time when available), miner id, job id
+# (ASCII, NUL padded), extranonce2, ntime, nonce, version bits, hash,
+# rx_ns (userspace read time)
+RECORD = struct.Struct("<qI16sQIII32sq")
+RECORD_DTYPE = np.dtype([
+    ("ts_ns", "<i8"), ("miner", "<u4"), ("job_id", "S16"), ("extranonce2", "<u8"),
+    ("ntime", "<u4"), ("nonce", "<u4"), ("version_bits", "<u4"), ("hash", "u1", (32,)),
+    ("rx_ns", "<i8"),
+])
+assert RECORD_DTYPE.itemsize == RECORD.size == 88
+# Version 1 segments (no rx_ns) stay readable
+RECORD_DTYPE_V1 = np.dtype(RECORD_DTYPE.descr[:-1])
+RECORD_DTYPES = {1: RECORD_DTYPE_V1, 2: RECORD_DTYPE}
+
+class ShareJournal:
+    """
+    Append-only binary journal of every captured share.
+    Fixed 88-byte records are packed into a preallocated batch and written to
+    the current segment with one write() per batch; a new segment file is
+    started every 'segment_records' records. Nothing is ever rewritten, so a
+    crash loses at most the unflushed batch (and a reader simply ignores a
+    torn trailing record).
+    """
+    def __init__(self, directory, prefix="shares", segment_records=1 << 20, batch_records=4096):
+        self.directory = directory
+        self.prefix = prefix
+        self.segment_records = segment_records
+        self.batch_records = batch_records
+        self.batch = bytearray(batch_records * RECORD.size)
+        self.batched = 0
+        self.records = 0 # Total appended by this writer
+        self.errors = 0 # Shares rejected for malformed / out-of-range fields
+        self.file = None
+        self.segment_count = 0 # Records in the current segment (flushed + batched)
+        os.makedirs(directory, exist_ok=True)
+        existing = journal_segments(directory, prefix)
+        self.segment_index = segment_number(existing[-1]) + 1 if existing else 0
+        self.open_segment()
+
+    def open_segment(self):
+        path = os.path.join(self.directory, f"{self.prefix}-{self.segment_index:06d}.jrnl")
+        self.file = open(path, "xb", buffering=0)
+        self.file.write(HEADER.pack(MAGIC, VERSION, RECORD.size, time.time_ns()).ljust(HEADER_SIZE, b"\0"))
+        self.path = path
+        self.segment_count = 0
+
+    def append(self, miner_id, job_id, en2_hex, ntime_hex, nonce_hex, h, version_bits=None, ts_ns=None, rx_ns=None):
+        """
+        Journals one share (Stratum hex fields as received). A share whose
+        fields are malformed or do not fit the record is counted in 'errors'
+        and skipped (returns False), so it never costs the miner its session.
+        """
+        if ts_ns is None: ts_ns = time.time_ns()
+        try:
+            RECORD.pack_into(
+                self.batch, self.batched * RECORD.size,
+                ts_ns, miner_id & 0xffffffff,
+                str(job_id).encode()[:16], int(en2_hex, 16), int(ntime_hex, 16), int(nonce_hex, 16),
+                int(version_bits, 16) if version_bits else 0, bytes(h), rx_ns if rx_ns is not None else ts_ns
+            )
+        except (ValueError, TypeError, struct.error):
+            self.errors += 1
+            return False
+        self.batched += 1
+        self.records += 1
+        self.segment_count += 1
+        if self.batched == self.batch_records or self.segment_count == self.segment_records:
+            self.flush()
+        return True
+
+    def flush(self):
+        if self.batched:
+            self.file.write(memoryview(self.batch)[:self.batched * RECORD.size])
+            self.batched = 0
+        if self.segment_count >= self.segment_records:
+            self.rotate()
+
+    def rotate(self):
+        self.file.close()
+        self.segment_index += 1
+        self.open_segment()
+
+    def close(self):
+        if self.file is None: return
+        if self.batched:
+            self.file.write(memoryview(self.batch)[:self.batched * RECORD.size])
+            self.batched = 0
+        self.file.close()
+        self.file = None
+
+def segment_number(path):
+    return int(os.path.basename(path).rsplit("-", 1)[1].split(".")[0])
+
+def journal_segments(directory, prefix="shares"):
+    """Segment files of one journal, oldest first."""
+    return sorted(glob.glob(os.path.join(directory, f"{prefix}-*.jrnl")), key=segment_number)
+
+def open_segment(path):
+    """Zero-copy numpy view of one segment (structured array with the segment version's fields)."""
+    with open(path, "rb") as f:
+        magic, version, record_size, _ = HEADER.unpack(f.read(HEADER.size))
+    dtype = RECORD_DTYPES.get(version)
+    if magic != MAGIC or dtype is None or record_size != dtype.itemsize:
+        raise ValueError(f"{path}: not a share journal segment (v1-v{VERSION})")
+    count = (os.path.getsize(path) - HEADER_SIZE) // record_size # Drops a torn trailing record
+    if count <= 0:
+        return np.zeros(0, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode="r", offset=HEADER_SIZE, shape=(count,))
+
+def upgrade_records(records):
+    """v1 records as RECORD_DTYPE (rx_ns = ts_ns); current records unchanged."""
+    if records.dtype == RECORD_DTYPE:
+        return records
+    out = np.zeros(len(records), dtype=RECORD_DTYPE)
+    for name in records.dtype.names:
+        out[name] = records[name]
+    out["rx_ns"] = records["ts_ns"]
+    return out
+
+def read_journal(directory, prefix="shares"):
+    """One memmap per segment; iterate these to scan multi-GB sessions in constant memory."""
+    return [open_segment(p) for p in journal_segments(directory, prefix)]
+
+def load_journal(directory, prefix="shares"):
+    """The whole journal as a single in-memory array (copies; fine for small sessions)."""
+    parts = [upgrade_records(p) for p in read_journal(directory, prefix)]
+    return np.concatenate(parts) if parts else np.zeros(0, dtype=RECORD_DTYPE)
+
+def journal_prefixes(directory):
+    """Prefixes of the journals found in a directory ("shares", "shard0", ...)."""
+    names = {os.path.basename(p).rsplit("-", 1)[0] for p in glob.glob(os.path.join(directory, "*-*.jrnl"))}
+    return sorted(names)
+
+def session_prefixes(directory):
+    """
+    The journals that make up the recorded session: "shares", or when a
+    sharded listener recorded it, every worker's "shard<i>" journal.
+    """
+    prefixes = journal_prefixes(directory)
+    if "shares" in prefixes or not prefixes: return ["shares"]
+    return [p for p in prefixes if p.startswith("shard")] or ["shares"]
+
+def merge_journals(directory, prefixes):
+    """Several journals (e.g. one per shard) as one in-memory array ordered by ts_ns (copies)."""
+    parts = [load_journal(directory, p) for p in prefixes]
+    records = np.concatenate(parts) if parts else np.zeros(0, dtype=RECORD_DTYPE)
+    return records[np.argsort(records["ts_ns"], kind="stable")]
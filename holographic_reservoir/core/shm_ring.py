@@ -0,0 +1,157 @@
+import os
+import struct
+import time
+import numpy as np
+from multiprocessing import shared_memory
+
+HASH_SIZE = 32
+MAGIC = b"CHIMERA1"
+# Header: magic, capacity, tail (next write seq), seqlock counter (odd = write in progress), writer PID
+HEADER = struct.Struct("<8sQQQQ")
+HEADER_SIZE = 64
+TAIL_OFFSET = 16
+LOCK_OFFSET = 24
+OWNER_OFFSET = 32
+STALL_TIMEOUT = 1.0 # Seconds a reader waits on an odd counter before giving up on the writer
+
+def pid_alive(pid):
+    if pid <= 0: return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True # Exists, owned by someone else
+    return True
+
+class SharedEntropyRing:
+    """
+    Writer side of the shared-memory entropy transport.
+    The bridge appends every share hash into a multiprocessing.shared_memory
+    segment; co-located consumers map the same segment and read hashes in
+    place, with no socket, no JSON/hex and no copy.
+    Consistency uses a seqlock: the counter is odd while a slot is being written.
+    The writer's PID is stored in the header: a segment left by a dead bridge
+    is replaced, one that belongs to a running bridge is never touched.
+    """
+    def __init__(self, name: str, capacity: int = 65536):
+        self.capacity = capacity
+        size = HEADER_SIZE + capacity * HASH_SIZE
+        try:
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        except FileExistsError:
+            old = shared_memory.SharedMemory(name=name)
+            magic, _, _, _, owner = HEADER.unpack_from(old.buf, 0) if old.size >= HEADER.size else (None, 0, 0, 0, 0)
+            old.close()
+            if magic == MAGIC and owner != os.getpid() and pid_alive(owner):
+                raise FileExistsError(f"Shared memory '{name}' is in use by a running bridge (PID {owner})")
+            # Stale segment from a previous run: replace it
+            old.unlink()
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        self.buf = self.shm.buf
+        self.tail = 0
+        self.lock = 0
+        HEADER.pack_into(self.buf, 0, MAGIC, capacity, 0, 0, os.getpid())
+
+    def push(self, h: bytes):
+        slot = HEADER_SIZE + (self.tail % self.capacity) * HASH_SIZE
+        self.lock += 1
+        struct.pack_into("<Q", self.buf, LOCK_OFFSET, self.lock)
+        self.buf[slot:slot + HASH_SIZE] = h
+        self.tail += 1
+        struct.pack_into("<Q", self.buf, TAIL_OFFSET, self.tail)
+        self.lock += 1
+        struct.pack_into("<Q", self.buf, LOCK_OFFSET, self.lock)
+
+    def close(self):
+        self.buf = None
+        self.shm.close()
+        self.shm.unlink()
+
+class SharedEntropyReader:
+    """
+    Reader side: maps the bridge's segment and returns hashes as numpy
+    (N, 32) uint8 arrays. Each reader keeps its own cursor, like READ_FROM.
+    Slots are copied out and then checked against the writer's position
+    again: anything the writer may have lapped during the copy is dropped
+    and counted as lost, so a slow reader never returns torn hashes.
+    """
+    def __init__(self, name: str):
+        self.shm = shared_memory.SharedMemory(name=name)
+        try:
+            # Attaching must not make this process own (and unlink) the segment
+            from multiprocessing import resource_tracker
+            resource_tracker.unregister(self.shm._name, "shared_memory")
+        except Exception:
+            pass
+        magic, self.capacity, _, _, _ = HEADER.unpack_from(self.shm.buf, 0)
+        if magic != MAGIC:
+            self.shm.close()
+            raise ValueError(f"Shared memory '{name}' is not a CHIMERA entropy ring")
+        self.hashes = np.ndarray((self.capacity, HASH_SIZE), dtype=np.uint8,
+                                 buffer=self.shm.buf, offset=HEADER_SIZE)
+        self.seq = max(0, self._tail() - self.capacity + 1) # Start at the oldest intact hash
+        self.lost = 0
+
+    def _tail(self) -> int:
+        # Seqlock read: retry while a write is in flight or the counter moved.
+        # After a short spin the reader yields; a counter that stays odd for
+        # STALL_TIMEOUT means the writer died mid-write.
+        spins = 0
+        deadline = None
+        while True:
+            lock1, = struct.unpack_from("<Q", self.shm.buf, LOCK_OFFSET)
+            if not lock1 & 1:
+                tail, = struct.unpack_from("<Q", self.shm.buf, TAIL_OFFSET)
+                lock2, = struct.unpack_from("<Q", self.shm.buf, LOCK_OFFSET)
+                if lock1 == lock2: return tail
+            spins += 1
+            if spins < 100: continue
+            if deadline is None: deadline = time.monotonic() + STALL_TIMEOUT
+            elif time.monotonic() > deadline:
+                raise TimeoutError("Shared entropy ring writer stalled mid-write (bridge gone?)")
+            time.sleep(0)
+
+    def available(self) -> int:
+        return self._tail() - self.seq
+
+    def skip_lost(self, tail):
+        # The slot for 'tail' is the next one written, so keep one slot of margin
+        oldest = max(0, tail - self.capacity + 1)
+        if self.seq < oldest:
+            self.lost += oldest - self.seq
+            print(f"⚠️ [SharedEntropyReader] Fell behind by {oldest - self.seq} records (ring wrapped)")
+            self.seq = oldest
+
+    def read_array(self, count: int) -> np.ndarray:
+        """
+        Returns up to 'count' new hashes as an (N, 32) uint8 array (a copy).
+        Records overwritten before or while they were copied are skipped and
+        added to self.lost.
+        """
+        tail = self._tail()
+        self.skip_lost(tail)
+        start = self.seq
+        count = max(0, min(count, tail - start))
+        first = start % self.capacity
+        if first + count <= self.capacity:
+            out = self.hashes[first:first + count].copy()
+        else:
+            out = np.concatenate((self.hashes[first:], self.hashes[:first + count - self.capacity]))
+        # Re-check after the copy: the writer may have lapped the first slots meanwhile
+        self.seq = start
+        self.skip_lost(self._tail())
+        torn = self.seq - start
+        self.seq = start + max(count, torn)
+        return out[torn:]
+
+    def wait_array(self, count: int, timeout: float = 5.0, poll: float = 0.0005) -> np.ndarray:
+        """Blocks until 'count' hashes are available or 'timeout' seconds pass."""
+        deadline = time.time() + timeout
+        while self.available() < count and time.time() < deadline:
+            time.sleep(poll)
+        return self.read_array(count)
+
+    def close(self):
+        self.hashes = None
+        self.shm.close()
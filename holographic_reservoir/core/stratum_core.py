@@ -0,0 +1,346 @@
+import asyncio
+import struct
+import sys
+import time
+
+try:
+    from .fleet import MinerFleet, EXTRANONCE1_BASE, ID_SPAN
+    from .stratum_io import StratumWriter, FLUSH_TICK
+    from .stratum_framing import LineFramer
+    from .monitoring import MetricsRegistry, serve_metrics
+    from .rx_timestamps import StampedReader
+except ImportError:
+    from fleet import MinerFleet, EXTRANONCE1_BASE, ID_SPAN
+    from stratum_io import StratumWriter, FLUSH_TICK
+    from stratum_framing import LineFramer
+    from monitoring import MetricsRegistry, serve_metrics
+    from rx_timestamps import StampedReader
+
+KEEPALIVE_CMD = b"KEEPALIVE\n" # Switches an API connection to length-prefixed pipelined mode
+API_LENGTH = struct.Struct(">I")
+# Python 3.12+ socket transports queue unsent memoryviews by reference (3.11 and
+# earlier join/copy them), so a ring slice could be sent after the writer lapped it.
+TRANSPORT_QUEUES_VIEWS = sys.version_info >= (3, 12)
+
+def write_payload(writer, payload):
+    """
+    Writes API payload parts. memoryview parts (ring slices) go out without a
+    copy only where the transport copies whatever it cannot send at once;
+    otherwise, or when the transport already has a write backlog, they are
+    copied with bytes() first.
+    """
+    if TRANSPORT_QUEUES_VIEWS or writer.transport.get_write_buffer_size():
+        payload = [bytes(p) if isinstance(p, memoryview) else p for p in payload]
+    writer.writelines(payload)
+
+class StratumServer:
+    """
+    Shared asyncio Stratum V1 engine for the bridges.
+    Owns everything on the hot path: the fleet (one extranonce1 per miner),
+    incremental framing, coalesced writes, job broadcast, vardiff timing,
+    the one-shot/KEEPALIVE API transport and the /metrics endpoint.
+    A bridge subclasses it and only fills in the hooks:
+      next_job()                  -> serialized mining.notify line (job policy)
+      on_submit(writer, session, params, received_ns) -> result for the ack
+      on_connect / on_disconnect / on_authorize
+      make_vardiff(session), vardiff_setpoint(now)
+      api_command(message), api_stream(message, reader, writer)
+      background_tasks()
+    """
+    job_interval = 5.0 # Seconds between broadcast jobs (None = only on demand)
+    vardiff_interval = None # Seconds between timer retargets (None = no vardiff loop)
+    read_size = 8192
+    extranonce2_size = 4
+    kernel_timestamps = False # SO_TIMESTAMPNS: also record the kernel receive time (session.kernel_ns)
+    api_commands = () # Known API command names (metrics labels); anything else counts as default_command
+    default_command = "OTHER"
+
+    def __init__(self, host="0.0.0.0", port=3333, api_port=None, metrics_port=None,
+                 difficulty=1, flush_policy=FLUSH_TICK, tag="", metrics_prefix="stratum_",
+                 extranonce1_base=EXTRANONCE1_BASE, first_miner_id=0, miner_id_span=ID_SPAN, reuse_port=False):
+        self.host = host
+        self.port = port
+        self.api_port = api_port
+        self.metrics_port = metrics_port
+        self.difficulty = difficulty # Initial (and, without vardiff, fixed) share difficulty
+        self.flush_policy = flush_policy
+        self.tag = tag # Log prefix, e.g. "[Plenum] "
+        self.reuse_port = reuse_port # SO_REUSEPORT: several processes share the Stratum port
+        self.clients = set()
+        self.outputs = {} # Writer -> StratumWriter (coalesced responses)
+        self.fleet = MinerFleet(extranonce1_base, first_miner_id, miner_id_span) # One session (unique extranonce1) per connected ASIC
+        self.job_counter = 0
+        self.current_job_id = None
+        self.share_counter = 0
+        self.malformed_lines = 0 # Stratum lines that failed to parse (closed connections)
+        self.start_time = time.time()
+        self.metrics = self.build_metrics(MetricsRegistry(metrics_prefix))
+
+    # --- Hooks -------------------------------------------------------------
+
+    def next_job(self) -> bytes:
+        raise NotImplementedError
+
+    async def on_submit(self, writer, session, params, received_ns):
+        return True
+
+    async def on_connect(self, writer, session):
+        pass
+
+    async def on_disconnect(self, writer, session):
+        pass
+
+    async def on_authorize(self, writer, session):
+        session.vardiff = self.make_vardiff(session)
+        difficulty = session.vardiff.difficulty if session.vardiff else self.difficulty
+        await self.send_notif(writer, "mining.set_difficulty", [difficulty])
+        await self.send_job(writer)
+
+    def make_vardiff(self, session):
+        return None
+
+    def vardiff_setpoint(self, now):
+        # Per-miner shares/sec target for this tick (None = leave targets alone)
+        return None
+
+    async def api_command(self, message):
+        # Returns the response payload as a list of buffers (possibly empty)
+        return []
+
+    async def api_stream(self, message, reader, writer):
+        # Return True after taking over the connection (e.g. a push stream)
+        return False
+
+    def background_tasks(self):
+        tasks = []
+        if self.job_interval: tasks.append(self.job_generator_loop())
+        if self.vardiff_interval: tasks.append(self.vardiff_loop())
+        if self.api_port: tasks.append(self.start_api())
+        if self.metrics_port:
+            print(f"📈 {self.tag}Metrics on http://0.0.0.0:{self.metrics_port}/metrics")
+            tasks.append(serve_metrics(self.metrics, "0.0.0.0", self.metrics_port))
+        return tasks
+
+    def build_metrics(self, m):
+        m.counter("shares_total", "mining.submit messages received", lambda: self.share_counter)
+        self.acks = m.counter("acks_total", "mining.submit acknowledgements queued")
+        m.counter("jobs_total", "Jobs generated", lambda: self.job_counter)
+        m.counter("malformed_lines_total", "Stratum lines that failed to parse (closed connections)", lambda: self.malformed_lines)
+        m.gauge("miners", "Connected miners", lambda: len(self.fleet))
+        m.gauge("miner_shares", "Shares per connected miner", lambda: [
+            ({"miner": s.miner_id, "ip": s.ip}, s.shares) for s in self.fleet])
+        m.gauge("miner_difficulty", "Current Stratum difficulty per miner", lambda: [
+            ({"miner": s.miner_id}, s.vardiff.difficulty) for s in self.fleet if s.vardiff])
+        self.submit_latency = m.histogram("submit_ack_seconds", "Time from receiving a submit chunk to its ack being queued")
+        self.rx_delay = m.histogram("rx_delay_seconds", "Kernel receive timestamp to userspace read (SO_TIMESTAMPNS only)")
+        self.api_requests = m.counter("api_requests_total", "API commands served, by command")
+        self.api_bytes = m.counter("api_bytes_served_total", "API payload bytes sent, by command")
+        self.api_latency = m.histogram("api_request_seconds", "API command handling time")
+        return m
+
+    # --- Stratum -----------------------------------------------------------
+
+    async def handle_client(self, reader, writer):
+        addr = writer.get_extra_info('peername')
+        session = self.fleet.attach(writer, addr)
+        if session is None:
+            # Every miner id (extranonce1) of this listener is taken: refuse rather than duplicate work
+            print(f"⛔ {self.tag}Fleet full ({len(self.fleet)} miners), refusing {addr}")
+            writer.close()
+            await writer.wait_closed()
+            return
+        self.clients.add(writer)
+        self.outputs[writer] = StratumWriter(writer, self.flush_policy)
+        await self.on_connect(writer, session)
+        print(f"⚡ {self.tag}ASIC Link Established: {addr} (miner #{session.miner_id}, extranonce1 {session.extranonce1}, fleet: {len(self.fleet)})")
+
+        framer = LineFramer()
+        stamped = StampedReader(writer, self.read_size) if self.kernel_timestamps else None
+        try:
+            while True:
+                if stamped:
+                    data, session.kernel_ns = await stamped.read()
+                else:
+                    data = await reader.read(self.read_size)
+                if not data: break
+                received_ns = time.time_ns()
+                if session.kernel_ns: self.rx_delay.observe((received_ns - session.kernel_ns) / 1e9)
+
+                # Single pass over every complete line in the chunk
+                for msg in framer.messages(data):
+                    await self.process_message(writer, session, msg, received_ns)
+        except Exception as e:
+            print(f"❌ {self.tag}Link Error {addr}: {e}")
+        finally:
+            if stamped: stamped.close()
+            print(f"🔌 {self.tag}ASIC Disconnected: {addr} ({framer.lines} lines)")
+            self.malformed_lines += framer.malformed + framer.oversized
+            if framer.malformed or framer.oversized:
+                print(f"⚠️ {self.tag}{framer.malformed} malformed / {framer.oversized} oversized lines from {addr} (last: {framer.last_error})")
+            self.clients.discard(writer)
+            self.fleet.detach(writer)
+            out = self.outputs.pop(writer, None)
+            if out: out.flush()
+            await self.on_disconnect(writer, session)
+            writer.close()
+            await writer.wait_closed()
+
+    async def process_message(self, writer, session, msg, received_ns):
+        msg_id = msg.get('id')
+        method = msg.get('method')
+
+        if method == 'mining.submit':
+            self.share_counter += 1
+            session.shares += 1
+            # params: [worker, job_id, extranonce2, ntime, nonce, (version_bits)]
+            result = await self.on_submit(writer, session, msg.get('params', []), received_ns)
+            await self.send_res(writer, msg_id, result)
+            self.acks.inc()
+            self.submit_latency.observe((time.time_ns() - received_ns) / 1e9)
+            if session.vardiff and session.vardiff.record_share() is not None:
+                await self.set_difficulty(writer, session)
+
+        elif method == 'mining.subscribe':
+            # Each miner gets its own extranonce1 so the rack never duplicates work
+            result = [[["mining.set_difficulty", "1"], ["mining.notify", "1"]], session.extranonce1, self.extranonce2_size]
+            await self.send_res(writer, msg_id, result)
+
+        elif method == 'mining.configure':
+            # Enable version rolling (AxeOS asks for it)
+            result = {"version-rolling": True, "version-rolling.mask": "ffffffff"}
+            await self.send_res(writer, msg_id, result)
+
+        elif method == 'mining.suggest_difficulty':
+            await self.send_res(writer, msg_id, True)
+
+        elif method == 'mining.authorize':
+            await self.send_res(writer, msg_id, True)
+            await self.on_authorize(writer, session)
+
+    async def send_job(self, writer):
+        out = self.output(writer)
+        out.send_raw(self.next_job())
+        try: await out.drain()
+        except: pass
+
+    async def broadcast_job(self):
+        # One job, serialized once, written to every connected miner
+        # (each miner has its own extranonce1, so the work never overlaps).
+        line = self.next_job()
+        for writer in list(self.clients):
+            self.output(writer).send_raw(line)
+        for writer in list(self.clients):
+            try: await self.output(writer).drain()
+            except: pass
+        return self.current_job_id
+
+    async def set_difficulty(self, writer, session):
+        # Takes effect from the next job; the miner keeps its current one.
+        v = session.vardiff
+        print(f"🎚️ {self.tag}Miner #{session.miner_id}: {v.observed_sps:.2f} sh/s (target {v.target_sps:.2f}) -> difficulty {v.difficulty}")
+        await self.send_notif(writer, "mining.set_difficulty", [v.difficulty])
+
+    async def send_res(self, writer, msg_id, result):
+        out = self.output(writer)
+        out.send({"id": msg_id, "result": result, "error": None})
+        try: await out.drain()
+        except: pass
+
+    async def send_notif(self, writer, method, params):
+        out = self.output(writer)
+        out.send({"id": None, "method": method, "params": params})
+        try: await out.drain()
+        except: pass
+
+    def output(self, writer):
+        # Per-connection coalescing buffer (one write per event-loop tick).
+        # Writers that already left get a throwaway buffer instead of a leaked entry.
+        out = self.outputs.get(writer)
+        return out if out is not None else StratumWriter(writer, self.flush_policy)
+
+    async def job_generator_loop(self):
+        print(f"🌊 {self.tag}Job Generator Active ({self.job_interval}s interval)")
+        while True:
+            await asyncio.sleep(self.job_interval)
+            if self.clients:
+                await self.broadcast_job()
+
+    async def vardiff_loop(self):
+        # Retargets on a timer too: a starved miner sends no shares to trigger it.
+        print(f"🎚️ {self.tag}Vardiff Active")
+        while True:
+            await asyncio.sleep(self.vardiff_interval / 2)
+            now = time.time()
+            target = self.vardiff_setpoint(now)
+            for writer, session in list(self.fleet.sessions.items()):
+                if not session.vardiff: continue
+                if target is not None: session.vardiff.target_sps = target
+                if session.vardiff.retarget(now) is not None:
+                    await self.set_difficulty(writer, session)
+
+    # --- API -----------------------------------------------------------------
+
+    async def handle_api_client(self, reader, writer):
+        # Legacy mode: one command, raw response, close.
+        # KEEPALIVE mode: many (pipelined) commands, each answered with a
+        # 4-byte big-endian length prefix followed by the payload.
+        try:
+            data = await asyncio.wait_for(reader.read(1024), timeout=1.0)
+
+            if data.startswith(KEEPALIVE_CMD):
+                await self.serve_keepalive(reader, writer, data[len(KEEPALIVE_CMD):])
+                return
+
+            message = data.decode().strip()
+            if await self.api_stream(message, reader, writer):
+                return
+
+            payload = await self.timed_command(message)
+            # No data means no bytes: the client sees an empty read and retries.
+            if payload:
+                write_payload(writer, payload)
+                await writer.drain()
+        except Exception: pass
+        finally:
+            writer.close()
+            await writer.wait_closed()
+
+    async def serve_keepalive(self, reader, writer, pending):
+        # Persistent connection: answer every complete line, in order, until EOF.
+        framer = LineFramer()
+        data = pending
+        while True:
+            for line in framer.feed(data):
+                message = line.decode().strip()
+                if await self.api_stream(message, reader, writer):
+                    return
+                payload = await self.timed_command(message)
+                writer.write(API_LENGTH.pack(sum(len(p) for p in payload)))
+                write_payload(writer, payload)
+            await writer.drain()
+            data = await reader.read(4096)
+            if not data: break
+
+    async def timed_command(self, message):
+        # api_command plus request/latency/byte accounting for /metrics
+        started = time.perf_counter()
+        payload = await self.api_command(message)
+        command = message.split(":", 1)[0]
+        if command not in self.api_commands: command = self.default_command
+        self.api_latency.observe(time.perf_counter() - started)
+        self.api_requests.inc(command=command)
+        self.api_bytes.inc(sum(len(p) for p in payload), command=command)
+        return payload
+
+    async def start_api(self):
+        print(f"🔗 {self.tag}Bridge API Listening on 0.0.0.0:{self.api_port}")
+        server = await asyncio.start_server(self.handle_api_client, "0.0.0.0", self.api_port)
+        async with server: await server.serve_forever()
+
+    async def start(self):
+        server = await asyncio.start_server(self.handle_client, self.host, self.port,
+                                            reuse_port=self.reuse_port or None)
+        for task in self.background_tasks():
+            asyncio.create_task(task)
+        async with server:
+            await server.serve_forever()
@@ -0,0 +1,59 @@
+import json
+
+class LineFramer:
+    """
+    Incremental newline framer for Stratum JSON-RPC ingress.
+    Keeps one bytearray with a moving read offset: every complete line in a
+    chunk is extracted in a single pass and the consumed prefix is dropped
+    once per feed, so a burst of k messages costs O(total bytes) instead of
+    re-copying the remaining buffer after each line.
+    Malformed and oversized lines are counted rather than silently dropped.
+    """
+    def __init__(self, max_line=65536):
+        self.buffer = bytearray()
+        self.max_line = max_line
+        self.lines = 0      # Complete non-empty lines extracted
+        self.malformed = 0  # Lines that were not a JSON object
+        self.oversized = 0  # Lines discarded for exceeding max_line
+        self.last_error = None
+
+    def feed(self, data) -> list:
+        """Appends a received chunk and returns every complete, non-empty line (bytearray)."""
+        buf = self.buffer
+        buf += data
+        lines = []
+        start = 0
+        while True:
+            end = buf.find(b"\n", start)
+            if end < 0: break
+            if end - start > self.max_line:
+                self.oversized += 1
+            else:
+                line = buf[start:end].strip()
+                if line: lines.append(line)
+            start = end + 1
+        if start:
+            del buf[:start]
+        if len(buf) > self.max_line:
+            # No newline in sight: drop the runaway partial line
+            self.oversized += 1
+            buf.clear()
+        self.lines += len(lines)
+        return lines
+
+    def messages(self, data) -> list:
+        """Like feed(), but returns decoded JSON objects and counts the lines that fail to parse."""
+        msgs = []
+        for line in self.feed(data):
+            try:
+                msg = json.loads(line)
+            except ValueError as e:
+                self.malformed += 1
+                self.last_error = f"{e}: {line[:80]!r}"
+                continue
+            if isinstance(msg, dict):
+                msgs.append(msg)
+            else:
+                self.malformed += 1
+                self.last_error = f"Not a JSON-RPC object: {line[:80]!r}"
+        return msgs
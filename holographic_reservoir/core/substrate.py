@@ -1,21 +1,42 @@
-import socket
 import json
 import hashlib
 import time
 import struct
+import os
+
+try:
+    from .entropy_client import EntropyClient
+    from .shm_ring import SharedEntropyReader
+except ImportError:
+    from entropy_client import EntropyClient
+    from shm_ring import SharedEntropyReader
 
 class ASICSubstrate:
     """
     Layer 0: The Physical Substrate.
     Interfaces with the AxeOS Hybrid Driver (Port 4028) to retrieve thermodynamic entropy.
     """
-    def __init__(self, simulation_mode=False):
+    def __init__(self, simulation_mode=False, shm_name=None):
         self.simulation_mode = simulation_mode
         self.hardware_ip = "127.0.0.1"
         self.hardware_port = 4028
+        # Same-host fast path: map the bridge's shared-memory ring instead of using TCP
+        self.shm_reader = None
         
         if not self.simulation_mode:
-            print(f"🔌 ASIC Substrate Linked: {self.hardware_ip}:{self.hardware_port}")
+            if shm_name:
+                self.shm_reader = SharedEntropyReader(shm_name)
+                print(f"🔌 ASIC Substrate Linked: shared memory '{shm_name}'")
+            else:
+                print(f"🔌 ASIC Substrate Linked: {self.hardware_ip}:{self.hardware_port}")
+
+    def mine_reservoir_array(self, cycles: int = 1, timeout: float = 5.0):
+        """
+        Array variant for the shared-memory transport.
+        Returns up to 'cycles' hashes as a numpy (N, 32) uint8 array: one validated
+        copy out of the bridge's shared ring, no socket or JSON on the way.
+        """
+        return self.shm_reader.wait_array(cycles, timeout=timeout)
             
     def mine_reservoir_state(self, seed: bytes, cycles: int = 1) -> list:
         """
@@ -34,36 +55,15 @@ class ASICSubstrate:
             return results
             
         else:
-            # HARDWARE MODE (Burst Protocol)
+            # HARDWARE MODE (Burst Protocol over a pooled keep-alive socket)
             try:
-                s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-                s.settimeout(5.0) # Increased timeout for burst
-                s.connect((self.hardware_ip, self.hardware_port))
-                
                 # OPTIMIZED BURST REQUEST
-                # We request 'cycles' hashes in one go
-                cmd = f"BURST:{cycles}\n".encode()
-                s.sendall(cmd)
-                
-                # Receive all data
-                # Expected bytes = cycles * 32
-                expected_bytes = cycles * 32
-                data = b""
-                
-                start_recv = time.time()
-                while len(data) < expected_bytes:
-                    if time.time() - start_recv > 5.0: break # Safety breakout
-                    chunk = s.recv(4096)
-                    if not chunk: break
-                    data += chunk
-                
-                s.close()
-                
-                # Split raw bytes into 32-byte hash chunks
-                for i in range(0, len(data), 32):
-                    chunk = data[i:i+32]
-                    if len(chunk) == 32:
-                        results.append(chunk)
+                # We request 'cycles' hashes in one go, reusing the connection
+                if self.shm_reader:
+                    results = [row.tobytes() for row in self.mine_reservoir_array(cycles)]
+                else:
+                    client = EntropyClient.shared(self.hardware_ip, self.hardware_port)
+                    results = client.burst(cycles)
                         
                 # Fallback expansion if network dropped packets (Safety)
                 # If we got at least 1 hash but less than requested, expand the last one
@@ -1,7 +1,14 @@
-import socket
 import time
 import hashlib
 import os
+import numpy as np
+
+try:
+    from .entropy_client import EntropyClient, EntropySubscription
+    from .shm_ring import SharedEntropyReader
+except ImportError:
+    from entropy_client import EntropyClient, EntropySubscription
+    from shm_ring import SharedEntropyReader
 
 class DeepSubstrate:
     """
@@ -9,10 +16,18 @@ class DeepSubstrate:
     A client that refuses to accept PRNG. It blocks until the requested
     amount of REAL THERMODYNAMIC ENTROPY is collected from the Bridge.
     """
-    def __init__(self):
+    def __init__(self, streaming=False, shm_name=None):
         self.ip = "127.0.0.1"
         self.port = 4028
-        print("⚓ [DeepSubstrate] Initialized. Mode: STRICT ACCUMULATION.")
+        self.long_poll_ms = 500 # Bridge holds each BURST until it is full or this deadline passes
+        # Streaming: hashes are pushed by the bridge (SUBSCRIBE) instead of polled.
+        # Note a subscription only sees shares captured after it opens.
+        self.streaming = streaming
+        self.subscription = None
+        # Shared memory: copy hashes straight out of the bridge's ring when running on the same host
+        self.shm_reader = SharedEntropyReader(shm_name) if shm_name else None
+        mode = "SHARED MEMORY" if shm_name else "STREAMING" if streaming else "STRICT ACCUMULATION"
+        print(f"⚓ [DeepSubstrate] Initialized. Mode: {mode}.")
 
     def mine_entropy(self, target_count=1000, timeout=300):
         """
@@ -23,62 +38,111 @@ class DeepSubstrate:
         
         print(f"⚓ [DeepSubstrate] Requesting {target_count} Real Hashes...")
         
+        if self.shm_reader:
+            return self.map_entropy(target_count, timeout)
+        if self.streaming:
+            return self.stream_entropy(target_count, timeout)
+        
         while len(collected) < target_count:
             if time.time() - start_time > timeout:
                 print("❌ [DeepSubstrate] Timeout waiting for entropy.")
                 break
             
             try:
-                # 1. Ask for remaining needed
-                needed = target_count - len(collected)
-                # Cap request at 100 per burst to avoid socket overload
-                req_size = min(needed, 100)
-                
-                s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-                s.settimeout(2.0)
-                s.connect((self.ip, self.port))
-                
-                cmd = f"BURST:{req_size}\n".encode()
-                s.sendall(cmd)
-                
-                data = b""
-                try:
-                    while True:
-                        chunk = s.recv(4096)
-                        if not chunk: break
-                        data += chunk
-                except: pass
-                
-                s.close()
+                # 1. Ask for remaining needed (the bridge caps a BURST at 1000)
+                needed = min(target_count - len(collected), 1000)
+                # Long-poll: returns as soon as 'needed' hashes exist, or with
+                # whatever arrived by the deadline. No client-side sleep.
+                remaining_ms = int((timeout - (time.time() - start_time)) * 1000)
+                client = EntropyClient.shared(self.ip, self.port)
+                batch = client.burst_wait(needed, max(min(self.long_poll_ms, remaining_ms), 0))
                 
                 # 2. Process Data
                 # Since Bridge now ONLY sends real data (or nothing), everything we get is gold.
-                batch_count = 0
-                for i in range(0, len(data), 32):
-                    h = data[i:i+32]
-                    if len(h) == 32:
-                        collected.append(h)
-                        batch_count += 1
+                collected.extend(batch)
                 
                 # Feedback
-                if batch_count > 0:
+                if batch:
                     print(f"\r⏳ Accumulating: {len(collected)}/{target_count} ({(len(collected)/target_count)*100:.1f}%)", end="")
-                else:
-                    # Wait a bit for miner to produce
-                    time.sleep(0.5)
                     
-            except Exception as e:
+            except Exception:
+                # Bridge down or restarting: back off before reconnecting
                 # print(e)
                 time.sleep(1)
         
         print(f"\n✅ [DeepSubstrate] Collection Complete. {len(collected)} hashes acquired in {time.time()-start_time:.1f}s.")
         return collected
 
+    def map_entropy(self, target_count=1000, timeout=300):
+        """
+        Same contract as mine_entropy, fed from the shared-memory ring.
+        Use mine_entropy_array() to keep the numpy array (no per-hash bytes objects).
+        """
+        return [row.tobytes() for row in self.mine_entropy_array(target_count, timeout)]
+
+    def mine_entropy_array(self, target_count=1000, timeout=300):
+        """
+        Collects 'target_count' hashes from the shared-memory ring as a
+        numpy (N, 32) uint8 array. Each read is one validated copy out of
+        shared memory (no socket or JSON); a single read is returned as is,
+        several partial reads are joined into one array.
+        """
+        start_time = time.time()
+        parts = []
+        got = 0
+        while got < target_count:
+            remaining = timeout - (time.time() - start_time)
+            if remaining <= 0:
+                print("❌ [DeepSubstrate] Timeout waiting for entropy.")
+                break
+            part = self.shm_reader.wait_array(target_count - got, timeout=min(remaining, 1.0))
+            if len(part):
+                parts.append(part)
+                got += len(part)
+                print(f"\r⏳ Mapping: {got}/{target_count} ({(got/target_count)*100:.1f}%)", end="")
+        
+        print(f"\n✅ [DeepSubstrate] Collection Complete. {got} hashes acquired in {time.time()-start_time:.1f}s.")
+        if len(parts) == 1: return parts[0]
+        if not parts: return self.shm_reader.read_array(0)
+        return np.concatenate(parts)
+
+    def stream_entropy(self, target_count=1000, timeout=300):
+        """
+        Same contract as mine_entropy, fed by a SUBSCRIBE push stream:
+        each hash is delivered the moment the share arrives, no sleep/retry.
+        """
+        collected = []
+        start_time = time.time()
+        
+        while len(collected) < target_count:
+            remaining = timeout - (time.time() - start_time)
+            if remaining <= 0:
+                print("❌ [DeepSubstrate] Timeout waiting for entropy.")
+                break
+            
+            try:
+                if self.subscription is None:
+                    self.subscription = EntropySubscription(self.ip, self.port)
+                batch = self.subscription.recv(target_count - len(collected), timeout=remaining)
+                collected.extend(batch)
+                if batch:
+                    print(f"\r⏳ Streaming: {len(collected)}/{target_count} ({(len(collected)/target_count)*100:.1f}%)", end="")
+            except Exception:
+                # Bridge restarted or link dropped: resubscribe
+                if self.subscription: self.subscription.close()
+                self.subscription = None
+                time.sleep(1)
+        
+        print(f"\n✅ [DeepSubstrate] Collection Complete. {len(collected)} hashes acquired in {time.time()-start_time:.1f}s.")
+        return collected
+
     def inject_seed(self, seed_text):
+        """
+        Returns the job id the bridge pushed to the miners (None if unconfirmed).
+        Once it returns, the miners are already working on the new seed.
+        """
         try:
-            s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            s.connect((self.ip, self.port))
-            s.sendall(f"SEED:{seed_text}\n".encode())
-            s.close()
-            print(f"🌱 Seed Injected: {seed_text}")
-        except: pass
+            job_id, _ = EntropyClient.shared(self.ip, self.port).seed(seed_text)
+            print(f"🌱 Seed Injected: {seed_text} (job {job_id})")
+            return job_id
+        except: return None
@@ -0,0 +1,52 @@
+import time
+
+class VarDiff:
+    """
+    Per-connection variable-difficulty controller.
+    Counts shares between retargets and scales the Stratum difficulty so the
+    miner delivers about 'target_sps' shares/sec: too many shares means the
+    Wi-Fi link floods, too few and the reservoir starves. Steps are capped at
+    4x per retarget and changes inside 'tolerance' are ignored to avoid
+    flapping.
+    """
+    def __init__(self, target_sps=5.0, initial=1, min_diff=1, max_diff=65536,
+                 retarget_interval=10.0, tolerance=0.3):
+        self.target_sps = target_sps
+        self.difficulty = initial
+        self.min_diff = min_diff
+        self.max_diff = max_diff
+        self.retarget_interval = retarget_interval
+        self.tolerance = tolerance
+        self.shares = 0
+        self.last_retarget = time.time()
+        self.observed_sps = 0.0
+
+    def record_share(self, now=None):
+        """Counts one share. Returns the new difficulty if a retarget is due and needed, else None."""
+        self.shares += 1
+        return self.retarget(now)
+
+    def retarget(self, now=None):
+        """
+        Also call this periodically: a starved miner sends no shares, so only
+        the timer can lower its difficulty.
+        """
+        now = now or time.time()
+        elapsed = now - self.last_retarget
+        if elapsed < self.retarget_interval:
+            return None
+        self.observed_sps = self.shares / elapsed
+        self.shares = 0
+        self.last_retarget = now
+
+        ratio = self.observed_sps / self.target_sps if self.target_sps > 0 else 1.0
+        if abs(ratio - 1.0) <= self.tolerance:
+            return None
+        ratio = min(max(ratio, 0.25), 4.0)
+        new = min(max(self.difficulty * ratio, self.min_diff), self.max_diff)
+        if new >= 1:
+            new = int(round(new))
+        if new == self.difficulty:
+            return None
+        self.difficulty = new
+        return new
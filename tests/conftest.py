@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Run from anywhere: the core modules are imported as holographic_reservoir.core.*
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
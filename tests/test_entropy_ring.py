@@ -0,0 +1,47 @@
+from holographic_reservoir.core.entropy_ring import EntropyRing
+
+def h(i):
+    return bytes([i % 256]) * 32
+
+def joined(views):
+    return b"".join(bytes(v) for v in views)
+
+def test_pop_burst_is_fifo_and_consumes():
+    ring = EntropyRing(8)
+    for i in range(5): ring.push(h(i))
+    assert joined(ring.pop_burst(3)) == h(0) + h(1) + h(2)
+    assert len(ring) == 2
+    assert joined(ring.pop_burst(10)) == h(3) + h(4)
+    assert ring.pop_burst(1) == []
+
+def test_pop_burst_wraps_in_two_slices():
+    ring = EntropyRing(4)
+    for i in range(3): ring.push(h(i))
+    ring.pop_burst(3)
+    for i in range(3, 7): ring.push(h(i))
+    views = ring.pop_burst(4)
+    assert len(views) == 2
+    assert joined(views) == b"".join(h(i) for i in range(3, 7))
+
+def test_overwrite_drops_oldest():
+    ring = EntropyRing(4)
+    for i in range(6): ring.push(h(i))
+    assert len(ring) == 4 and ring.overwritten == 2
+    assert joined(ring.pop_burst(4)) == b"".join(h(i) for i in range(2, 6))
+
+def test_read_from_is_non_destructive_and_reports_lost():
+    ring = EntropyRing(4)
+    for i in range(6): ring.push(h(i))
+    start, views, lost = ring.read_from(0, 10)
+    assert (start, lost) == (2, 2)
+    assert joined(views) == b"".join(h(i) for i in range(2, 6))
+    assert len(ring) == 4 # Cursor reads leave the BURST head alone
+    start, views, lost = ring.read_from(6, 10)
+    assert (start, views, lost) == (6, [], 0)
+
+def test_tags_follow_their_hashes():
+    ring = EntropyRing(4)
+    for i in range(6): ring.push(h(i), source=i + 100)
+    start, views, _ = ring.read_from(0, 4)
+    tags = joined(ring.tag_slices(start, 4))
+    assert [int.from_bytes(tags[i:i+2], "big") for i in range(0, 8, 2)] == [102, 103, 104, 105]
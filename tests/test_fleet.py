@@ -0,0 +1,19 @@
+from holographic_reservoir.core.fleet import MinerFleet
+
+def test_each_miner_gets_its_own_extranonce1():
+    fleet = MinerFleet()
+    a, b = fleet.attach("wa", ("10.0.0.1", 1)), fleet.attach("wb", ("10.0.0.2", 2))
+    assert (a.miner_id, b.miner_id) == (0, 1)
+    assert (a.extranonce1, b.extranonce1) == ("08000000", "08000001")
+    assert fleet.get("wb") is b
+    assert fleet.detach("wa") is a and len(fleet) == 1
+
+def test_ids_are_reused_and_bounded_by_the_span():
+    fleet = MinerFleet(first_id=100, span=3)
+    sessions = [fleet.attach(f"w{i}", ("10.0.0.1", i)) for i in range(3)]
+    assert [s.miner_id for s in sessions] == [100, 101, 102]
+    assert sessions[0].extranonce1 == "08000064"
+    assert fleet.attach("w3", ("10.0.0.1", 3)) is None # Full
+    fleet.detach("w1")
+    assert fleet.attach("w4", ("10.0.0.1", 4)).miner_id == 101
+    assert len(fleet) == 3
@@ -0,0 +1,94 @@
+import asyncio
+import hashlib
+import os
+import socket
+import sys
+
+import numpy as np
+
+from holographic_reservoir.core.share_journal import ShareJournal
+from holographic_reservoir.core.journal_replay import JournalReplay
+from holographic_reservoir.core.entropy_client import EntropyClient
+from holographic_reservoir.core.chronos_client import ChronosClient
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "V04", "drivers"))
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def record(directory, arrivals, prefix="shares", miner=0):
+    journal = ShareJournal(str(directory), prefix)
+    for i, ts in enumerate(arrivals):
+        h = hashlib.sha256(f"{prefix}{i}".encode()).digest()
+        journal.append(miner + i % 2, "1", "00", "65000000", f"{i:08x}", h, ts_ns=int(ts))
+    journal.close()
+
+def legacy_rhythm(arrivals):
+    # The pre-analyzer Chronos calculation: 10 intervals, population CV, 10 linear bins
+    deltas = np.diff(np.array(arrivals)) / 1e9
+    hist, _ = np.histogram(deltas, bins=10)
+    prob = hist[hist > 0] / np.sum(hist)
+    return np.std(deltas) / np.mean(deltas), -np.sum(prob * np.log(prob))
+
+async def run_until_replayed(bridge, query):
+    task = asyncio.create_task(bridge.start())
+    try:
+        for _ in range(200):
+            await asyncio.sleep(0.02)
+            if bridge.replay.replayed == bridge.replay.total: break
+        return await asyncio.to_thread(query)
+    finally:
+        task.cancel()
+
+def test_replay_as_fast_as_possible(tmp_path):
+    journal = ShareJournal(str(tmp_path), segment_records=4)
+    for i in range(10):
+        journal.append(0, "1", "00", "65000000", f"{i:08x}", b"\2" * 32, ts_ns=i * 10**9)
+    journal.close()
+    replay = JournalReplay(str(tmp_path), speed=0, max_chunk=3)
+    chunks = list(replay)
+    assert max(len(c) for c in chunks) <= 3
+    assert sum(len(c) for c in chunks) == replay.replayed == 10
+
+def test_chronos_replay_reports_the_recorded_rhythm(tmp_path, monkeypatch):
+    import chronos_bridge
+    monkeypatch.setattr(chronos_bridge, "PORT", free_port())
+    monkeypatch.setattr(chronos_bridge, "API_PORT", free_port())
+    monkeypatch.setattr(chronos_bridge, "METRICS_PORT", None)
+    rng = np.random.default_rng(7)
+    arrivals = 1_700_000_000 * 10**9 + np.cumsum(rng.exponential(0.05, 33) * 1e9).astype(np.int64)
+    record(tmp_path, arrivals)
+
+    bridge = chronos_bridge.ChronosBridge(replay_dir=str(tmp_path), replay_speed=0)
+    client = ChronosClient("127.0.0.1", chronos_bridge.API_PORT)
+    rows, _ = asyncio.run(run_until_replayed(bridge, lambda: client.since(0)))
+    client.close()
+
+    reports = rows[rows["shares"] > 0]
+    assert reports["shares"].tolist() == [11, 22, 33] # One report per 11 arrivals, as before
+    for report, end in zip(reports, (11, 22, 33)):
+        cv, time_entropy = legacy_rhythm(arrivals[end - 11:end])
+        assert np.isclose(report["cv"], cv)
+        assert np.isclose(report["time_entropy"], time_entropy)
+    intervals = np.diff(arrivals) / 1e9
+    assert np.isclose(reports["cv_10"][-1], np.std(intervals[-10:]) / np.mean(intervals[-10:]))
+
+def test_plenum_replays_a_sharded_session_in_arrival_order(tmp_path, monkeypatch):
+    from holographic_reservoir.core import plenum_bridge
+    monkeypatch.setattr(plenum_bridge, "PORT", free_port())
+    monkeypatch.setattr(plenum_bridge, "API_PORT", free_port())
+    monkeypatch.setattr(plenum_bridge, "METRICS_PORT", None)
+    record(tmp_path, [10 * i for i in range(4)], prefix="shard0", miner=0)
+    record(tmp_path, [10 * i + 5 for i in range(4)], prefix="shard1", miner=4096)
+
+    bridge = plenum_bridge.PlenumBridge(replay_dir=str(tmp_path), replay_speed=0)
+    client = EntropyClient("127.0.0.1", plenum_bridge.API_PORT)
+    start, pairs, lost = asyncio.run(run_until_replayed(bridge, lambda: client.read_tagged(0, 100)))
+    client.close()
+
+    assert (start, lost) == (0, 0)
+    expected = [(4096 * shard + i % 2, hashlib.sha256(f"shard{shard}{i}".encode()).digest())
+                for i in range(4) for shard in (0, 1)]
+    assert pairs == expected
@@ -0,0 +1,47 @@
+import math
+
+from holographic_reservoir.core.metrics_history import MetricsHistory
+
+FIELDS = ("shares", "cv")
+
+def test_since_and_between_from_the_ring():
+    history = MetricsHistory(FIELDS, capacity=8)
+    for i in range(5):
+        assert history.record({"shares": i}, ts=100.0 + i) == i
+    rows = history.since(3)
+    assert rows["seq"].tolist() == [3, 4]
+    assert rows["shares"].tolist() == [3.0, 4.0]
+    assert math.isnan(rows["cv"][0]) # Missing fields are NaN
+    assert history.between(101.0, 102.0)["seq"].tolist() == [1, 2]
+
+def test_ring_only_history_forgets_overwritten_rows():
+    history = MetricsHistory(FIELDS, capacity=4)
+    for i in range(10): history.record({"shares": i})
+    assert history.since(0)["seq"].tolist() == [6, 7, 8, 9]
+
+def test_spill_answers_past_the_ring(tmp_path):
+    history = MetricsHistory(FIELDS, capacity=4, spill_dir=str(tmp_path), batch_rows=2, segment_rows=3)
+    for i in range(10): history.record({"shares": i}, ts=float(i))
+    assert history.since(0)["seq"].tolist() == list(range(10))
+    assert history.between(1.0, 3.0)["shares"].tolist() == [1.0, 2.0, 3.0]
+    history.close()
+
+def test_seq_continues_across_restarts(tmp_path):
+    first = MetricsHistory(FIELDS, capacity=4, spill_dir=str(tmp_path), batch_rows=2)
+    for i in range(5): first.record({"shares": i})
+    first.close()
+    second = MetricsHistory(FIELDS, capacity=4, spill_dir=str(tmp_path), batch_rows=2)
+    assert second.record({"shares": 100}) == 5
+    rows = second.since(0)
+    assert rows["seq"].tolist() == list(range(6))
+    assert rows["shares"].tolist()[-1] == 100.0
+    second.close()
+
+def test_encode_json_and_binary():
+    history = MetricsHistory(FIELDS, capacity=4)
+    for i in range(3): history.record({"shares": i, "cv": 0.5})
+    rows = history.since(1)
+    (text,) = history.encode(rows)
+    assert b'"next": 3' in text and b'"count": 2' in text
+    length, head, raw = history.encode(rows, binary=True)
+    assert len(raw) == 2 * history.dtype.itemsize
@@ -0,0 +1,34 @@
+import math
+import random
+
+from holographic_reservoir.core.rhythm import RhythmAnalyzer
+
+def reference(intervals):
+    mean = sum(intervals) / len(intervals)
+    std = math.sqrt(sum((v - mean) ** 2 for v in intervals) / len(intervals))
+    return mean, std / mean
+
+def test_sliding_windows_match_direct_statistics():
+    rng = random.Random(3)
+    analyzer = RhythmAnalyzer(windows=(10, 100))
+    ts, intervals = 0, []
+    analyzer.add(ts)
+    for _ in range(357):
+        dt = rng.expovariate(20.0)
+        ts += int(dt * 1e9)
+        intervals.append(int(dt * 1e9) / 1e9)
+        analyzer.add(ts)
+    for w in analyzer.windows:
+        mean, cv = reference(intervals[-w.size:])
+        assert w.n == w.size
+        assert math.isclose(w.mean, mean, rel_tol=1e-9)
+        assert math.isclose(w.cv(), cv, rel_tol=1e-6)
+        assert sum(w.counts) == w.size
+    assert analyzer.recent(5) == intervals[-5:]
+
+def test_regular_arrivals_have_no_variation():
+    analyzer = RhythmAnalyzer(windows=(10,))
+    for i in range(25): analyzer.add(i * 50_000_000)
+    w = analyzer.windows[0]
+    assert w.cv() < 1e-9
+    assert w.entropy() == 0.0
@@ -0,0 +1,26 @@
+import threading
+
+from holographic_reservoir.core.sharding import ShardLink, MSG_HASHES
+
+class StuckConn:
+    # A merge process that stopped reading: send_bytes blocks until released
+    def __init__(self):
+        self.release = threading.Event()
+        self.sent = []
+
+    def send_bytes(self, msg):
+        self.release.wait()
+        self.sent.append(msg)
+
+def test_lagging_merge_process_drops_instead_of_blocking():
+    conn = StuckConn()
+    link = ShardLink(conn, bridge=None, queue_size=2)
+    for i in range(5):
+        link.sources.append(i)
+        link.hashes.append(bytes(32))
+        link.flush() # Never blocks: one message in the sender, two queued, the rest dropped
+    assert link.drops in (2, 3)
+    conn.release.set()
+    link.close()
+    assert all(msg[:1] == MSG_HASHES for msg in conn.sent)
+    assert len(conn.sent) + link.drops == 5
@@ -0,0 +1,52 @@
+import binascii
+import hashlib
+import struct
+
+from holographic_reservoir.core.share_hasher import JobHasher, JobBook
+
+# Bitcoin genesis block: its coinbase split around an 8-byte "extranonce"
+GENESIS_COINBASE = (
+    "01000000010000000000000000000000000000000000000000000000000000000000000000ffffffff4d04ffff001d01"
+    "04455468652054696d65732030332f4a616e2f32303039204368616e63656c6c6f72206f6e206272696e6b206f66207365"
+    "636f6e64206261696c6f757420666f722062616e6b73ffffffff0100f2052a01000000434104678afdb0fe5548271967f1a6"
+    "7130b7105cd6a828e03909a67962e0ea1f61deb649f6bc3f4cef38c4f35504e51ec112de5c384df7ba0b8d578a4c702b6bf1"
+    "1d5fac00000000"
+)
+GENESIS_HASH = "000000000019d6689c085ae165831e934ff763ae46a2a6c172b3f1b60a8ce26f"
+
+def naive_share_hash(prevhash, coinb1, en1, en2, coinb2, branch, version, nbits, ntime, nonce):
+    # Header built from scratch for every share, no caching
+    def dsha(b): return hashlib.sha256(hashlib.sha256(b).digest()).digest()
+    root = dsha(binascii.unhexlify(coinb1 + en1 + en2 + coinb2))
+    for node in branch: root = dsha(root + binascii.unhexlify(node))
+    header = (struct.pack("<I", version) + binascii.unhexlify(prevhash)[::-1] + root
+              + binascii.unhexlify(ntime)[::-1] + binascii.unhexlify(nbits)[::-1] + binascii.unhexlify(nonce)[::-1])
+    return dsha(header)[::-1]
+
+def test_genesis_block_hash():
+    split = 168
+    coinb1, en1, en2, coinb2 = (GENESIS_COINBASE[:split], GENESIS_COINBASE[split:split + 8],
+                                GENESIS_COINBASE[split + 8:split + 16], GENESIS_COINBASE[split + 16:])
+    hasher = JobHasher("1", "00" * 32, coinb1, coinb2, [], "00000001", "1d00ffff")
+    assert hasher.share_hash(en1, en2, "495fab29", "7c2bac1d").hex() == GENESIS_HASH
+
+def test_matches_naive_hash_with_branch_and_version_rolling():
+    prevhash = "11" * 32
+    coinb1, coinb2 = "01000000" + "ab" * 20, "cd" * 30 + "00000000"
+    branch = ["22" * 32, "33" * 32]
+    hasher = JobHasher("7", prevhash, coinb1, coinb2, branch, "20000000", "1703a30c", max_cache=2)
+    mask = 0x1fffe000
+    for i in range(12):
+        en1, en2 = f"{0x08000000 + i % 3:08x}", f"{i % 4:08x}"
+        ntime, nonce, bits = f"{0x65000000 + i:08x}", f"{i * 7919:08x}", f"{(i << 13) & mask:08x}"
+        version = (0x20000000 & ~mask) | (int(bits, 16) & mask)
+        expected = naive_share_hash(prevhash, coinb1, en1, en2, coinb2, branch, version, "1703a30c", ntime, nonce)
+        assert hasher.share_hash(en1, en2, ntime, nonce, bits, mask) == expected
+    assert len(hasher.roots) == 2 # LRU stays bounded
+
+def test_job_book_keeps_the_newest_jobs():
+    book = JobBook(depth=2)
+    for job_id in ("a", "b", "c"):
+        book.add(JobHasher(job_id, "00" * 32, "", "", [], "00000001", "1d00ffff"))
+    assert book.get("a") is None
+    assert book.get("c").job_id == "c"
@@ -0,0 +1,49 @@
+import hashlib
+
+from holographic_reservoir.core.share_journal import (ShareJournal, load_journal, read_journal,
+                                                     merge_journals, session_prefixes)
+
+def test_round_trip_across_segments(tmp_path):
+    journal = ShareJournal(str(tmp_path), segment_records=3, batch_records=2)
+    hashes = [hashlib.sha256(bytes([i])).digest() for i in range(7)]
+    for i, h in enumerate(hashes):
+        assert journal.append(i % 2, f"job{i}", f"{i:08x}", "65000000", f"{i * 3:08x}", h,
+                              version_bits="00002000" if i else None, ts_ns=1000 + i, rx_ns=2000 + i)
+    journal.close()
+    assert [len(s) for s in read_journal(str(tmp_path))] == [3, 3, 1]
+    records = load_journal(str(tmp_path))
+    assert records["ts_ns"].tolist() == [1000 + i for i in range(7)]
+    assert records["rx_ns"].tolist() == [2000 + i for i in range(7)]
+    assert records["miner"].tolist() == [i % 2 for i in range(7)]
+    assert records["job_id"][4] == b"job4"
+    assert records["nonce"].tolist() == [i * 3 for i in range(7)]
+    assert records["version_bits"].tolist() == [0] + [0x2000] * 6
+    assert [r.tobytes() for r in records["hash"]] == hashes
+
+def test_malformed_share_is_counted_not_raised(tmp_path):
+    journal = ShareJournal(str(tmp_path))
+    assert not journal.append(0, "1", "zz", "65000000", "00000000", b"\0" * 32)
+    assert not journal.append(0, "1", "00", "65000000", "1" * 20, b"\0" * 32) # nonce does not fit
+    assert journal.append(0, "1", "00", "65000000", "00000001", b"\0" * 32)
+    journal.close()
+    assert journal.errors == 2
+    assert len(load_journal(str(tmp_path))) == 1
+
+def test_new_writer_starts_a_new_segment(tmp_path):
+    for run in range(2):
+        journal = ShareJournal(str(tmp_path))
+        journal.append(run, "1", "00", "65000000", "00000000", b"\1" * 32, ts_ns=run)
+        journal.close()
+    assert load_journal(str(tmp_path))["miner"].tolist() == [0, 1]
+
+def test_shard_journals_merge_by_arrival(tmp_path):
+    for shard in range(2):
+        journal = ShareJournal(str(tmp_path), prefix=f"shard{shard}")
+        for i in range(3):
+            journal.append(shard, "1", "00", "65000000", f"{i:08x}", b"\3" * 32, ts_ns=10 * i + shard)
+        journal.close()
+    prefixes = session_prefixes(str(tmp_path))
+    assert prefixes == ["shard0", "shard1"]
+    records = merge_journals(str(tmp_path), prefixes)
+    assert records["ts_ns"].tolist() == [0, 1, 10, 11, 20, 21]
+    assert records["miner"].tolist() == [0, 1, 0, 1, 0, 1]
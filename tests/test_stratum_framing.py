@@ -0,0 +1,21 @@
+from holographic_reservoir.core.stratum_framing import LineFramer
+
+def test_lines_split_across_chunks():
+    framer = LineFramer()
+    assert framer.feed(b'{"id": 1}\n{"id"') == [b'{"id": 1}']
+    assert framer.feed(b': 2}\n\n  \n{"id": 3}\n') == [b'{"id": 2}', b'{"id": 3}']
+    assert framer.lines == 3
+
+def test_messages_count_malformed_lines():
+    framer = LineFramer()
+    msgs = framer.messages(b'{"id": 1}\nnot json\n[1, 2]\n{"id": 2}\n')
+    assert [m["id"] for m in msgs] == [1, 2]
+    assert framer.malformed == 2
+    assert framer.last_error
+
+def test_oversized_lines_are_dropped():
+    framer = LineFramer(max_line=16)
+    assert framer.feed(b"x" * 40 + b'\n{"id": 1}\n') == [b'{"id": 1}']
+    assert framer.feed(b"y" * 40) == []
+    assert framer.oversized == 2
+    assert framer.feed(b'\n{"id": 2}\n') == [b'{"id": 2}']